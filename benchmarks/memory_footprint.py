@@ -0,0 +1,88 @@
+"""Measure the in-memory footprint of parsed documents.
+
+Parses every example prompt many times and reports the traced allocation per
+document, first with the real (slotted) models and then with plain-dataclass
+mirrors of the same models for comparison.
+
+    python benchmarks/memory_footprint.py [--copies N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import gc
+import tracemalloc
+from pathlib import Path
+from typing import Any
+
+from prompt_lint import models
+from prompt_lint.parser import parse
+
+EXAMPLES = Path(__file__).resolve().parent.parent / "examples"
+
+_MIRRORED = (
+    "Position",
+    "Variable",
+    "VariableReference",
+    "OutputField",
+    "Section",
+    "FrontmatterError",
+)
+
+
+def _plain_mirrors() -> dict[type, type]:
+    """Plain (``__dict__``-based) dataclasses with the same fields as the models."""
+    mirrors = {}
+    for name in _MIRRORED:
+        cls = getattr(models, name)
+        fields = [(f.name, Any) for f in dataclasses.fields(cls)]
+        mirrors[cls] = dataclasses.make_dataclass(f"Plain{name}", fields)
+    return mirrors
+
+
+def _to_plain(value: Any, mirrors: dict[type, type]) -> Any:
+    if isinstance(value, list):
+        return [_to_plain(v, mirrors) for v in value]
+    plain = mirrors.get(type(value))
+    if plain is None:
+        return value
+    return plain(
+        **{f.name: _to_plain(getattr(value, f.name), mirrors) for f in dataclasses.fields(value)}
+    )
+
+
+def _measure(sources: list[str], mirrors: dict[type, type] | None) -> float:
+    """Average bytes retained per parsed document."""
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    kept = []
+    for source in sources:
+        doc = parse(source)
+        if mirrors is not None:
+            doc.sections = _to_plain(doc.sections, mirrors)
+        kept.append(doc)
+    used = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    return used / len(kept)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--copies", type=int, default=500, help="copies of each example")
+    args = parser.parse_args()
+
+    examples = [p.read_text(encoding="utf-8") for p in sorted(EXAMPLES.glob("*.prompt.md"))]
+    # A trailing comment keeps each copy a distinct string, as in a real corpus
+    sources = [f"{text}\n<!-- {i} -->\n" for i in range(args.copies) for text in examples]
+
+    plain = _measure(sources, _plain_mirrors())
+    slotted = _measure(sources, None)
+    print(f"documents:        {len(sources)}")
+    print(f"plain dataclass:  {plain:,.0f} bytes/document")
+    print(f"slotted models:   {slotted:,.0f} bytes/document ({slotted / plain:.0%})")
+
+
+if __name__ == "__main__":
+    main()
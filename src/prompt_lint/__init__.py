@@ -1,3 +1,24 @@
 """prompt-lint: Static analysis tool for structured .prompt.md files."""
 
+from __future__ import annotations
+
 __version__ = "0.1.0"
+
+# Not imported from typing, which would add to the startup of every command;
+# type checkers treat any TYPE_CHECKING as true
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any
+
+    from prompt_lint.runner import Linter, LintResult, lint_many
+
+__all__ = ["LintResult", "Linter", "__version__", "lint_many"]
+
+
+def __getattr__(name: str) -> Any:
+    # Imported on first use: every command starts by importing this package
+    if name in ("LintResult", "Linter", "lint_many"):
+        from prompt_lint import runner
+
+        return getattr(runner, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,5 +1,5 @@
 """Allow running as `python -m prompt_lint`."""
 
-from prompt_lint.cli import main
+from prompt_lint.client import main
 
 main()
@@ -0,0 +1,56 @@
+"""Performance benchmarks: synthetic corpora and a timing harness."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from prompt_lint.bench.corpus import CorpusSpec, generate_document, write_corpus
+    from prompt_lint.bench.harness import (
+        DEFAULT_THRESHOLD,
+        BenchResult,
+        compare,
+        format_report,
+        run_benchmarks,
+    )
+
+__all__ = [
+    "BENCHMARKS",
+    "DEFAULT_THRESHOLD",
+    "BenchResult",
+    "CorpusSpec",
+    "compare",
+    "format_report",
+    "generate_document",
+    "run_benchmarks",
+    "write_corpus",
+]
+
+# Defined here rather than in the harness, so the CLI can list them cheaply
+BENCHMARKS = (
+    "parse",
+    "validate",
+    # Read and parse every file, keeping the documents, as a batch job or an
+    # index would; "load_lean" drops each document's source once parsed
+    "load",
+    "load_lean",
+    "cli",
+    "lsp_diagnostics",
+    "lsp_hover",
+    "lsp_completions",
+)
+
+_CORPUS_NAMES = ("CorpusSpec", "generate_document", "write_corpus")
+
+
+def __getattr__(name: str) -> Any:
+    # Imported on first use: the CLI imports this package for the benchmark names
+    if name in _CORPUS_NAMES:
+        from prompt_lint.bench import corpus
+
+        return getattr(corpus, name)
+    if name in __all__:
+        from prompt_lint.bench import harness
+
+        return getattr(harness, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,109 @@
+"""Reproducible synthetic .prompt.md corpora for benchmarks."""
+
+from __future__ import annotations
+
+import random
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+_HEADINGS = {
+    "Role": ("Role", "Role（役割）"),
+    "Input": ("Input", "Input（入力変数）"),
+    "Output": ("Output", "Output（出力形式）"),
+    "Constraints": ("Constraints", "Constraints（制約）"),
+    "Steps": ("Steps", "Steps（処理手順）"),
+    "Examples": ("Examples", "Examples（例）"),
+    "Fallback": ("Fallback", "Fallback（フォールバック）"),
+    "Changelog": ("Changelog", "Changelog（メモ）"),
+}
+_OPTIONAL = ("Constraints", "Fallback", "Changelog")
+_TYPES = ("string", "number", "boolean", "list")
+_WORDS = (
+    "review the request and decide on a plan of action for the task at hand "
+    "considering priority deadline owner budget context risk and scope"
+).split()
+
+
+@dataclass
+class CorpusSpec:
+    """Shape of a generated corpus; the same spec and seed give the same files."""
+
+    files: int = 200
+    # Optional sections per file, cycling through Constraints, Fallback and Changelog
+    extra_sections: int = 3
+    variables: int = 6
+    # Chance that a prose line references an input variable
+    reference_density: float = 0.5
+    # Chance that a section body contains a fenced code block
+    code_block_ratio: float = 0.2
+    # Chance that a heading uses its Japanese alias
+    japanese_ratio: float = 0.3
+    # Lines in the Examples section of each file
+    examples_lines: int = 40
+    seed: int = 0
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def generate_document(spec: CorpusSpec, index: int) -> str:
+    """Generate the ``index``-th document of the corpus described by ``spec``."""
+    rng = random.Random(f"{spec.seed}:{index}")
+    variables = [f"var_{index % 7}_{i}" for i in range(spec.variables)]
+    fields = [f"field_{i}" for i in range(max(1, spec.variables // 2))]
+
+    def heading(kind: str) -> str:
+        english, japanese = _HEADINGS[kind]
+        return f"# {japanese if rng.random() < spec.japanese_ratio else english}"
+
+    def prose(lines: int, outputs: bool = False) -> list[str]:
+        body = []
+        for n in range(lines):
+            words = rng.sample(_WORDS, 8)
+            if variables and rng.random() < spec.reference_density:
+                words.insert(rng.randrange(len(words)), f"{{{{{rng.choice(variables)}}}}}")
+            if outputs and n < len(fields):
+                words.append(f"**{fields[n]}**")
+            body.append(" ".join(words))
+        if rng.random() < spec.code_block_ratio:
+            body += ["```", f"# not a heading {{{{{rng.choice(variables or ['x'])}}}}}", "```"]
+        return body
+
+    out = [
+        "---",
+        f"name: generated-{index}",
+        f"description: Generated benchmark prompt {index}",
+        'version: "1.0"',
+        "tags: [bench]",
+        "---",
+        "",
+        heading("Role"),
+        *prose(2),
+        "",
+        heading("Input"),
+    ]
+    for name in variables:
+        required = "required" if rng.random() < 0.6 else "optional"
+        out.append(
+            f"- `{name}`: {rng.choice(_TYPES)} ({required}) - {' '.join(rng.sample(_WORDS, 4))}"
+        )
+    out += ["", heading("Output")]
+    out += [f"- **{name}**: {' '.join(rng.sample(_WORDS, 5))}" for name in fields]
+    out += ["", heading("Steps"), *[f"{i + 1}. {line}" for i, line in enumerate(prose(6, True))]]
+    for i in range(spec.extra_sections):
+        out += ["", heading(_OPTIONAL[i % len(_OPTIONAL)]), *prose(3)]
+    out += ["", heading("Examples"), *prose(spec.examples_lines)]
+    return "\n".join(out) + "\n"
+
+
+def write_corpus(spec: CorpusSpec, directory: str | Path) -> list[Path]:
+    """Write the corpus to ``directory`` and return the file paths in order."""
+    root = Path(directory)
+    root.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for index in range(spec.files):
+        path = root / f"prompt_{index:05d}.prompt.md"
+        path.write_text(generate_document(spec, index), encoding="utf-8")
+        paths.append(path)
+    return paths
@@ -0,0 +1,302 @@
+"""Benchmark harness: throughput and peak memory of the main code paths.
+
+The CLI imports this module for its benchmark names, so modules only needed
+while benchmarking are imported where they are used.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import time
+from collections.abc import Callable, Sequence
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from prompt_lint import __version__
+from prompt_lint.bench import BENCHMARKS as BENCHMARKS
+
+if TYPE_CHECKING:
+    from prompt_lint.models import PromptDocument
+
+# Regressions smaller than this fraction are treated as noise
+DEFAULT_THRESHOLD = 0.10
+
+RESULTS_FORMAT_VERSION = 1
+
+
+@dataclass
+class BenchResult:
+    """Timing of one benchmark over the whole corpus."""
+
+    name: str
+    # Operations per run, e.g. files parsed or hover requests
+    ops: int
+    # Best wall time of one run over all repeats
+    seconds: float
+    # Peak traced allocation during one run; None where it cannot be traced
+    peak_memory: int | None
+
+    @property
+    def ops_per_sec(self) -> float:
+        return self.ops / self.seconds if self.seconds > 0 else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        data = asdict(self)
+        data["ops_per_sec"] = self.ops_per_sec
+        data["mean_latency_ms"] = self.seconds / self.ops * 1000 if self.ops else 0.0
+        return data
+
+
+@dataclass
+class _Case:
+    ops: int
+    run: Callable[[], object]
+    # Runs before each timed run, untimed
+    setup: Callable[[], object] | None = None
+    trace_memory: bool = True
+
+
+def _time(case: _Case, repeat: int) -> tuple[float, int | None]:
+    import tracemalloc
+
+    best = float("inf")
+    for _ in range(repeat):
+        if case.setup is not None:
+            case.setup()
+        started = time.perf_counter()
+        case.run()
+        best = min(best, time.perf_counter() - started)
+
+    peak = None
+    if case.trace_memory:
+        if case.setup is not None:
+            case.setup()
+        tracemalloc.start()
+        try:
+            case.run()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return best, peak
+
+
+def _cases(
+    paths: Sequence[str], sources: Sequence[str], selected: set[str], cli_targets: Sequence[str]
+) -> dict[str, _Case]:
+    from prompt_lint.parser import parse
+    from prompt_lint.validator import validate
+
+    cases: dict[str, _Case] = {}
+    docs: list[PromptDocument] = []
+
+    def parse_all() -> None:
+        docs[:] = [parse(source, path) for path, source in zip(paths, sources)]
+
+    if "parse" in selected:
+        cases["parse"] = _Case(len(sources), parse_all)
+    if "validate" in selected:
+        # Fresh documents each run, so lazily built indexes are part of the cost
+        cases["validate"] = _Case(
+            len(sources), lambda: [validate(doc) for doc in docs], setup=parse_all
+        )
+    for name, lean in (("load", False), ("load_lean", True)):
+        if name in selected:
+            cases[name] = _Case(len(paths), _load(paths, lean))
+    if "cli" in selected:
+        import subprocess
+
+        command = [
+            sys.executable,
+            "-m",
+            "prompt_lint",
+            "lint",
+            "--no-cache",
+            "-j",
+            "1",
+            *cli_targets,
+        ]
+        cases["cli"] = _Case(
+            len(paths),
+            lambda: subprocess.run(command, stdout=subprocess.DEVNULL, check=False),
+            trace_memory=False,
+        )
+
+    lsp = {"lsp_diagnostics", "lsp_hover", "lsp_completions"} & selected
+    if lsp:
+        try:
+            from prompt_lint.lsp import server
+        except ImportError:
+            # The LSP extra is not installed
+            return cases
+        cases.update(_lsp_cases(server, paths, sources, lsp))
+    return cases
+
+
+def _load(paths: Sequence[str], lean: bool) -> Callable[[], list[PromptDocument]]:
+    from prompt_lint.parser import parse_file
+
+    def run() -> list[PromptDocument]:
+        loaded = []
+        for path in paths:
+            doc = parse_file(path)
+            if lean:
+                doc.drop_source()
+            loaded.append(doc)
+        return loaded
+
+    return run
+
+
+def _lsp_cases(
+    server: Any, paths: Sequence[str], sources: Sequence[str], selected: set[str]
+) -> dict[str, _Case]:
+    from prompt_lint.lsp.cache import DocumentCache
+    from prompt_lint.parser import VAR_REFERENCE_RE
+
+    uris = [Path(p).resolve().as_uri() for p in paths]
+    lines = [source.split("\n") for source in sources]
+    # Large enough to keep every document open, like an editor with the corpus loaded
+    cache = DocumentCache(maxsize=max(len(sources), 1))
+    cases: dict[str, _Case] = {}
+
+    def with_cache(run: Callable[[], None]) -> Callable[[], None]:
+        def wrapped() -> None:
+            saved = server.document_cache
+            server.document_cache = cache
+            try:
+                run()
+            finally:
+                server.document_cache = saved
+
+        return wrapped
+
+    @with_cache
+    def diagnostics() -> None:
+        for uri, path, source in zip(uris, paths, sources):
+            server.build_diagnostics(source, path, uri=uri, version=1)
+
+    def warm() -> None:
+        cache.clear()
+        diagnostics()
+
+    if "lsp_diagnostics" in selected:
+        cases["lsp_diagnostics"] = _Case(len(sources), diagnostics, setup=cache.clear)
+
+    if "lsp_hover" in selected:
+        # One hover per {{reference}}, on documents already open in the cache
+        targets = [
+            (i, n, match.start() + 2)
+            for i, doc_lines in enumerate(lines)
+            for n, line in enumerate(doc_lines)
+            for match in VAR_REFERENCE_RE.finditer(line)
+        ]
+
+        @with_cache
+        def hover() -> None:
+            for i, n, character in targets:
+                server.compute_hover(sources[i], lines[i], n, character, uri=uris[i], version=1)
+
+        cases["lsp_hover"] = _Case(len(targets), hover, setup=warm)
+
+    if "lsp_completions" in selected:
+        completion_lines = [doc_lines + ["{{"] for doc_lines in lines]
+
+        @with_cache
+        def completions() -> None:
+            for i, doc_lines in enumerate(completion_lines):
+                server.compute_completions(
+                    sources[i], doc_lines, len(doc_lines) - 1, 2, uri=uris[i], version=1
+                )
+
+        cases["lsp_completions"] = _Case(len(sources), completions, setup=warm)
+    return cases
+
+
+def run_benchmarks(
+    paths: Sequence[str | Path],
+    benchmarks: Sequence[str] = BENCHMARKS,
+    repeat: int = 3,
+    corpus: dict[str, Any] | None = None,
+    cli_targets: Sequence[str] | None = None,
+) -> dict[str, Any]:
+    """Run ``benchmarks`` over the files at ``paths`` and return a JSON-ready report.
+
+    Each benchmark is timed ``repeat`` times and the best run is kept; peak
+    memory comes from one extra run under ``tracemalloc``. The ``cli``
+    benchmark runs ``prompt-lint lint`` in a subprocess on ``cli_targets``
+    (default: ``paths``), so it includes interpreter startup. LSP benchmarks
+    are skipped when the ``lsp`` extra is not installed.
+    """
+    import platform
+
+    str_paths = [str(p) for p in paths]
+    sources = [Path(p).read_text(encoding="utf-8") for p in str_paths]
+    targets = list(cli_targets) if cli_targets is not None else str_paths
+    results = []
+    for name, case in _cases(str_paths, sources, set(benchmarks), targets).items():
+        seconds, peak = _time(case, repeat)
+        results.append(BenchResult(name, case.ops, seconds, peak))
+
+    return {
+        "format": RESULTS_FORMAT_VERSION,
+        "prompt_lint": __version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "corpus": {
+            **(corpus or {}),
+            "files": len(sources),
+            "bytes": sum(len(s.encode("utf-8")) for s in sources),
+        },
+        "benchmarks": {r.name: r.to_dict() for r in results},
+    }
+
+
+def compare(
+    current: dict[str, Any], baseline: dict[str, Any], threshold: float = DEFAULT_THRESHOLD
+) -> list[str]:
+    """List the benchmarks that regressed against ``baseline``.
+
+    A benchmark regresses when its throughput drops, or its peak memory grows,
+    by more than ``threshold`` (a fraction). Benchmarks missing from either
+    report are ignored.
+    """
+    regressions = []
+    for name, result in current.get("benchmarks", {}).items():
+        base = baseline.get("benchmarks", {}).get(name)
+        if base is None:
+            continue
+        if result["ops_per_sec"] < base["ops_per_sec"] * (1 - threshold):
+            regressions.append(
+                f"{name}: throughput {result['ops_per_sec']:,.0f}/s "
+                f"vs {base['ops_per_sec']:,.0f}/s baseline"
+            )
+        if (
+            result.get("peak_memory") is not None
+            and base.get("peak_memory") is not None
+            and result["peak_memory"] > base["peak_memory"] * (1 + threshold)
+        ):
+            regressions.append(
+                f"{name}: peak memory {result['peak_memory']:,} B "
+                f"vs {base['peak_memory']:,} B baseline"
+            )
+    return regressions
+
+
+def format_report(report: dict[str, Any]) -> str:
+    """Render a report as a text table."""
+    corpus = report["corpus"]
+    rows = [
+        f"{corpus['files']} files, {corpus['bytes']:,} bytes",
+        "",
+        f"{'benchmark':<18}{'ops':>8}{'ops/s':>12}{'mean ms':>10}{'peak MiB':>10}",
+    ]
+    for name, r in report["benchmarks"].items():
+        peak = f"{r['peak_memory'] / 2**20:.1f}" if r["peak_memory"] is not None else "-"
+        rows.append(
+            f"{name:<18}{r['ops']:>8}{r['ops_per_sec']:>12,.0f}"
+            f"{r['mean_latency_ms']:>10.3f}{peak:>10}"
+        )
+    return "\n".join(rows)
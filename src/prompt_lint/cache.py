@@ -0,0 +1,438 @@
+"""Persistent on-disk cache of lint results.
+
+Results are stored as content-addressed entries under a namespace derived from
+the prompt-lint version and the active rule set, so a cache directory can be
+shared between machines (e.g. as a CI artifact) and never serves results
+produced by different rules. The most recently used namespaces are kept, so
+runs with different ``--select`` options or versions can share a directory.
+A per-directory index of ``(mtime, size)`` lets unchanged files be answered
+with a single ``stat`` call.
+
+The cache directory is marked with a ``CACHEDIR.TAG`` file when created. A
+non-empty directory without that marker is never used, and only namespace
+directories are ever removed from it.
+
+Results of rules that look at other files, such as links checked by R006,
+also record the paths they looked up relative to the linted file. A cached
+result is only served while those paths still resolve the same way, which
+is checked against the run's :mod:`prompt_lint.fscache` listings. Likewise,
+results of documents with include directives record the content key of each
+included file, and are only served while every included file is unchanged.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any
+
+from prompt_lint import __version__, fscache, includes
+from prompt_lint.discovery import DEFAULT_CACHE_DIR as DEFAULT_CACHE_DIR
+from prompt_lint.models import Diagnostic, Position, Severity
+from prompt_lint.rules import RuleBase, get_registry
+
+# Bump when the entry or index layout changes
+CACHE_FORMAT_VERSION = 3
+
+# Namespaces kept in one cache directory, least recently used removed first
+MAX_NAMESPACES = 8
+
+_INDEX_FILE = "index.json"
+_TAG_FILE = "CACHEDIR.TAG"
+_TAG = (
+    "Signature: 8a477f597d28d172789f06886806bc55\n"
+    "# This file is a cache directory tag created by prompt-lint.\n"
+)
+_NAMESPACE = re.compile(r"[0-9a-f]{16}")
+
+
+class CacheDirectoryError(Exception):
+    """Raised when the cache directory is not one prompt-lint created."""
+
+
+def content_key(content: str) -> str:
+    """Return the content address of a file's text."""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def rules_fingerprint(rules: Sequence[RuleBase]) -> str:
+    """Identify a prompt-lint version and rule set for cache namespacing.
+
+    Plugin rules are identified with the version of the package providing
+    them, so upgrading a plugin does not serve results of its old version.
+    """
+    providers = get_registry().providers
+    parts = [f"format={CACHE_FORMAT_VERSION}", f"prompt-lint={__version__}"]
+    for rule in sorted(rules, key=lambda r: r.rule_id):
+        cls = type(rule)
+        part = f"{rule.rule_id}={cls.__module__}.{cls.__qualname__}"
+        provider = providers.get(rule.rule_id)
+        parts.append(f"{part}@{provider}" if provider is not None else part)
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+def _dump_diagnostics(diagnostics: Sequence[Diagnostic]) -> list[dict[str, Any]]:
+    return [
+        {
+            "rule_id": d.rule_id,
+            "severity": d.severity.value,
+            "message": d.message,
+            "line": d.position.line,
+            "column": d.position.column,
+        }
+        for d in diagnostics
+    ]
+
+
+def _load_diagnostics(data: list[dict[str, Any]], path: str) -> list[Diagnostic]:
+    return [
+        Diagnostic(
+            rule_id=sys.intern(d["rule_id"]),
+            severity=Severity(d["severity"]),
+            message=d["message"],
+            position=Position(line=d["line"], column=d["column"]),
+            path=path,
+        )
+        for d in data
+    ]
+
+
+# A dependency as stored: [path relative to the linted file's directory,
+# true if it exists as written, null if it is missing, or its relative
+# spelling on disk if only the case differs]
+StoredDependency = list[Any]
+
+
+def _relative_dependencies(
+    dependencies: Sequence[fscache.Dependency], path: str
+) -> list[StoredDependency]:
+    """Express looked-up paths relative to the directory of ``path``."""
+    base = os.path.dirname(os.path.abspath(path))
+    stored = []
+    # A link repeated in one file is looked up, and recorded, every time
+    for looked_up, found in dict.fromkeys(dependencies):
+        state: bool | str | None = found
+        if found == looked_up:
+            state = True
+        elif found is not None:
+            state = os.path.relpath(found, base)
+        stored.append([os.path.relpath(looked_up, base), state])
+    return stored
+
+
+def _dependencies_hold(dependencies: list[StoredDependency], path: str) -> bool:
+    """Whether every recorded path still resolves as it did, seen from ``path``."""
+    if not dependencies:
+        return True
+    fs = fscache.current()
+    base = os.path.dirname(os.path.abspath(path))
+    for looked_up, state in dependencies:
+        resolved, found = fs.resolve_in(base, looked_up)
+        if found is None:
+            if state is not None:
+                return False
+        elif found == resolved:
+            if state is not True:
+                return False
+        elif not isinstance(state, str) or found != os.path.normpath(os.path.join(base, state)):
+            return False
+    return True
+
+
+# An included file as stored: [path relative to the linted file's directory,
+# content key, or null if it could not be read]
+StoredInclude = list[Any]
+
+
+def _relative_includes(
+    dependencies: Sequence[includes.IncludeDependency], path: str
+) -> list[StoredInclude]:
+    base = os.path.dirname(os.path.abspath(path))
+    return [[os.path.relpath(included, base), key] for included, key in dependencies]
+
+
+def _includes_hold(stored: list[StoredInclude], path: str) -> bool:
+    """Whether every included file still has the content it was linted with."""
+    if not stored:
+        return True
+    cache = includes.current()
+    base = os.path.dirname(os.path.abspath(path))
+    return all(
+        cache.key(os.path.normpath(os.path.join(base, included))) == key for included, key in stored
+    )
+
+
+def _write_atomic(path: Path, data: Any) -> None:
+    """Write JSON so concurrent readers never observe a partial file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-", suffix=".json")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+class ResultCache:
+    """Lint results cached on disk for one rule set.
+
+    Typical use for each file::
+
+        diagnostics = cache.lookup(path)
+        if diagnostics is None:
+            content = read(path)
+            key = content_key(content)
+            diagnostics = cache.load(key, path)
+            if diagnostics is None:
+                diagnostics, dependencies, included = lint(content)
+            cache.store(key, path, diagnostics, dependencies, included)
+
+    Call :meth:`save` once at the end of the run to persist the index and
+    prune stale entries.
+
+    Raises OSError if the cache directory cannot be created. Later write
+    failures do not raise: the first one is kept in :attr:`write_error`, and
+    nothing more is written.
+    """
+
+    def __init__(self, directory: str | os.PathLike[str], rules: Sequence[RuleBase]) -> None:
+        self.root = Path(directory)
+        self.namespace = rules_fingerprint(rules)
+        self.directory = self.root / self.namespace
+        self.write_error: OSError | None = None
+        # path -> [mtime_ns, size, key, diagnostic count, dependencies, includes]
+        self._index: dict[str, list[Any]] = self._read_index()
+        self._stats: dict[str, os.stat_result] = {}
+        # key -> serialized entry, so identical files are linted once per run
+        self._memory: dict[str, dict[str, Any]] = {}
+        self._used_keys: set[str] = set()
+        self._dirty = False
+
+    def lookup(self, path: str) -> list[Diagnostic] | None:
+        """Return cached diagnostics if ``path`` is unchanged since it was cached.
+
+        Only ``stat`` is called, plus directory listings for results that
+        depend on other paths and a read of each included file (once per
+        run); files recorded without diagnostics need no further I/O.
+        """
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        self._stats[path] = st
+
+        record = self._index.get(path)
+        if record is None or record[0] != st.st_mtime_ns or record[1] != st.st_size:
+            return None
+        key, count = record[2], record[3]
+        try:
+            if not _dependencies_hold(record[4], path) or not _includes_hold(record[5], path):
+                return None
+        except (IndexError, TypeError, ValueError):
+            return None
+        self._used_keys.add(key)
+        if count == 0:
+            return []
+        entry = self._entry(key)
+        return self._diagnostics(entry, path) if entry is not None else None
+
+    def load(self, key: str, path: str) -> list[Diagnostic] | None:
+        """Return cached diagnostics for file content ``key``, reported at ``path``."""
+        entry = self._entry(key)
+        if entry is None:
+            return None
+        try:
+            if not _dependencies_hold(entry.get("dependencies", []), path):
+                return None
+            if not _includes_hold(entry.get("includes", []), path):
+                return None
+        except (TypeError, ValueError):
+            return None
+        self._used_keys.add(key)
+        return self._diagnostics(entry, path)
+
+    def _entry(self, key: str) -> dict[str, Any] | None:
+        entry = self._memory.get(key)
+        if entry is None:
+            try:
+                with open(self._entry_path(key), encoding="utf-8") as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                return None
+            if not isinstance(entry, dict) or "diagnostics" not in entry:
+                return None
+            self._memory[key] = entry
+        return entry
+
+    @staticmethod
+    def _diagnostics(entry: dict[str, Any], path: str) -> list[Diagnostic] | None:
+        try:
+            return _load_diagnostics(entry["diagnostics"], path)
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def store(
+        self,
+        key: str,
+        path: str,
+        diagnostics: Sequence[Diagnostic],
+        dependencies: Sequence[fscache.Dependency] = (),
+        included: Sequence[includes.IncludeDependency] = (),
+    ) -> None:
+        """Record the diagnostics for ``path`` whose content hashes to ``key``.
+
+        ``dependencies`` are the paths looked up while linting it, see
+        :meth:`prompt_lint.fscache.FileSystemCache.recording`, and
+        ``included`` the files its include directives read.
+        """
+        relative = _relative_dependencies(dependencies, path)
+        relative_includes = _relative_includes(included, path)
+        if key not in self._memory:
+            entry: dict[str, Any] = {"diagnostics": _dump_diagnostics(diagnostics)}
+            if relative:
+                entry["dependencies"] = relative
+            if relative_includes:
+                entry["includes"] = relative_includes
+            self._memory[key] = entry
+            if self.write_error is None and (len(entry) > 1 or entry["diagnostics"]):
+                if not self._entry_path(key).exists():
+                    try:
+                        _write_atomic(self._entry_path(key), entry)
+                    except OSError as e:
+                        self.write_error = e
+        self._used_keys.add(key)
+
+        st = self._stats.get(path)
+        if st is None:
+            try:
+                st = os.stat(path)
+            except OSError:
+                return
+        self._index[path] = [
+            st.st_mtime_ns,
+            st.st_size,
+            key,
+            len(diagnostics),
+            relative,
+            relative_includes,
+        ]
+        self._dirty = True
+
+    def save(self) -> None:
+        """Persist the index and prune entries and namespaces that can no longer be hit."""
+        # Forget files that were not linted this run and no longer exist
+        for path in [p for p in self._index if p not in self._stats]:
+            if not os.path.exists(path):
+                del self._index[path]
+                self._dirty = True
+
+        if self.write_error is not None:
+            return
+        if self._dirty:
+            try:
+                _write_atomic(
+                    self.directory / _INDEX_FILE,
+                    {"format": CACHE_FORMAT_VERSION, "files": self._index},
+                )
+            except OSError as e:
+                self.write_error = e
+                return
+            self._dirty = False
+            # Entries only become unreachable when the index changes
+            self._prune_entries()
+        try:
+            # Mark the namespace as used, for _prune_namespaces
+            os.utime(self.directory)
+        except OSError:
+            pass
+        self._prune_namespaces()
+
+    def _prune_namespaces(self) -> None:
+        """Remove the least recently used namespaces beyond ``MAX_NAMESPACES``.
+
+        Other directories, which the cache did not create, are left alone.
+        """
+        try:
+            children = [
+                child
+                for child in os.scandir(self.root)
+                if child.name != self.namespace
+                and _NAMESPACE.fullmatch(child.name)
+                and child.is_dir(follow_symlinks=False)
+            ]
+        except OSError:
+            return
+        if len(children) < MAX_NAMESPACES:
+            return
+
+        def last_used(child: os.DirEntry[str]) -> float:
+            try:
+                return child.stat(follow_symlinks=False).st_mtime
+            except OSError:
+                return 0.0
+
+        children.sort(key=last_used, reverse=True)
+        for child in children[MAX_NAMESPACES - 1 :]:
+            shutil.rmtree(child.path, ignore_errors=True)
+
+    def _prune_entries(self) -> None:
+        """Remove entries that no indexed file refers to."""
+        live = self._used_keys | {record[2] for record in self._index.values()}
+        try:
+            buckets = [b for b in os.scandir(self.directory) if b.is_dir()]
+        except OSError:
+            return
+        for bucket in buckets:
+            for entry in os.scandir(bucket.path):
+                if entry.name.endswith(".json") and entry.name[:-5] not in live:
+                    try:
+                        os.unlink(entry.path)
+                    except OSError:
+                        pass
+
+    def _entry_path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def _read_index(self) -> dict[str, list[Any]]:
+        self._init_directory()
+        try:
+            with open(self.directory / _INDEX_FILE, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("format") != CACHE_FORMAT_VERSION:
+            return {}
+        files = data.get("files")
+        return files if isinstance(files, dict) else {}
+
+    def _init_directory(self) -> None:
+        """Create the cache directory, marking it as a cache for other tools.
+
+        Raises CacheDirectoryError if it exists, is not empty and was not
+        created by prompt-lint, as saving would prune its contents.
+        """
+        try:
+            if (self.root / _TAG_FILE).read_text(encoding="utf-8") == _TAG:
+                return
+        except (OSError, UnicodeDecodeError):
+            pass
+        if self.root.is_dir() and any(self.root.iterdir()):
+            raise CacheDirectoryError(
+                f"Cache directory {str(self.root)!r} is not empty and was not "
+                "created by prompt-lint"
+            )
+        self.root.mkdir(parents=True, exist_ok=True)
+        (self.root / ".gitignore").write_text("# Created by prompt-lint\n*\n", encoding="utf-8")
+        (self.root / _TAG_FILE).write_text(_TAG, encoding="utf-8")
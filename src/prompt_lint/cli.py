@@ -2,28 +2,35 @@
 
 from __future__ import annotations
 
+import os
 import sys
-from pathlib import Path
+import time
+from collections.abc import Generator, Iterable, Iterator, Sequence
+from contextlib import closing, nullcontext
+from typing import TYPE_CHECKING
 
 import click
 
-from prompt_lint import __version__
+from prompt_lint import __version__, discovery, profiling
+from prompt_lint.bench import BENCHMARKS as BENCHMARK_NAMES
+from prompt_lint.client import DEFAULT_IDLE_TIMEOUT
+from prompt_lint.discovery import DEFAULT_CACHE_DIR
+from prompt_lint.formatters import FORMATTERS
 from prompt_lint.models import Severity
-from prompt_lint.parser import parse_file
-from prompt_lint.validator import validate
+from prompt_lint.rules import RuleBase, get_all_rules, get_registry, select_rules
 
+# The parser, runner, result cache and git are imported by the commands that
+# use them, so `--version`, `--help` and the daemon client do not load them.
+# The client is the entry point, so importing it here costs nothing.
+if TYPE_CHECKING:
+    from prompt_lint import git
+    from prompt_lint.runner import LintResult
 
-def _format_diagnostic(diag: object) -> str:
-    """Format a diagnostic for terminal output."""
-    from prompt_lint.models import Diagnostic
 
-    assert isinstance(diag, Diagnostic)
-    severity_str = diag.severity.value
-    path = diag.path or "<stdin>"
-    return (
-        f"{path}:{diag.position.line}:{diag.position.column}: "
-        f"{diag.rule_id} {severity_str}: {diag.message}"
-    )
+def _split_selectors(
+    ctx: click.Context, param: click.Parameter, value: tuple[str, ...]
+) -> list[str]:
+    return [part for item in value for part in item.split(",") if part.strip()]
 
 
 @click.group()
@@ -33,47 +40,585 @@ def main() -> None:
 
 
 @main.command()
-@click.argument("files", nargs=-1, required=True, type=click.Path(exists=True))
-def lint(files: tuple[str, ...]) -> None:
-    """Lint one or more .prompt.md files."""
-    total_errors = 0
-    total_warnings = 0
+@click.argument("files", nargs=-1, type=click.Path(exists=True))
+@click.option(
+    "--changed-since",
+    metavar="REV",
+    help="Only lint prompt files changed since the merge base of REV and HEAD.",
+)
+@click.option(
+    "--staged",
+    is_flag=True,
+    help="Only lint staged prompt files, as they are in the git index.",
+)
+@click.option(
+    "--diff-lines-only",
+    is_flag=True,
+    help="Only report diagnostics on lines changed (with --changed-since or --staged).",
+)
+@click.option(
+    "--exclude",
+    multiple=True,
+    metavar="GLOB",
+    help="Skip files and directories matching GLOB when searching directories (repeatable).",
+)
+@click.option(
+    "--respect-gitignore",
+    is_flag=True,
+    help="Skip files and directories ignored by .gitignore when searching directories.",
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False),
+    default=DEFAULT_CACHE_DIR,
+    show_default=True,
+    help="Directory for cached lint results.",
+)
+@click.option("--no-cache", is_flag=True, help="Do not read or write the result cache.")
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Number of worker processes (default: CPU count). 1 lints in-process.",
+)
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(sorted(FORMATTERS)),
+    default="text",
+    show_default=True,
+    help="Output format. jsonl streams one JSON object per diagnostic.",
+)
+@click.option(
+    "--select",
+    multiple=True,
+    callback=_split_selectors,
+    help="Only run rules whose ID starts with one of these (comma-separated, repeatable).",
+)
+@click.option(
+    "--ignore",
+    multiple=True,
+    callback=_split_selectors,
+    help="Skip rules whose ID starts with one of these (comma-separated, repeatable).",
+)
+@click.option(
+    "--fail-fast",
+    is_flag=True,
+    help="Stop at the first file with errors, cancelling the files not yet linted.",
+)
+@click.option(
+    "--max-diagnostics",
+    type=click.IntRange(min=0),
+    default=None,
+    metavar="N",
+    help="Show at most N diagnostics, and stop linting once the exit status is known.",
+)
+@click.option(
+    "--daemon/--no-daemon",
+    envvar="PROMPT_LINT_DAEMON",
+    default=False,
+    help="Lint in a background daemon, started on demand, to skip startup costs.",
+)
+@click.option(
+    "--profile", is_flag=True, help="Report time per phase, rule and slowest file on stderr."
+)
+@click.option(
+    "--profile-format",
+    type=click.Choice(["text", "json"]),
+    default="text",
+    show_default=True,
+    help="Format of the --profile report.",
+)
+@click.option(
+    "--profile-top",
+    type=click.IntRange(min=0),
+    default=profiling.DEFAULT_TOP_FILES,
+    show_default=True,
+    help="Number of slowest files listed by --profile.",
+)
+def lint(
+    files: tuple[str, ...],
+    changed_since: str | None,
+    staged: bool,
+    diff_lines_only: bool,
+    exclude: tuple[str, ...],
+    respect_gitignore: bool,
+    cache_dir: str,
+    no_cache: bool,
+    jobs: int | None,
+    output_format: str,
+    select: list[str],
+    ignore: list[str],
+    fail_fast: bool,
+    max_diagnostics: int | None,
+    daemon: bool,
+    profile: bool,
+    profile_format: str,
+    profile_top: int,
+) -> None:
+    """Lint one or more .prompt.md files.
+
+    With --changed-since or --staged, FILES default to the current directory
+    and only the changed prompt files below them are linted.
+    """
+    # --daemon is handled by prompt_lint.client before the CLI is imported;
+    # here the files are linted in-process: in the daemon, or as a fallback
+    use_git = changed_since is not None or staged
+    if not files and not use_git:
+        raise click.UsageError("Missing argument 'FILES...'.")
+    if diff_lines_only and not use_git:
+        raise click.UsageError("--diff-lines-only requires --changed-since or --staged.")
+    for error in get_registry().errors:
+        click.echo(f"Warning: {error}", err=True)
+    try:
+        rules = select_rules(get_all_rules(), select, ignore)
+    except ValueError as e:
+        raise click.UsageError(str(e)) from None
+
+    profiler = profiling.Profiler(top_files=profile_top) if profile else None
+    with profiling.profile(profiler) if profiler is not None else nullcontext():
+        changes = None
+        if use_git:
+            from prompt_lint import git
+
+            started = time.perf_counter()
+            try:
+                changes = git.collect_changes(
+                    files or (".",), changed_since, staged, lines=diff_lines_only
+                )
+            except git.GitError as e:
+                raise click.UsageError(str(e)) from None
+            if exclude or respect_gitignore:
+                changes.keep(
+                    _not_excluded(changes.files, files or (".",), exclude, respect_gitignore)
+                )
+            if profiler is not None:
+                profiler.record("discover", time.perf_counter() - started)
+        targets = (
+            changes.files
+            if changes is not None
+            else _timed_discovery(
+                discovery.iter_prompt_files(files, exclude, gitignore=respect_gitignore)
+            )
+        )
+        failed = _run(
+            targets,
+            rules,
+            cache_dir,
+            no_cache,
+            jobs,
+            output_format,
+            changes,
+            diff_lines_only,
+            fail_fast=fail_fast,
+            max_diagnostics=max_diagnostics,
+        )
 
-    for file_path in files:
-        path = Path(file_path)
+    if profiler is not None:
+        if profile_format == "json":
+            import json
 
-        # Expand directories
-        if path.is_dir():
-            targets = list(path.rglob("*.prompt.md"))
+            click.echo(json.dumps(profiler.to_dict(), indent=2), err=True)
         else:
-            targets = [path]
+            click.echo(profiler.format_text(), err=True)
+
+    if failed:
+        sys.exit(1)
+
+
+def _not_excluded(
+    paths: list[str], targets: Sequence[str], exclude: Sequence[str], gitignore: bool
+) -> Iterator[str]:
+    """The changed ``paths`` that discovery would have found under ``targets``.
+
+    Like discovery, files given explicitly are kept whatever their name.
+    """
+    explicit = {os.path.abspath(t) for t in targets if not os.path.isdir(t)}
+    directories = [os.path.abspath(t) for t in targets if os.path.isdir(t)]
+    for path in paths:
+        absolute = os.path.abspath(path)
+        if absolute in explicit:
+            yield path
+            continue
+        # Patterns with a slash match relative to the directory given, so
+        # the innermost directory containing the file is the one searched
+        containing = [d for d in directories if absolute.startswith(d.rstrip(os.sep) + os.sep)]
+        directory = max(containing, key=len) if containing else os.path.dirname(absolute)
+        if not discovery.is_excluded(absolute, directory, exclude, gitignore):
+            yield path
+
 
-        for target in targets:
+def _timed_discovery(paths: Iterator[str]) -> Iterator[str]:
+    """Pass ``paths`` through, recording the time spent finding them when profiling."""
+    profiler = profiling.active
+    if profiler is None:
+        yield from paths
+        return
+    spent = 0.0
+    try:
+        while True:
+            started = time.perf_counter()
             try:
-                doc = parse_file(str(target))
-            except Exception as e:
-                click.echo(f"{target}: Failed to parse: {e}", err=True)
+                path = next(paths)
+            except StopIteration:
+                return
+            finally:
+                spent += time.perf_counter() - started
+            yield path
+    finally:
+        profiler.record("discover", spent)
+
+
+def _run(
+    targets: Iterable[str],
+    rules: list[RuleBase],
+    cache_dir: str,
+    no_cache: bool,
+    jobs: int | None,
+    output_format: str,
+    changes: git.ChangeSet | None = None,
+    diff_lines_only: bool = False,
+    fail_fast: bool = False,
+    max_diagnostics: int | None = None,
+) -> bool:
+    """Lint ``targets``, or the staged files in ``changes``, and write the results.
+
+    Returns whether any file had errors. With ``fail_fast`` linting stops
+    after the first such file. Past ``max_diagnostics`` nothing more is
+    written, and linting continues only until an error settles the result.
+    A file that could not be linted counts as one diagnostic.
+    """
+    from dataclasses import replace
+
+    from prompt_lint.cache import CacheDirectoryError, ResultCache
+    from prompt_lint.runner import LintResult, default_jobs, lint_source, run_lint
+
+    total_errors = 0
+    total_warnings = 0
+    failed = False
+    # Set when results were cut short, to say so after the output
+    stopped: str | None = None
+    profiler = profiling.active
+    try:
+        cache = None if no_cache else ResultCache(cache_dir, rules)
+    except CacheDirectoryError as e:
+        raise click.UsageError(f"{e}; choose another --cache-dir.") from None
+    except OSError as e:
+        click.echo(f"Warning: Cannot use the result cache: {e}", err=True)
+        cache = None
+    formatter = FORMATTERS[output_format](
+        click.echo, lambda message: click.echo(message, err=True), rules
+    )
+
+    results: Generator[LintResult, None, None]
+    if changes is not None and changes.contents is not None:
+        # Staged content is not on disk, so it is linted without the cache
+        contents = changes.contents
+        results = (
+            LintResult(path, error=f"Failed to parse: {text}")
+            if isinstance(text, UnicodeDecodeError)
+            else lint_source(text, path, rules)
+            for path, text in contents.items()
+        )
+    else:
+        results = run_lint(targets, rules, jobs=jobs or default_jobs(), cache=cache)
+
+    # Closed as soon as the loop stops, which cancels work queued for the workers
+    with closing(results):
+        for result in results:
+            if changes is not None and diff_lines_only:
+                result = replace(
+                    result,
+                    diagnostics=[
+                        d
+                        for d in result.diagnostics
+                        if changes.in_changed_lines(result.path, d.position.line)
+                    ],
+                )
+            has_errors = result.error is not None or any(
+                d.severity == Severity.ERROR for d in result.diagnostics
+            )
+            failed = failed or has_errors
+            if max_diagnostics is not None:
+                remaining = max_diagnostics - total_errors - total_warnings
+                if remaining <= 0:
+                    if result.error is not None or result.diagnostics:
+                        stopped = f"Showing the first {max_diagnostics} diagnostic(s)."
+                    if failed:
+                        break
+                    continue
+                if len(result.diagnostics) > remaining:
+                    result = replace(result, diagnostics=result.diagnostics[:remaining])
+                    stopped = f"Showing the first {max_diagnostics} diagnostic(s)."
+
+            if profiler is None:
+                formatter.file(result)
+            else:
+                started = time.perf_counter()
+                formatter.file(result)
+                profiler.record("output", time.perf_counter() - started)
+            if result.error is not None:
                 total_errors += 1
-                continue
-
-            diagnostics = validate(doc)
-
-            for diag in diagnostics:
-                click.echo(_format_diagnostic(diag))
-                if diag.severity == Severity.ERROR:
-                    total_errors += 1
-                else:
-                    total_warnings += 1
-
-    # Summary
-    if total_errors or total_warnings:
-        click.echo()
-        parts = []
-        if total_errors:
-            parts.append(f"{total_errors} error(s)")
-        if total_warnings:
-            parts.append(f"{total_warnings} warning(s)")
-        click.echo(f"Found {', '.join(parts)}.")
-
-    if total_errors > 0:
-        sys.exit(1)
+            else:
+                for diag in result.diagnostics:
+                    if diag.severity == Severity.ERROR:
+                        total_errors += 1
+                    else:
+                        total_warnings += 1
+
+            if fail_fast and has_errors:
+                stopped = f"Stopped at the first file with errors: {result.path}"
+                break
+            if (
+                failed
+                and max_diagnostics is not None
+                and total_errors + total_warnings >= max_diagnostics
+            ):
+                stopped = f"Showing the first {max_diagnostics} diagnostic(s)."
+                break
+
+    if cache is not None:
+        cache.save()
+        if cache.write_error is not None:
+            click.echo(f"Warning: Cannot write the result cache: {cache.write_error}", err=True)
+
+    formatter.finish(total_errors, total_warnings)
+    if stopped is not None:
+        click.echo(stopped, err=True)
+    return failed
+
+
+@main.command()
+@click.argument("files", nargs=-1, required=True, type=click.Path(exists=True))
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Worker processes for the initial run (default: CPU count).",
+)
+@click.option(
+    "--select",
+    multiple=True,
+    callback=_split_selectors,
+    help="Only run rules whose ID starts with one of these (comma-separated, repeatable).",
+)
+@click.option(
+    "--ignore",
+    multiple=True,
+    callback=_split_selectors,
+    help="Skip rules whose ID starts with one of these (comma-separated, repeatable).",
+)
+@click.option("--poll", is_flag=True, help="Poll for changes instead of using inotify.")
+@click.option(
+    "--interval",
+    type=click.FloatRange(min=0.05),
+    default=0.5,
+    show_default=True,
+    help="Seconds between polls with --poll.",
+)
+def watch(
+    files: tuple[str, ...],
+    jobs: int | None,
+    select: list[str],
+    ignore: list[str],
+    poll: bool,
+    interval: float,
+) -> None:
+    """Lint FILES, then re-lint them as they change and show what changed."""
+    from prompt_lint import watch as watch_mode
+    from prompt_lint.formatters import format_text
+    from prompt_lint.runner import default_jobs
+
+    for error in get_registry().errors:
+        click.echo(f"Warning: {error}", err=True)
+    try:
+        rules = select_rules(get_all_rules(), select, ignore)
+    except ValueError as e:
+        raise click.UsageError(str(e)) from None
+
+    session = watch_mode.WatchSession(files, rules)
+    with watch_mode.create_watcher(files, poll, interval) as watcher:
+        # Start watching before the initial run, so no change is missed
+        for result in session.start(jobs or default_jobs()):
+            if result.error is not None:
+                click.echo(f"{result.path}: {result.error}", err=True)
+            for diag in result.diagnostics:
+                click.echo(format_text(diag))
+        method = "polling" if isinstance(watcher, watch_mode.PollingWatcher) else "inotify"
+        click.echo(
+            f"{_summary(*session.totals())} Watching {len(session.results)} file(s) "
+            f"with {method}; press Ctrl+C to stop.",
+            err=True,
+        )
+
+        def report(changes: list[watch_mode.FileChange], seconds: float) -> None:
+            click.echo("")
+            for change in changes:
+                for line in change.removed:
+                    click.echo(f"- {line}")
+                for line in change.added:
+                    click.echo(f"+ {line}")
+            click.echo(
+                f"[{time.strftime('%H:%M:%S')}] {_summary(*session.totals())} "
+                f"Re-linted in {seconds * 1000:.1f} ms.",
+                err=True,
+            )
+
+        try:
+            watch_mode.watch(session, watcher, report)
+        except KeyboardInterrupt:
+            pass
+
+
+@main.command()
+@click.option(
+    "--socket",
+    "socket_path",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="Socket to listen on (default: one per user, version and Python environment).",
+)
+@click.option(
+    "--idle-timeout",
+    type=click.FloatRange(min=0),
+    default=DEFAULT_IDLE_TIMEOUT,
+    show_default=True,
+    help="Exit after this many seconds without requests; 0 never exits.",
+)
+@click.option("--stop", is_flag=True, help="Stop the running daemon instead.")
+def daemon(socket_path: str | None, idle_timeout: float, stop: bool) -> None:
+    """Serve `lint --daemon` requests from a warm process on a Unix socket.
+
+    `prompt-lint lint --daemon` starts it on demand; run it yourself to keep
+    it in the foreground.
+    """
+    import signal
+
+    from prompt_lint import client
+    from prompt_lint.daemon import Daemon
+
+    path = socket_path or client.socket_path()
+    if stop:
+        if not client.stop(path):
+            click.echo("No daemon is running.", err=True)
+        return
+    server = Daemon(path, idle_timeout)
+    try:
+        if not server.bind():
+            click.echo(f"A daemon is already serving {path}.", err=True)
+            return
+    except (OSError, client.DaemonUnavailable) as e:
+        raise click.ClickException(str(e)) from None
+    signal.signal(signal.SIGTERM, lambda *_: server.stop())
+    try:
+        server.warm_up()
+        click.echo(f"Serving on {path}.", err=True)
+        server.serve()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+def _summary(errors: int, warnings: int) -> str:
+    if not errors and not warnings:
+        return "No problems."
+    parts = []
+    if errors:
+        parts.append(f"{errors} error(s)")
+    if warnings:
+        parts.append(f"{warnings} warning(s)")
+    return f"Found {', '.join(parts)}."
+
+
+@main.command()
+@click.argument("files", nargs=-1, type=click.Path(exists=True))
+@click.option(
+    "--files-count",
+    "count",
+    type=click.IntRange(min=1),
+    default=200,
+    show_default=True,
+    help="Files in the generated corpus (ignored when FILES are given).",
+)
+@click.option("--seed", type=int, default=0, show_default=True, help="Corpus generator seed.")
+@click.option(
+    "-b",
+    "--benchmark",
+    "benchmarks",
+    multiple=True,
+    type=click.Choice(BENCHMARK_NAMES),
+    help="Benchmark to run (repeatable; default: all).",
+)
+@click.option(
+    "--repeat",
+    type=click.IntRange(min=1),
+    default=3,
+    show_default=True,
+    help="Timed runs per benchmark; the best is reported.",
+)
+@click.option(
+    "-o",
+    "--output",
+    type=click.Path(dir_okay=False, writable=True),
+    help="Write the results as JSON to this file.",
+)
+@click.option(
+    "--compare",
+    "baseline",
+    type=click.Path(exists=True, dir_okay=False),
+    help="Fail if results regress against this JSON baseline.",
+)
+@click.option(
+    "--threshold",
+    type=click.FloatRange(min=0),
+    default=0.10,
+    show_default=True,
+    help="Allowed regression in throughput or peak memory, as a fraction.",
+)
+def bench(
+    files: tuple[str, ...],
+    count: int,
+    seed: int,
+    benchmarks: tuple[str, ...],
+    repeat: int,
+    output: str | None,
+    baseline: str | None,
+    threshold: float,
+) -> None:
+    """Benchmark prompt-lint on FILES, or on a generated corpus."""
+    import json
+    import tempfile
+    from pathlib import Path
+
+    from prompt_lint.bench import CorpusSpec, compare, format_report, run_benchmarks, write_corpus
+
+    selected = benchmarks or BENCHMARK_NAMES
+    with tempfile.TemporaryDirectory(prefix="prompt-lint-bench-") as tmp:
+        if files:
+            targets = discovery.find_prompt_files(files)
+            report = run_benchmarks(
+                targets, selected, repeat, corpus={"paths": list(files)}, cli_targets=list(files)
+            )
+        else:
+            spec = CorpusSpec(files=count, seed=seed)
+            paths = write_corpus(spec, tmp)
+            report = run_benchmarks(
+                paths, selected, repeat, corpus=spec.to_dict(), cli_targets=[tmp]
+            )
+
+    click.echo(format_report(report))
+    if output:
+        Path(output).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+    if baseline:
+        regressions = compare(
+            report, json.loads(Path(baseline).read_text(encoding="utf-8")), threshold
+        )
+        if regressions:
+            click.echo("", err=True)
+            for regression in regressions:
+                click.echo(f"Regression: {regression}", err=True)
+            sys.exit(1)
@@ -0,0 +1,224 @@
+"""Entry point of the ``prompt-lint`` command, and the client of its lint daemon.
+
+``prompt-lint lint --daemon`` (or any ``lint`` with ``PROMPT_LINT_DAEMON=1``)
+sends its arguments and working directory to a warm ``prompt-lint daemon``
+over a Unix socket and streams the output back, instead of importing the
+linter in a fresh interpreter. The daemon is started on first use and stops
+after a while without requests. If it cannot be reached, the command runs
+in-process as usual.
+
+This module is imported on every invocation, so it only uses the standard
+library modules needed to talk to the daemon; everything else is imported
+once it is known to be needed.
+"""
+
+from __future__ import annotations
+
+import os
+import socket
+import struct
+import sys
+import time
+import zlib
+from collections.abc import Sequence
+
+from prompt_lint import __version__
+
+# See prompt_lint/__init__.py
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import BinaryIO
+
+# Frames in both directions: a kind byte and the payload length
+_HEADER = struct.Struct(">cI")
+
+# Client to daemon: one frame per argument, the working directory and its
+# GIT_* variables, then run
+ARGUMENT = b"a"
+DIRECTORY = b"d"
+ENVIRONMENT = b"v"
+RUN = b"r"
+STOP = b"s"
+# Daemon to client: output, then the exit status
+STDOUT = b"o"
+STDERR = b"e"
+EXIT = b"x"
+
+DAEMON_ENV = "PROMPT_LINT_DAEMON"
+# Directory holding the sockets, default: $XDG_RUNTIME_DIR or the temp directory
+DAEMON_DIR_ENV = "PROMPT_LINT_DAEMON_DIR"
+
+# Seconds without requests after which the daemon exits
+DEFAULT_IDLE_TIMEOUT = 900.0
+
+# Seconds to wait for an auto-started daemon to accept connections
+STARTUP_TIMEOUT = 5.0
+
+
+class DaemonUnavailable(Exception):
+    """The daemon could not be reached, so nothing was linted by it."""
+
+
+def socket_path() -> str:
+    """The socket of the daemon for this prompt-lint version and interpreter.
+
+    Each virtualenv gets its own daemon, so it lints with the rules
+    installed there.
+    """
+    base = os.environ.get(DAEMON_DIR_ENV)
+    if not base:
+        runtime = os.environ.get("XDG_RUNTIME_DIR")
+        if runtime:
+            base = os.path.join(runtime, "prompt-lint")
+        else:
+            import tempfile
+
+            base = os.path.join(tempfile.gettempdir(), f"prompt-lint-{os.getuid()}")
+    interpreter = zlib.crc32(os.fsencode(sys.executable))
+    return os.path.join(base, f"{__version__}-{interpreter:08x}.sock")
+
+
+def ensure_private_directory(directory: str) -> None:
+    """Create ``directory`` for the sockets, refusing one other users can write to."""
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    st = os.stat(directory)
+    if st.st_uid != os.getuid() or st.st_mode & 0o077:
+        raise DaemonUnavailable(f"{directory} is not a private directory")
+
+
+def send_frame(sock: socket.socket, kind: bytes, payload: bytes = b"") -> None:
+    sock.sendall(_HEADER.pack(kind, len(payload)) + payload)
+
+
+def read_frame(stream: BinaryIO) -> tuple[bytes, bytes] | None:
+    """The next frame from ``stream``, or None at the end of the stream."""
+    header = stream.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        return None
+    kind, length = _HEADER.unpack(header)
+    payload = stream.read(length)
+    if len(payload) < length:
+        return None
+    return kind, payload
+
+
+def connect(path: str, timeout: float = 0.0) -> socket.socket | None:
+    """Connect to the daemon at ``path``, retrying for up to ``timeout`` seconds."""
+    deadline = time.monotonic() + timeout
+    while True:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(path)
+            return sock
+        except OSError:
+            sock.close()
+        if time.monotonic() >= deadline:
+            return None
+        time.sleep(0.01)
+
+
+def start_daemon(path: str) -> None:
+    """Start a daemon serving ``path`` in the background, detached from this process."""
+    import subprocess
+
+    ensure_private_directory(os.path.dirname(path))
+    subprocess.Popen(
+        [sys.executable, "-m", "prompt_lint", "daemon", "--socket", path],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+        close_fds=True,
+    )
+
+
+def run(args: Sequence[str], path: str | None = None, autostart: bool = True) -> int:
+    """Run ``prompt-lint ARGS`` in the daemon, writing its output here.
+
+    Returns the exit status. Raises :class:`DaemonUnavailable` if no daemon
+    could be reached, or if the connection was lost before any output
+    arrived, so the command can safely run in-process instead.
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        raise DaemonUnavailable("Unix sockets are not supported here")
+    if path is None:
+        path = socket_path()
+    sock = connect(path)
+    if sock is None and autostart:
+        try:
+            start_daemon(path)
+        except OSError as e:
+            raise DaemonUnavailable(f"Cannot start the daemon: {e}") from None
+        sock = connect(path, STARTUP_TIMEOUT)
+    if sock is None:
+        raise DaemonUnavailable(f"Cannot connect to {path}")
+
+    stdout = sys.stdout.buffer
+    stderr = sys.stderr.buffer
+    received = False
+    with sock, sock.makefile("rb") as stream:
+        try:
+            for arg in args:
+                send_frame(sock, ARGUMENT, os.fsencode(arg))
+            send_frame(sock, DIRECTORY, os.fsencode(os.getcwd()))
+            for name, value in os.environ.items():
+                # e.g. GIT_INDEX_FILE, set by git for hooks
+                if name.startswith("GIT_"):
+                    send_frame(sock, ENVIRONMENT, os.fsencode(f"{name}={value}"))
+            send_frame(sock, RUN)
+            while True:
+                frame = read_frame(stream)
+                if frame is None:
+                    break
+                kind, payload = frame
+                received = True
+                if kind == EXIT:
+                    return int(payload)
+                target = stdout if kind == STDOUT else stderr
+                target.write(payload)
+                target.flush()
+        except OSError:
+            pass
+    if not received:
+        raise DaemonUnavailable("The daemon closed the connection")
+    stderr.write(b"prompt-lint: lost the connection to the daemon\n")
+    return 1
+
+
+def stop(path: str | None = None) -> bool:
+    """Ask the daemon to exit; False if none was running."""
+    sock = connect(path or socket_path())
+    if sock is None:
+        return False
+    with sock:
+        send_frame(sock, STOP)
+        # Wait until the daemon closes the connection
+        sock.recv(1)
+    return True
+
+
+def wants_daemon(args: Sequence[str]) -> bool:
+    """Whether ``prompt-lint ARGS`` should be sent to the daemon."""
+    if not args or args[0] != "lint":
+        return False
+    use = os.environ.get(DAEMON_ENV, "").lower() in ("1", "true", "yes", "on")
+    for arg in args[1:]:
+        if arg == "--":
+            break
+        if arg == "--daemon":
+            use = True
+        elif arg == "--no-daemon":
+            use = False
+    return use
+
+
+def main() -> None:
+    args = sys.argv[1:]
+    if wants_daemon(args):
+        try:
+            sys.exit(run(args))
+        except DaemonUnavailable:
+            pass
+    from prompt_lint.cli import main as cli_main
+
+    cli_main()
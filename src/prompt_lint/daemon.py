@@ -0,0 +1,227 @@
+"""A warm process serving ``prompt-lint lint --daemon`` requests on a Unix socket.
+
+Each request carries the arguments of a ``prompt-lint`` command, the
+client's working directory and its ``GIT_*`` environment. The daemon runs
+the command as the CLI would, with its output sent back as it is written,
+so every option behaves the same as in-process. Imports, rule instances and
+compiled patterns are paid for once; unchanged files are answered from the
+result cache without being read.
+
+Requests are handled one at a time, since each runs in the client's working
+directory. A lock file next to the socket ensures one daemon per socket.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import fcntl
+import io
+import os
+import select
+import socket
+import sys
+import traceback
+from collections.abc import Iterator
+from typing import TYPE_CHECKING
+
+from prompt_lint.client import (
+    ARGUMENT,
+    DEFAULT_IDLE_TIMEOUT,
+    DIRECTORY,
+    ENVIRONMENT,
+    EXIT,
+    RUN,
+    STDERR,
+    STDOUT,
+    STOP,
+    ensure_private_directory,
+    read_frame,
+    send_frame,
+)
+
+if TYPE_CHECKING:
+    from _typeshed import ReadableBuffer
+
+WARMUP_DOCUMENT = "---\nname: warmup\n---\n\n# Steps\nUse {{x}} for **y**, see [a](a.md)\n"
+
+
+class _FrameWriter(io.RawIOBase):
+    """Binary stream sending everything written to it as frames of one kind."""
+
+    def __init__(self, conn: socket.socket, kind: bytes) -> None:
+        self.conn = conn
+        self.kind = kind
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: ReadableBuffer) -> int:
+        payload = bytes(data)
+        send_frame(self.conn, self.kind, payload)
+        return len(payload)
+
+
+def _text_stream(conn: socket.socket, kind: bytes) -> io.TextIOWrapper:
+    return io.TextIOWrapper(
+        io.BufferedWriter(_FrameWriter(conn, kind)), encoding="utf-8", line_buffering=True
+    )
+
+
+class Daemon:
+    """Serves lint requests on the socket at ``path`` until stopped or idle."""
+
+    def __init__(self, path: str, idle_timeout: float | None = DEFAULT_IDLE_TIMEOUT) -> None:
+        self.path = path
+        # None or 0: never exit for being idle
+        self.idle_timeout = idle_timeout or None
+        self._listener: socket.socket | None = None
+        self._lock: io.BufferedWriter | None = None
+        self._stopping = False
+        # Written to by stop(), so a waiting select() returns
+        self._wakeup = os.pipe()
+
+    def bind(self) -> bool:
+        """Start listening; False if another daemon already serves the socket."""
+        ensure_private_directory(os.path.dirname(self.path) or ".")
+        lock = open(self.path + ".lock", "wb")
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock.close()
+            return False
+        self._lock = lock
+        # Holding the lock, a socket file left here is one of a dead daemon
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.path)
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(self.path)
+        os.chmod(self.path, 0o600)
+        listener.listen(16)
+        self._listener = listener
+        return True
+
+    def close(self) -> None:
+        if self._listener is not None:
+            self._listener.close()
+            self._listener = None
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(self.path)
+        if self._lock is not None:
+            self._lock.close()
+            self._lock = None
+        for fd in self._wakeup:
+            with contextlib.suppress(OSError):
+                os.close(fd)
+
+    def warm_up(self) -> None:
+        """Import the CLI and run every rule once, before the first request."""
+        from prompt_lint import cli  # noqa: F401
+        from prompt_lint.rules import get_all_rules
+        from prompt_lint.runner import lint_source
+
+        lint_source(WARMUP_DOCUMENT, os.path.join(os.sep, "warmup.prompt.md"), get_all_rules())
+
+    def serve(self) -> None:
+        """Handle requests until :meth:`stop`, a stop request or the idle timeout."""
+        assert self._listener is not None, "bind() first"
+        listener = self._listener
+        while not self._stopping:
+            ready, _, _ = select.select(
+                [listener.fileno(), self._wakeup[0]], [], [], self.idle_timeout
+            )
+            if listener.fileno() not in ready:
+                return
+            conn, _ = listener.accept()
+            with conn:
+                try:
+                    self.handle(conn)
+                except OSError:
+                    # The client went away; its output is lost
+                    pass
+
+    def stop(self) -> None:
+        """Exit :meth:`serve` after the current request; safe from signal handlers."""
+        self._stopping = True
+        with contextlib.suppress(OSError):
+            os.write(self._wakeup[1], b"\0")
+
+    def handle(self, conn: socket.socket) -> None:
+        args: list[str] = []
+        directory = None
+        environment: dict[str, str] = {}
+        with conn.makefile("rb") as stream:
+            while True:
+                frame = read_frame(stream)
+                if frame is None:
+                    return
+                kind, payload = frame
+                if kind == ARGUMENT:
+                    args.append(os.fsdecode(payload))
+                elif kind == DIRECTORY:
+                    directory = os.fsdecode(payload)
+                elif kind == ENVIRONMENT:
+                    name, _, value = os.fsdecode(payload).partition("=")
+                    environment[name] = value
+                elif kind == STOP:
+                    self.stop()
+                    return
+                elif kind == RUN:
+                    break
+        status = self.run(args, directory or os.getcwd(), environment, conn)
+        send_frame(conn, EXIT, str(status).encode())
+
+    def run(
+        self, args: list[str], directory: str, environment: dict[str, str], conn: socket.socket
+    ) -> int:
+        """Run ``prompt-lint ARGS`` in ``directory``, sending its output to ``conn``."""
+        from prompt_lint.cli import main
+
+        stdout = _text_stream(conn, STDOUT)
+        stderr = _text_stream(conn, STDERR)
+        status: int = 0
+        with (
+            _working_directory(directory),
+            _git_environment(environment),
+            contextlib.redirect_stdout(stdout),
+            contextlib.redirect_stderr(stderr),
+        ):
+            try:
+                main.main(args=args, prog_name="prompt-lint", standalone_mode=True)
+            except SystemExit as e:
+                if e.code is None or isinstance(e.code, int):
+                    status = e.code or 0
+                else:
+                    print(e.code, file=sys.stderr)
+                    status = 1
+            except Exception:
+                traceback.print_exc()
+                status = 1
+            finally:
+                stdout.flush()
+                stderr.flush()
+        return status
+
+
+@contextlib.contextmanager
+def _working_directory(directory: str) -> Iterator[None]:
+    previous = os.getcwd()
+    os.chdir(directory)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+@contextlib.contextmanager
+def _git_environment(environment: dict[str, str]) -> Iterator[None]:
+    """Use the client's ``GIT_*`` variables, e.g. the index of a running hook."""
+    saved = {name: value for name, value in os.environ.items() if name.startswith("GIT_")}
+    for name in saved:
+        del os.environ[name]
+    os.environ.update(environment)
+    try:
+        yield
+    finally:
+        for name in environment:
+            os.environ.pop(name, None)
+        os.environ.update(saved)
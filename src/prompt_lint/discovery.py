@@ -0,0 +1,336 @@
+"""Find the prompt files to lint under the paths given on the command line.
+
+:func:`iter_prompt_files` walks directories with ``os.scandir`` and yields
+files as it finds them, so linting can start before the walk is over. It
+prunes directories that never hold prompts worth linting (version control
+metadata, ``node_modules``, virtualenvs and tool caches), applies
+``--exclude`` globs and, on request, ``.gitignore`` files. Symbolic links to
+directories are followed, but a directory is never entered twice, so links
+pointing back up the tree cannot loop, and a file reached through several
+paths, e.g. a directory and a file inside it both given, is yielded once.
+
+Within each directory entries are visited in name order, with directory
+names compared as if followed by ``/``, so files come out in the order of
+their paths sorted as strings, as they did with
+``sorted(str(p) for p in Path.rglob(...))``.
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import os
+import re
+from collections.abc import Iterable, Iterator, Sequence
+from dataclasses import dataclass
+
+PROMPT_SUFFIX = ".prompt.md"
+
+# Where the result cache is kept, see prompt_lint.cache
+DEFAULT_CACHE_DIR = ".prompt-lint-cache"
+
+# Directory names that are never searched for prompts
+PRUNED_DIRECTORIES = frozenset(
+    {
+        ".git",
+        ".hg",
+        ".svn",
+        "node_modules",
+        "__pycache__",
+        ".mypy_cache",
+        ".pytest_cache",
+        ".ruff_cache",
+        ".tox",
+        ".nox",
+        DEFAULT_CACHE_DIR,
+    }
+)
+
+# Present at the top of every virtualenv
+_VENV_MARKER = "pyvenv.cfg"
+
+
+@dataclass(frozen=True, slots=True)
+class _IgnorePattern:
+    regex: re.Pattern[str]
+    negated: bool
+    directory_only: bool
+
+
+class _IgnoreFile:
+    """The patterns of one ``.gitignore``, matched relative to its directory."""
+
+    __slots__ = ("base", "patterns")
+
+    def __init__(self, base: str, patterns: list[_IgnorePattern]) -> None:
+        self.base = base
+        self.patterns = patterns
+
+    @classmethod
+    def load(cls, directory: str) -> _IgnoreFile | None:
+        try:
+            with open(os.path.join(directory, ".gitignore"), encoding="utf-8") as f:
+                lines = f.read().splitlines()
+        except (OSError, UnicodeDecodeError):
+            return None
+        patterns = [p for p in map(_compile_ignore_pattern, lines) if p is not None]
+        return cls(directory, patterns) if patterns else None
+
+    def match(self, path: str, is_directory: bool) -> bool | None:
+        """True if ``path`` is ignored, False if re-included, None if no pattern applies."""
+        relative = os.path.relpath(path, self.base).replace(os.sep, "/")
+        result = None
+        for pattern in self.patterns:
+            if pattern.directory_only and not is_directory:
+                continue
+            if pattern.regex.match(relative):
+                result = not pattern.negated
+        return result
+
+
+def _compile_ignore_pattern(line: str) -> _IgnorePattern | None:
+    """Translate one ``.gitignore`` line into a regular expression."""
+    if not line.strip() or line.startswith("#"):
+        return None
+    if not line.endswith("\\ "):
+        line = line.rstrip()
+    negated = line.startswith("!")
+    if negated:
+        line = line[1:]
+    elif line.startswith(("\\!", "\\#")):
+        line = line[1:]
+    directory_only = line.endswith("/")
+    line = line.rstrip("/")
+    if not line:
+        return None
+    # A slash anywhere but at the end anchors the pattern to the directory
+    anchored = "/" in line
+    line = line.lstrip("/")
+
+    parts: list[str] = []
+    i = 0
+    while i < len(line):
+        c = line[i]
+        if line.startswith("**/", i) and (i == 0 or line[i - 1] == "/"):
+            parts.append("(?:.*/)?")
+            i += 3
+        elif line.startswith("**", i) and i + 2 == len(line) and (i == 0 or line[i - 1] == "/"):
+            parts.append(".*")
+            i += 2
+        elif c == "*":
+            parts.append("[^/]*")
+            i += 1
+        elif c == "?":
+            parts.append("[^/]")
+            i += 1
+        elif c == "[" and "]" in line[i + 2 :]:
+            # A "]" right after the opening bracket is part of the set
+            end = line.index("]", i + 2)
+            body = line[i + 1 : end].replace("\\", "\\\\")
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            parts.append(f"[{body}]")
+            i = end + 1
+        elif c == "\\" and i + 1 < len(line):
+            parts.append(re.escape(line[i + 1]))
+            i += 2
+        else:
+            parts.append(re.escape(c))
+            i += 1
+    prefix = "" if anchored else "(?:.*/)?"
+    return _IgnorePattern(re.compile(f"^{prefix}{''.join(parts)}$"), negated, directory_only)
+
+
+def _find_repository_root(directory: str) -> str | None:
+    current = directory
+    while True:
+        if os.path.exists(os.path.join(current, ".git")):
+            return current
+        parent = os.path.dirname(current)
+        if parent == current:
+            return None
+        current = parent
+
+
+class _Walker:
+    def __init__(self, exclude: Sequence[str], gitignore: bool) -> None:
+        self.exclude = list(exclude)
+        self.gitignore = gitignore
+        # (st_dev, st_ino) of directories entered, against symlink loops and overlaps
+        self.visited: set[tuple[int, int]] = set()
+        self.seen_files: set[str] = set()
+
+    def excluded(self, relative: str, name: str) -> bool:
+        for pattern in self.exclude:
+            target = relative if "/" in pattern else name
+            if fnmatch.fnmatchcase(target, pattern.rstrip("/")):
+                return True
+        return False
+
+    def ancestor_ignores(self, directory: str) -> list[_IgnoreFile]:
+        """The ``.gitignore`` files above ``directory``, up to its repository root."""
+        root = _find_repository_root(directory)
+        if root is None:
+            return []
+        ignores = []
+        current = directory
+        chain: list[str] = []
+        while current != root:
+            current = os.path.dirname(current)
+            chain.append(current)
+        for ancestor in reversed(chain):
+            ignore = _IgnoreFile.load(ancestor)
+            if ignore is not None:
+                ignores.append(ignore)
+        return ignores
+
+    def walk(self, root: str) -> Iterator[str]:
+        absolute_root = os.path.abspath(root)
+        # A directory given explicitly is searched even if it is ignored itself
+        ignores = self.ancestor_ignores(absolute_root) if self.gitignore else []
+        yield from self._walk(root, absolute_root, "", ignores)
+
+    def _walk(
+        self, directory: str, absolute: str, relative: str, ignores: list[_IgnoreFile]
+    ) -> Iterator[str]:
+        try:
+            st = os.stat(directory)
+        except OSError:
+            return
+        key = (st.st_dev, st.st_ino)
+        if key in self.visited:
+            return
+        self.visited.add(key)
+
+        try:
+            with os.scandir(directory) as it:
+                entries = list(it)
+        except OSError:
+            return
+        # A virtualenv given explicitly is searched, like an ignored directory
+        if relative and any(e.name == _VENV_MARKER for e in entries):
+            return
+        if self.gitignore:
+            ignore = _IgnoreFile.load(absolute)
+            if ignore is not None:
+                ignores = [*ignores, ignore]
+        real_directory: str | None = None
+
+        def sort_key(entry: os.DirEntry[str]) -> str:
+            # Directories sort as "name/", so paths come out in sorted order
+            try:
+                return entry.name + "/" if entry.is_dir() else entry.name
+            except OSError:
+                return entry.name
+
+        for entry in sorted(entries, key=sort_key):
+            name = entry.name
+            entry_relative = f"{relative}/{name}" if relative else name
+            try:
+                is_directory = entry.is_dir()
+            except OSError:
+                continue
+            if is_directory:
+                if name in PRUNED_DIRECTORIES or self.excluded(entry_relative, name):
+                    continue
+                entry_absolute = os.path.join(absolute, name)
+                if ignores and _is_ignored(ignores, entry_absolute, True):
+                    continue
+                yield from self._walk(entry.path, entry_absolute, entry_relative, ignores)
+                continue
+            if not name.endswith(PROMPT_SUFFIX) or self.excluded(entry_relative, name):
+                continue
+            if ignores and _is_ignored(ignores, os.path.join(absolute, name), False):
+                continue
+            try:
+                if entry.is_symlink():
+                    real = os.path.realpath(entry.path)
+                else:
+                    if real_directory is None:
+                        real_directory = os.path.realpath(directory)
+                    real = os.path.join(real_directory, name)
+                if not entry.is_file():
+                    continue
+            except OSError:
+                continue
+            if real not in self.seen_files:
+                self.seen_files.add(real)
+                yield entry.path
+
+
+def _is_ignored(ignores: list[_IgnoreFile], path: str, is_directory: bool) -> bool:
+    ignored = False
+    for ignore in ignores:
+        result = ignore.match(path, is_directory)
+        if result is not None:
+            ignored = result
+    return ignored
+
+
+def iter_prompt_files(
+    paths: Iterable[str], exclude: Sequence[str] = (), gitignore: bool = False
+) -> Iterator[str]:
+    """Yield the files to lint for ``paths``, each once, as they are found.
+
+    Directories contribute the ``*.prompt.md`` files below them that are not
+    pruned, excluded or (with ``gitignore``) ignored. Files are yielded as
+    given, whatever their name; ``exclude`` does not apply to them.
+    ``exclude`` patterns containing a slash match the path relative to the
+    directory given, others match file and directory names.
+    """
+    walker = _Walker(exclude, gitignore)
+    for path in paths:
+        if os.path.isdir(path):
+            yield from walker.walk(path)
+            continue
+        real = os.path.realpath(path)
+        if real not in walker.seen_files:
+            walker.seen_files.add(real)
+            yield path
+
+
+def is_excluded(
+    path: str, directory: str, exclude: Sequence[str] = (), gitignore: bool = False
+) -> bool:
+    """Whether searching ``directory`` would skip ``path``, a file below it.
+
+    Applies the ``exclude`` patterns and (with ``gitignore``) the
+    ``.gitignore`` files the way :func:`iter_prompt_files` does, to files
+    found some other way, such as those changed in git.
+    """
+    walker = _Walker(exclude, gitignore)
+    current = os.path.abspath(directory)
+    parts = os.path.relpath(os.path.abspath(path), current).split(os.sep)
+    ignores = walker.ancestor_ignores(current) if gitignore else []
+    for i, name in enumerate(parts):
+        if gitignore:
+            ignore = _IgnoreFile.load(current)
+            if ignore is not None:
+                ignores = [*ignores, ignore]
+        current = os.path.join(current, name)
+        is_directory = i < len(parts) - 1
+        if walker.excluded("/".join(parts[: i + 1]), name):
+            return True
+        if ignores and _is_ignored(ignores, current, is_directory):
+            return True
+    return False
+
+
+def walk_tree(root: str) -> Iterator[tuple[str, list[str], list[str]]]:
+    """``os.walk`` over ``root``, skipping the directories the search prunes.
+
+    Used by the watchers, so that they never descend into version control
+    metadata, ``node_modules`` or virtualenvs either.
+    """
+    for dirpath, dirnames, filenames in os.walk(root):
+        if _VENV_MARKER in filenames and dirpath != root:
+            dirnames.clear()
+            continue
+        dirnames[:] = [name for name in dirnames if name not in PRUNED_DIRECTORIES]
+        yield dirpath, dirnames, filenames
+
+
+def find_prompt_files(
+    paths: Iterable[str], exclude: Sequence[str] = (), gitignore: bool = False
+) -> list[str]:
+    """:func:`iter_prompt_files` as a list."""
+    return list(iter_prompt_files(paths, exclude, gitignore))
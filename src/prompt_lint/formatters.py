@@ -0,0 +1,203 @@
+"""Output formats for lint results."""
+
+from __future__ import annotations
+
+import json
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Sequence
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from prompt_lint import __version__
+from prompt_lint.models import Diagnostic, Severity
+
+if TYPE_CHECKING:
+    from prompt_lint.rules import RuleBase
+    from prompt_lint.runner import LintResult
+
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+SARIF_VERSION = "2.1.0"
+
+Writer = Callable[[str], None]
+
+
+def format_text(diag: Diagnostic) -> str:
+    """Format a diagnostic as ``path:line:col: RULE severity: message``."""
+    path = diag.path or "<stdin>"
+    return (
+        f"{path}:{diag.position.line}:{diag.position.column}: "
+        f"{diag.rule_id} {diag.severity.value}: {diag.message}"
+    )
+
+
+def diagnostic_record(diag: Diagnostic) -> dict[str, Any]:
+    """Serialize a diagnostic to a JSON-compatible dict."""
+    return {
+        "path": diag.path or "<stdin>",
+        "line": diag.position.line,
+        "column": diag.position.column,
+        "rule_id": diag.rule_id,
+        "severity": diag.severity.value,
+        "message": diag.message,
+    }
+
+
+def _error_record(result: LintResult) -> dict[str, Any]:
+    """A file that could not be linted, shaped like a diagnostic without a rule."""
+    return {
+        "path": result.path,
+        "line": 1,
+        "column": 1,
+        "rule_id": None,
+        "severity": Severity.ERROR.value,
+        "message": result.error,
+    }
+
+
+class Formatter(ABC):
+    """Writes lint results as they become available."""
+
+    def __init__(self, write: Writer, write_err: Writer, rules: Sequence[RuleBase]) -> None:
+        self.write = write
+        self.write_err = write_err
+        self.rules = rules
+
+    @abstractmethod
+    def file(self, result: LintResult) -> None:
+        """Handle the result of one linted file."""
+
+    def finish(self, errors: int, warnings: int) -> None:
+        """Called once after all files with the run totals."""
+
+
+class TextFormatter(Formatter):
+    def file(self, result: LintResult) -> None:
+        if result.error is not None:
+            self.write_err(f"{result.path}: {result.error}")
+            return
+        for diag in result.diagnostics:
+            self.write(format_text(diag))
+
+    def finish(self, errors: int, warnings: int) -> None:
+        if errors or warnings:
+            self.write("")
+            parts = []
+            if errors:
+                parts.append(f"{errors} error(s)")
+            if warnings:
+                parts.append(f"{warnings} warning(s)")
+            self.write(f"Found {', '.join(parts)}.")
+
+
+class JsonLinesFormatter(Formatter):
+    """One JSON object per diagnostic, written as soon as each file finishes."""
+
+    def file(self, result: LintResult) -> None:
+        if result.error is not None:
+            self.write(json.dumps(_error_record(result), ensure_ascii=False))
+            return
+        if result.diagnostics:
+            self.write(
+                "\n".join(
+                    json.dumps(diagnostic_record(d), ensure_ascii=False)
+                    for d in result.diagnostics
+                )
+            )
+
+
+class JsonFormatter(Formatter):
+    """A single JSON array of diagnostics."""
+
+    def __init__(self, write: Writer, write_err: Writer, rules: Sequence[RuleBase]) -> None:
+        super().__init__(write, write_err, rules)
+        self.records: list[dict[str, Any]] = []
+
+    def file(self, result: LintResult) -> None:
+        if result.error is not None:
+            self.records.append(_error_record(result))
+        else:
+            self.records.extend(diagnostic_record(d) for d in result.diagnostics)
+
+    def finish(self, errors: int, warnings: int) -> None:
+        self.write(json.dumps(self.records, ensure_ascii=False, indent=2))
+
+
+class SarifFormatter(Formatter):
+    """A SARIF 2.1.0 log with one run."""
+
+    def __init__(self, write: Writer, write_err: Writer, rules: Sequence[RuleBase]) -> None:
+        super().__init__(write, write_err, rules)
+        self.rule_index = {rule.rule_id: i for i, rule in enumerate(rules)}
+        self.results: list[dict[str, Any]] = []
+        self.notifications: list[dict[str, Any]] = []
+
+    def file(self, result: LintResult) -> None:
+        uri = Path(result.path).as_posix()
+        if result.error is not None:
+            self.notifications.append(
+                {
+                    "level": "error",
+                    "message": {"text": result.error},
+                    "locations": [{"physicalLocation": {"artifactLocation": {"uri": uri}}}],
+                }
+            )
+            return
+        for diag in result.diagnostics:
+            entry: dict[str, Any] = {
+                "ruleId": diag.rule_id,
+                "level": "error" if diag.severity == Severity.ERROR else "warning",
+                "message": {"text": diag.message},
+                "locations": [
+                    {
+                        "physicalLocation": {
+                            "artifactLocation": {"uri": uri},
+                            "region": {
+                                "startLine": diag.position.line,
+                                "startColumn": diag.position.column,
+                            },
+                        }
+                    }
+                ],
+            }
+            if diag.rule_id in self.rule_index:
+                entry["ruleIndex"] = self.rule_index[diag.rule_id]
+            self.results.append(entry)
+
+    def finish(self, errors: int, warnings: int) -> None:
+        log = {
+            "$schema": SARIF_SCHEMA,
+            "version": SARIF_VERSION,
+            "runs": [
+                {
+                    "tool": {
+                        "driver": {
+                            "name": "prompt-lint",
+                            "version": __version__,
+                            "rules": [
+                                {
+                                    "id": rule.rule_id,
+                                    "shortDescription": {"text": rule.description},
+                                }
+                                for rule in self.rules
+                            ],
+                        }
+                    },
+                    "invocations": [
+                        {
+                            "executionSuccessful": not self.notifications,
+                            "toolExecutionNotifications": self.notifications,
+                        }
+                    ],
+                    "results": self.results,
+                }
+            ],
+        }
+        self.write(json.dumps(log, ensure_ascii=False, indent=2))
+
+
+FORMATTERS: dict[str, type[Formatter]] = {
+    "text": TextFormatter,
+    "jsonl": JsonLinesFormatter,
+    "json": JsonFormatter,
+    "sarif": SarifFormatter,
+}
@@ -0,0 +1,187 @@
+"""Directory listings shared by everything that checks paths during a run.
+
+Checking many links with ``os.path.exists`` costs one syscall per link.
+:class:`FileSystemCache` instead lists each directory once with
+``os.scandir`` and answers every later lookup in it from memory. Lookups
+compare names exactly, so a link whose case differs from the file on disk is
+caught even on case-insensitive file systems, where it would still open.
+
+Like :mod:`prompt_lint.profiling`, the cache for the current run is a module
+global, :data:`active`, installed with :func:`session`::
+
+    with session():
+        for result in run_lint(targets, rules):
+            ...
+"""
+
+from __future__ import annotations
+
+import os
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+# (path looked up, its spelling on disk or None if it does not exist)
+Dependency = tuple[str, "str | None"]
+
+
+class _Listing:
+    """The entry names of one directory."""
+
+    __slots__ = ("names", "_folded")
+
+    def __init__(self, names: frozenset[str]) -> None:
+        self.names = names
+        self._folded: dict[str, str] | None = None
+
+    def find(self, name: str) -> str | None:
+        """Return the entry spelled ``name``, or one that differs only in case."""
+        if name in self.names:
+            return name
+        if self._folded is None:
+            self._folded = {n.casefold(): n for n in self.names}
+        return self._folded.get(name.casefold())
+
+
+class FileSystemCache:
+    """Directory listings, each read once until invalidated."""
+
+    def __init__(self) -> None:
+        # Directory path -> listing, or None if it is not a readable directory
+        self._listings: dict[str, _Listing | None] = {}
+        # Normalized path -> spelling on disk, for directories and files alike
+        self._resolved: dict[str, str | None] = {}
+        # (directory, relative path) -> normalized path, see resolve_in()
+        self._joined: dict[tuple[str, str], str] = {}
+        self._recorded: list[Dependency] | None = None
+
+    def listdir(self, directory: str) -> frozenset[str] | None:
+        """Names in ``directory``, or None if it cannot be listed."""
+        listing = self._listing(os.path.normpath(os.path.abspath(directory)))
+        return listing.names if listing is not None else None
+
+    def resolve(self, path: str) -> str | None:
+        """Return ``path`` as spelled on disk, or None if it does not exist.
+
+        The result differs from the normalized ``path`` only when the case
+        of some component does not match the file system entry.
+        """
+        path = os.path.normpath(os.path.abspath(path))
+        spelling = self._resolve(path)
+        if self._recorded is not None:
+            self._recorded.append((path, spelling))
+        return spelling
+
+    def resolve_in(self, directory: str, relative: str) -> tuple[str, str | None]:
+        """Resolve ``relative`` against ``directory``, an absolute path.
+
+        Returns the normalized path and its spelling on disk as
+        :meth:`resolve` does. The same relative path seen again from the
+        same directory, e.g. a link repeated across prompts, costs one
+        dictionary lookup.
+        """
+        key = (directory, relative)
+        path = self._joined.get(key)
+        if path is None:
+            path = self._joined[key] = os.path.normpath(os.path.join(directory, relative))
+        spelling = self._resolved[path] if path in self._resolved else self._resolve(path)
+        if self._recorded is not None:
+            self._recorded.append((path, spelling))
+        return path, spelling
+
+    def exists(self, path: str) -> bool:
+        """Whether ``path`` exists with exactly this spelling."""
+        return self.resolve(path) == os.path.normpath(os.path.abspath(path))
+
+    def invalidate(self, path: str) -> None:
+        """Forget what is known about ``path``, e.g. after it was created or deleted.
+
+        The listing of its parent is dropped along with every lookup in it,
+        and if ``path`` was a directory, everything cached below it.
+        """
+        path = os.path.normpath(os.path.abspath(path))
+        parent = os.path.dirname(path)
+        below = path.rstrip(os.sep) + os.sep
+        self._listings.pop(parent, None)
+        for cached in [p for p in self._listings if p == path or p.startswith(below)]:
+            del self._listings[cached]
+        stale = [
+            p
+            for p in self._resolved
+            if p == path or p.startswith(below) or os.path.dirname(p) == parent
+        ]
+        for cached in stale:
+            del self._resolved[cached]
+
+    def clear(self) -> None:
+        self._listings.clear()
+        self._resolved.clear()
+
+    @contextmanager
+    def recording(self) -> Iterator[list[Dependency]]:
+        """Collect every :meth:`resolve` made in the block, in call order."""
+        previous = self._recorded
+        recorded: list[Dependency] = []
+        self._recorded = recorded
+        try:
+            yield recorded
+        finally:
+            self._recorded = previous
+
+    def _resolve(self, path: str) -> str | None:
+        if path in self._resolved:
+            return self._resolved[path]
+        parent, name = os.path.split(path)
+        if not name:
+            # The file system root
+            spelling: str | None = path
+        else:
+            # List the parent as spelled on disk, so a case mismatch in a
+            # directory name is found on case-sensitive file systems too
+            parent_spelling = self._resolve(parent)
+            listing = self._listing(parent_spelling) if parent_spelling is not None else None
+            found = listing.find(name) if listing is not None else None
+            spelling = (
+                os.path.join(parent_spelling, found)
+                if parent_spelling is not None and found is not None
+                else None
+            )
+        self._resolved[path] = spelling
+        return spelling
+
+    def _listing(self, directory: str) -> _Listing | None:
+        if directory in self._listings:
+            return self._listings[directory]
+        try:
+            with os.scandir(directory) as entries:
+                listing: _Listing | None = _Listing(frozenset(e.name for e in entries))
+        except OSError:
+            listing = None
+        self._listings[directory] = listing
+        return listing
+
+
+# The cache of the current run, or None outside of one
+active: FileSystemCache | None = None
+
+
+def current() -> FileSystemCache:
+    """The active cache, or a new one for a single lookup outside of a run."""
+    return active if active is not None else FileSystemCache()
+
+
+@contextmanager
+def session(cache: FileSystemCache | None = None) -> Iterator[FileSystemCache]:
+    """Make ``cache`` active for the block.
+
+    Without ``cache``, an already active cache is kept, so nested sessions
+    share one set of listings; otherwise a new cache is used.
+    """
+    global active
+    if cache is None:
+        cache = active if active is not None else FileSystemCache()
+    previous = active
+    active = cache
+    try:
+        yield cache
+    finally:
+        active = previous
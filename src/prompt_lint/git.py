@@ -0,0 +1,240 @@
+"""Find the prompt files, and the lines in them, changed since a git revision.
+
+Everything here shells out to the local ``git`` binary; paths handed in and
+out are relative to the current directory, like the paths given to
+``lint``. Changes are measured from the merge base of the revision and
+``HEAD``, so commits added to the revision after a branch was created do not
+count as changes of the branch.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import subprocess
+import sys
+from bisect import bisect_right
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, field
+
+PROMPT_SUFFIX = ".prompt.md"
+
+# Inclusive, 1-based line ranges, sorted and non-overlapping
+LineRanges = list[tuple[int, int]]
+
+# "@@ -12,3 +14,5 @@" -> new start and optional count
+_HUNK_RE = re.compile(rb"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@")
+
+
+class GitError(Exception):
+    """git is missing, the directory is not a repository, or a command failed."""
+
+
+@dataclass
+class ChangeSet:
+    """Changed files, relative to the current directory, in git's order.
+
+    ``lines`` maps each file to its added or modified lines, or to None if
+    the whole file is new; it is only filled in when lines were requested.
+    ``contents`` holds the staged text of each file in ``--staged`` mode,
+    or the error decoding it.
+    """
+
+    files: list[str] = field(default_factory=list)
+    lines: dict[str, LineRanges | None] = field(default_factory=dict)
+    contents: dict[str, str | UnicodeDecodeError] | None = None
+
+    def keep(self, files: Iterable[str]) -> None:
+        """Drop every file not in ``files``."""
+        kept = set(files)
+        self.files = [path for path in self.files if path in kept]
+        self.lines = {path: r for path, r in self.lines.items() if path in kept}
+        if self.contents is not None:
+            self.contents = {path: t for path, t in self.contents.items() if path in kept}
+
+    def in_changed_lines(self, path: str, line: int) -> bool:
+        """Whether ``line`` of ``path`` was added or modified."""
+        if path not in self.lines:
+            return False
+        ranges = self.lines[path]
+        if ranges is None:
+            return True
+        # The last range starting at or before the line
+        i = bisect_right(ranges, (line, sys.maxsize)) - 1
+        return i >= 0 and ranges[i][1] >= line
+
+
+def _git(args: Sequence[str], cwd: str | None = None, input: bytes | None = None) -> bytes:
+    try:
+        completed = subprocess.run(
+            ["git", "-c", "core.quotePath=false", *args],
+            cwd=cwd,
+            input=input,
+            capture_output=True,
+            check=False,
+        )
+    except OSError as e:
+        raise GitError(f"Cannot run git: {e}") from None
+    if completed.returncode != 0:
+        message = completed.stderr.decode(errors="replace").strip().splitlines()
+        raise GitError(message[-1] if message else f"git {args[0]} failed")
+    return completed.stdout
+
+
+def repository_root(cwd: str | None = None) -> str:
+    return os.fsdecode(_git(["rev-parse", "--show-toplevel"], cwd).rstrip(b"\n"))
+
+
+def merge_base(revision: str, root: str) -> str:
+    """The commit where ``HEAD`` forked from ``revision``."""
+    if not _is_commit(f"{revision}^{{commit}}", root):
+        raise GitError(f"Unknown revision: {revision}")
+    try:
+        return _git(["merge-base", revision, "HEAD"], root).decode().strip()
+    except GitError:
+        raise GitError(f"{revision} and HEAD have no common ancestor") from None
+
+
+def collect_changes(
+    targets: Sequence[str],
+    revision: str | None = None,
+    staged: bool = False,
+    lines: bool = False,
+) -> ChangeSet:
+    """Find the changed prompt files among ``targets``.
+
+    With ``revision``, files differ from its merge base with ``HEAD``: in the
+    working tree, including untracked files, or in the index if ``staged``.
+    With only ``staged``, staged files differ from ``HEAD``. Deleted files
+    are not reported. A target directory contributes its changed
+    ``.prompt.md`` files; a target file is kept if it changed.
+    """
+    root = repository_root()
+    if revision is not None:
+        base = merge_base(revision, root)
+    else:
+        base = "HEAD" if _is_commit("HEAD", root) else _empty_tree(root)
+    diff = ["diff", "--no-ext-diff", "--no-renames", "--diff-filter=ACMR"]
+    if staged:
+        diff.append("--cached")
+    diff.append(base)
+
+    names = _split_z(_git([*diff, "--name-only", "-z", "--"], root))
+    added: set[str] = set()
+    if not staged:
+        added = set(_split_z(_git(["ls-files", "--others", "--exclude-standard", "-z"], root)))
+        names.extend(sorted(added))
+
+    cwd = os.getcwd()
+    selected = {os.path.normpath(os.path.abspath(t)): os.path.isdir(t) for t in targets}
+    changes = ChangeSet()
+    by_name: dict[str, str] = {}
+    for name in names:
+        absolute = os.path.normpath(os.path.join(root, name))
+        if not _is_selected(absolute, selected):
+            continue
+        path = os.path.relpath(absolute, cwd)
+        changes.files.append(path)
+        by_name[name] = path
+
+    if lines and changes.files:
+        tracked = [name for name in by_name if name not in added]
+        hunks = _changed_lines(diff, tracked, root) if tracked else {}
+        for name, path in by_name.items():
+            changes.lines[path] = None if name in added else hunks.get(name, [])
+    if staged:
+        contents = _read_staged(list(by_name), root)
+        changes.contents = {by_name[name]: text for name, text in contents.items()}
+    return changes
+
+
+def _is_selected(path: str, targets: dict[str, bool]) -> bool:
+    for target, is_directory in targets.items():
+        if not is_directory:
+            if path == target:
+                return True
+        elif path.endswith(PROMPT_SUFFIX) and path.startswith(target.rstrip(os.sep) + os.sep):
+            return True
+    return False
+
+
+def _changed_lines(diff: list[str], names: list[str], root: str) -> dict[str, LineRanges]:
+    """Added or modified lines per file, from a diff without context lines."""
+    output = _git(
+        [*diff, "-U0", "--no-color", "--src-prefix=a/", "--dst-prefix=b/", "--", *names], root
+    )
+    result: dict[str, LineRanges] = {}
+    current: LineRanges | None = None
+    for line in output.split(b"\n"):
+        if line.startswith(b"+++ "):
+            target = line[4:]
+            # Names containing a space are followed by a tab, and names with
+            # special characters are quoted by git
+            if target.endswith(b"\t"):
+                target = target[:-1]
+            if target.startswith(b'"'):
+                target = _unquote(target)
+            if target == b"/dev/null":
+                current = None
+            else:
+                current = result.setdefault(os.fsdecode(target[2:]), [])
+        elif line.startswith(b"@@") and current is not None:
+            match = _HUNK_RE.match(line)
+            if match is None:
+                continue
+            start = int(match.group(1))
+            count = int(match.group(2)) if match.group(2) is not None else 1
+            if count:
+                current.append((start, start + count - 1))
+    return result
+
+
+def _unquote(quoted: bytes) -> bytes:
+    # C-style quoting as used by git for paths, e.g. "b/\343\201\202.prompt.md"
+    return quoted[1:-1].decode("unicode_escape").encode("latin-1")
+
+
+def _read_staged(names: list[str], root: str) -> dict[str, str | UnicodeDecodeError]:
+    """The text of each file in the index, read with one ``git cat-file`` call.
+
+    A file that is not valid UTF-8 maps to the error decoding it.
+    """
+    if not names:
+        return {}
+    request = b"".join(b":" + os.fsencode(name) + b"\n" for name in names)
+    output = _git(["cat-file", "--batch"], root, input=request)
+    contents: dict[str, str | UnicodeDecodeError] = {}
+    offset = 0
+    for name in names:
+        header_end = output.index(b"\n", offset)
+        # "<oid> <type> <size>", or "<object> missing" where the object
+        # names the file, which may contain spaces
+        rest, _, size_field = output[offset:header_end].rpartition(b" ")
+        offset = header_end + 1
+        if not size_field.isdigit():
+            continue
+        size = int(size_field)
+        if rest.rpartition(b" ")[2] == b"blob":
+            try:
+                contents[name] = output[offset : offset + size].decode("utf-8")
+            except UnicodeDecodeError as e:
+                contents[name] = e
+        offset += size + 1
+    return contents
+
+
+def _split_z(output: bytes) -> list[str]:
+    return [os.fsdecode(name) for name in output.split(b"\0") if name]
+
+
+def _is_commit(revision: str, root: str) -> bool:
+    try:
+        _git(["rev-parse", "--verify", "--quiet", revision], root)
+    except GitError:
+        return False
+    return True
+
+
+def _empty_tree(root: str) -> str:
+    # Before the first commit, staged files are compared to an empty tree
+    return _git(["hash-object", "-t", "tree", "/dev/null"], root).decode().strip()
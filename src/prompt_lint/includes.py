@@ -0,0 +1,160 @@
+"""Included prompt files, read and parsed once per run, and who includes them.
+
+A section pulls in the sections of another Markdown file with a directive on
+a line of its own::
+
+    <!-- include: shared/constraints.md -->
+
+The target is relative to the file holding the directive. The parser splices
+the included sections into the document after the section holding the
+directive (see :attr:`PromptDocument.includes`), so they count for the rules
+as if written there.
+
+:class:`IncludeCache` keeps every file it parsed, so a file included by many
+prompts is read once. Like :mod:`prompt_lint.fscache`, the cache of the
+current run is a module global, :data:`active`, installed with
+:func:`session`. :class:`DependencyGraph` records which files include which,
+so that after an edit only the files including it are linted again.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from prompt_lint.models import PromptDocument
+
+# (absolute path of an included file, its content key or None if unreadable)
+IncludeDependency = tuple[str, "str | None"]
+
+
+class IncludeCache:
+    """Included files, each read and parsed once until invalidated."""
+
+    def __init__(self) -> None:
+        # Absolute path -> text, or the error reading it
+        self._texts: dict[str, str | OSError | UnicodeDecodeError] = {}
+        self._keys: dict[str, str | None] = {}
+        self._documents: dict[str, PromptDocument] = {}
+
+    def load(self, path: str) -> PromptDocument:
+        """The file at ``path``, an absolute normalized path, parsed for inclusion.
+
+        Its own include directives are left unresolved; the includer resolves
+        them, so cycles are found from its side. Raises OSError or
+        UnicodeDecodeError if the file cannot be read.
+        """
+        document = self._documents.get(path)
+        if document is None:
+            from prompt_lint.parser import parse_include
+
+            document = self._documents[path] = parse_include(self._read(path), path)
+        return document
+
+    def key(self, path: str) -> str | None:
+        """A hash of the content of ``path``, or None if it cannot be read."""
+        if path not in self._keys:
+            try:
+                text = self._read(path)
+            except (OSError, UnicodeDecodeError):
+                self._keys[path] = None
+            else:
+                self._keys[path] = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return self._keys[path]
+
+    def dependencies(self, paths: Iterable[str]) -> list[IncludeDependency]:
+        """``paths`` with their content keys, to check later that they did not change."""
+        return [(path, self.key(path)) for path in paths]
+
+    def invalidate(self, path: str) -> None:
+        """Forget ``path``, e.g. after it was edited, created or deleted."""
+        path = os.path.normpath(os.path.abspath(path))
+        self._texts.pop(path, None)
+        self._keys.pop(path, None)
+        self._documents.pop(path, None)
+
+    def clear(self) -> None:
+        self._texts.clear()
+        self._keys.clear()
+        self._documents.clear()
+
+    def _read(self, path: str) -> str:
+        text = self._texts.get(path)
+        if text is None:
+            try:
+                with open(path, encoding="utf-8") as f:
+                    text = f.read()
+            except (OSError, UnicodeDecodeError) as e:
+                text = e
+            self._texts[path] = text
+        if not isinstance(text, str):
+            raise text
+        return text
+
+
+class DependencyGraph:
+    """Which files each file includes, and the reverse."""
+
+    def __init__(self) -> None:
+        self._includes: dict[str, frozenset[str]] = {}
+        self._dependents: dict[str, set[str]] = {}
+
+    def update(self, path: str, includes: Iterable[str]) -> None:
+        """Record every file ``path`` now includes, directly or through other includes."""
+        new = frozenset(includes)
+        old = self._includes.get(path, frozenset())
+        if new == old:
+            return
+        for included in old - new:
+            dependents = self._dependents[included]
+            dependents.discard(path)
+            if not dependents:
+                del self._dependents[included]
+        for included in new - old:
+            self._dependents.setdefault(included, set()).add(path)
+        if new:
+            self._includes[path] = new
+        else:
+            self._includes.pop(path, None)
+
+    def discard(self, path: str) -> None:
+        """Forget what ``path`` includes, e.g. once it is no longer linted."""
+        self.update(path, ())
+
+    def includes(self, path: str) -> frozenset[str]:
+        return self._includes.get(path, frozenset())
+
+    def dependents(self, path: str) -> set[str]:
+        """The files recorded as including ``path``."""
+        return set(self._dependents.get(path, ()))
+
+
+# The cache of the current run, or None outside of one
+active: IncludeCache | None = None
+
+
+def current() -> IncludeCache:
+    """The active cache, or a new one for a single document outside of a run."""
+    return active if active is not None else IncludeCache()
+
+
+@contextmanager
+def session(cache: IncludeCache | None = None) -> Iterator[IncludeCache]:
+    """Make ``cache`` active for the block.
+
+    Without ``cache``, an already active cache is kept, so nested sessions
+    share the parsed files; otherwise a new cache is used.
+    """
+    global active
+    if cache is None:
+        cache = active if active is not None else IncludeCache()
+    previous = active
+    active = cache
+    try:
+        yield cache
+    finally:
+        active = previous
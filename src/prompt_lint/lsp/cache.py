@@ -0,0 +1,163 @@
+"""Per-document parse cache shared by the LSP handlers."""
+
+from __future__ import annotations
+
+import hashlib
+from collections import OrderedDict
+from collections.abc import Callable, Sequence
+
+from prompt_lint.models import Diagnostic, PromptDocument
+from prompt_lint.parser import parse
+from prompt_lint.rules import RuleBase
+from prompt_lint.validator import validate
+
+DEFAULT_CACHE_SIZE = 128
+
+
+def content_hash(source: str) -> str:
+    """Hash document text; used as the cache key for lookups without a URI."""
+    return hashlib.blake2b(source.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class CacheEntry:
+    """A parsed document and its (lazily computed) validation result."""
+
+    __slots__ = ("version", "document", "rules", "_diagnostics")
+
+    def __init__(
+        self,
+        document: PromptDocument,
+        version: int | None,
+        rules: Sequence[RuleBase] | None = None,
+    ) -> None:
+        self.version = version
+        self.document = document
+        self.rules = rules
+        self._diagnostics: list[Diagnostic] | None = None
+
+    @property
+    def diagnostics(self) -> list[Diagnostic]:
+        if self._diagnostics is None:
+            self._diagnostics = validate(
+                self.document, list(self.rules) if self.rules is not None else None
+            )
+        return self._diagnostics
+
+    def compute_diagnostics(
+        self, cancelled: Callable[[], bool] | None = None
+    ) -> list[Diagnostic] | None:
+        """Validate the document unless ``cancelled`` returns true first.
+
+        Returns None, and keeps nothing, if the validation was cancelled.
+        """
+        if self._diagnostics is None:
+            diagnostics = validate(
+                self.document, list(self.rules) if self.rules is not None else None, cancelled
+            )
+            if cancelled is not None and cancelled():
+                return None
+            self._diagnostics = diagnostics
+        return self._diagnostics
+
+
+class DocumentCache:
+    """LRU cache of parsed documents keyed by URI.
+
+    An entry is reused when the requested document version matches, or when
+    the version is unknown or differs but the text is unchanged. Lookups
+    without a URI are keyed by the content hash of the text.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE) -> None:
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._maxsize = maxsize
+        self._rules: Sequence[RuleBase] | None = None
+
+    @property
+    def rules(self) -> Sequence[RuleBase] | None:
+        """Rules used for diagnostics; None runs every registered rule."""
+        return self._rules
+
+    @rules.setter
+    def rules(self, value: Sequence[RuleBase] | None) -> None:
+        self._rules = value
+        # Keep the parsed documents; only their diagnostics depend on the rules
+        for uri in self._entries:
+            self.reset_diagnostics(uri)
+
+    @property
+    def maxsize(self) -> int:
+        return self._maxsize
+
+    @maxsize.setter
+    def maxsize(self, value: int) -> None:
+        self._maxsize = max(1, value)
+        self._evict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, uri: str) -> bool:
+        return uri in self._entries
+
+    def get(
+        self,
+        source: str,
+        path: str = "<stdin>",
+        uri: str | None = None,
+        version: int | None = None,
+    ) -> CacheEntry:
+        """Return the entry for ``source``, parsing it on a miss."""
+        entry = self.find(source, uri, version)
+        if entry is not None:
+            return entry
+        key = uri if uri is not None else content_hash(source)
+        return self.put(key, parse(source, path), version)
+
+    def find(
+        self, source: str, uri: str | None = None, version: int | None = None
+    ) -> CacheEntry | None:
+        """Return the entry for ``source`` if it is cached, without parsing on a miss."""
+        key = uri if uri is not None else content_hash(source)
+        entry = self._entries.get(key)
+        if entry is None or not (
+            (version is not None and entry.version == version)
+            or entry.document.raw_content == source
+        ):
+            return None
+        if version is not None:
+            entry.version = version
+        self._entries.move_to_end(key)
+        return entry
+
+    def peek(self, uri: str) -> CacheEntry | None:
+        """Return the cached entry for ``uri`` without parsing or reordering."""
+        return self._entries.get(uri)
+
+    def put(self, uri: str, document: PromptDocument, version: int | None = None) -> CacheEntry:
+        """Store an already parsed document, e.g. from an incremental re-parse."""
+        entry = CacheEntry(document, version, self._rules)
+        self._entries[uri] = entry
+        self._entries.move_to_end(uri)
+        self._evict()
+        return entry
+
+    def reset_diagnostics(self, uri: str) -> None:
+        """Keep the parsed document of ``uri`` but validate it again on next use."""
+        entry = self._entries.get(uri)
+        if entry is not None:
+            self._entries[uri] = CacheEntry(entry.document, entry.version, self._rules)
+
+    def with_links(self) -> list[str]:
+        """URIs of cached documents containing links, whose diagnostics depend on disk."""
+        return [uri for uri, entry in self._entries.items() if entry.document.links]
+
+    def discard(self, uri: str) -> None:
+        self._entries.pop(uri, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def _evict(self) -> None:
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
@@ -0,0 +1,291 @@
+"""Workspace-wide index of the symbols declared by ``.prompt.md`` files.
+
+Each file is reduced to a :class:`PromptSummary` holding its frontmatter name
+and version, section headings, input variables and output fields. Lookups go
+through a sorted list of ``(folded name, uri)`` keys, so a prefix query is a
+bisection plus a walk over the matches, without touching any file.
+
+The index is safe to use from several threads: :meth:`WorkspaceIndex.scan`
+parses files outside the lock and only holds it to apply each batch, so
+queries are answered while a large workspace is still being indexed.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from bisect import bisect_left, insort
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+from sys import intern
+
+from lsprotocol import types
+from pygls import uris
+
+from prompt_lint.discovery import iter_prompt_files
+from prompt_lint.models import Fact, PromptDocument, SectionKind
+from prompt_lint.parser import parse
+
+PROMPT_SUFFIX = ".prompt.md"
+WATCH_GLOB = "**/*.prompt.md"
+
+# References are never shown as symbols, so files are parsed without them
+INDEX_FACTS = Fact.FRONTMATTER | Fact.SECTIONS | Fact.VARIABLES | Fact.OUTPUT_FIELDS
+
+DEFAULT_SEARCH_LIMIT = 500
+
+# Files parsed before the first update of the shared index during a scan
+_SCAN_BATCH = 256
+
+
+@dataclass(frozen=True, slots=True)
+class IndexedSymbol:
+    """A named declaration in a prompt file, with a 0-based position."""
+
+    name: str
+    kind: types.SymbolKind
+    uri: str
+    line: int
+    character: int
+    # The prompt name for sections, the section heading for variables and fields
+    container: str | None = None
+    detail: str | None = None
+
+
+@dataclass(slots=True)
+class PromptSummary:
+    """The indexed facts of one prompt file."""
+
+    uri: str
+    name: str | None
+    version: str | None
+    symbols: list[IndexedSymbol] = field(default_factory=list)
+
+    def folded_names(self) -> set[str]:
+        return {intern(s.name.casefold()) for s in self.symbols}
+
+
+def summarize(document: PromptDocument, uri: str) -> PromptSummary:
+    """Reduce a parsed document to the symbols it declares."""
+    name = version = None
+    symbols: list[IndexedSymbol] = []
+    fm = document.frontmatter
+    if fm is not None:
+        data = fm.data
+        if data.get("name") is not None:
+            name = str(data["name"])
+        if data.get("version") is not None:
+            version = str(data["version"])
+        if name:
+            # Point at the opening "---"
+            symbols.append(
+                IndexedSymbol(
+                    name, types.SymbolKind.File, uri, fm.start_line - 1, 0, detail=version
+                )
+            )
+
+    for section in document.sections:
+        heading = section.raw_heading
+        symbols.append(
+            IndexedSymbol(heading, types.SymbolKind.Module, uri, section.start_line - 1, 0, name)
+        )
+        for var in section.variables:
+            # The position is the backtick before the name
+            symbols.append(
+                IndexedSymbol(
+                    var.name,
+                    types.SymbolKind.Variable,
+                    uri,
+                    var.position.line - 1,
+                    var.position.column,
+                    heading,
+                    var.type,
+                )
+            )
+        if section.kind == SectionKind.OUTPUT:
+            for output in section.output_fields:
+                # The position is the opening "**"
+                symbols.append(
+                    IndexedSymbol(
+                        output.name,
+                        types.SymbolKind.Field,
+                        uri,
+                        output.position.line - 1,
+                        output.position.column + 1,
+                        heading,
+                    )
+                )
+    return PromptSummary(uri, name, version, symbols)
+
+
+def summarize_file(path: str | os.PathLike[str]) -> PromptSummary | None:
+    """Parse and summarize a file on disk; None if it cannot be read."""
+    try:
+        content = Path(path).read_text(encoding="utf-8")
+    except (OSError, UnicodeDecodeError):
+        return None
+    uri = path_to_uri(path)
+    return summarize(parse(content, str(path), facts=INDEX_FACTS), uri)
+
+
+class WorkspaceIndex:
+    """Symbols of every prompt in the workspace, searchable by name prefix.
+
+    Files open in the editor are indexed from their buffers with
+    :meth:`update_document`; until :meth:`release` is called, changes on disk
+    to those files are ignored.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._files: dict[str, PromptSummary] = {}
+        # Sorted (casefolded symbol name, uri) pairs, one per name and file
+        self._keys: list[tuple[str, str]] = []
+        self._open: set[str] = set()
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def __contains__(self, uri: str) -> bool:
+        return uri in self._files
+
+    def summary(self, uri: str) -> PromptSummary | None:
+        return self._files.get(uri)
+
+    def symbols(self, uri: str) -> list[IndexedSymbol]:
+        """The symbols of one file in document order."""
+        summary = self._files.get(uri)
+        return list(summary.symbols) if summary is not None else []
+
+    def search(self, query: str, limit: int = DEFAULT_SEARCH_LIMIT) -> list[IndexedSymbol]:
+        """Return up to ``limit`` symbols whose name starts with ``query``, ignoring case.
+
+        Results are ordered by name, then by file.
+        """
+        prefix = query.casefold()
+        results: list[IndexedSymbol] = []
+        with self._lock:
+            keys = self._keys
+            i = bisect_left(keys, (prefix, ""))
+            while i < len(keys) and len(results) < limit:
+                folded, uri = keys[i]
+                if not folded.startswith(prefix):
+                    break
+                for symbol in self._files[uri].symbols:
+                    if symbol.name.casefold() == folded:
+                        results.append(symbol)
+                i += 1
+        return results[:limit]
+
+    def update_document(self, uri: str, document: PromptDocument) -> None:
+        """Index a document open in the editor; its buffer takes precedence over disk."""
+        summary = summarize(document, uri)
+        with self._lock:
+            self._open.add(uri)
+            self._apply([summary])
+
+    def release(self, uri: str) -> None:
+        """Stop tracking the editor buffer of ``uri`` and re-index it from disk."""
+        with self._lock:
+            self._open.discard(uri)
+        path = uris.to_fs_path(uri)
+        if path is not None:
+            self.update_file(path)
+
+    def update_file(self, path: str | os.PathLike[str]) -> None:
+        """Re-index one file from disk, or drop it if it no longer exists."""
+        uri = path_to_uri(path)
+        if uri in self._open:
+            return
+        summary = summarize_file(path)
+        with self._lock:
+            if uri in self._open:
+                return
+            if summary is None:
+                self._remove(uri)
+            else:
+                self._apply([summary])
+
+    def remove(self, uri: str) -> None:
+        with self._lock:
+            if uri not in self._open:
+                self._remove(uri)
+
+    def remove_tree(self, uri: str) -> None:
+        """Drop every indexed file at or below ``uri``, e.g. a deleted directory."""
+        prefix = uri.rstrip("/") + "/"
+        with self._lock:
+            for indexed in [u for u in self._files if u == uri or u.startswith(prefix)]:
+                if indexed not in self._open:
+                    self._remove(indexed)
+
+    def scan(self, roots: Iterable[str | os.PathLike[str]]) -> int:
+        """Index every prompt file under ``roots``; returns the number of files seen.
+
+        Files are found as ``prompt-lint lint`` finds them, see
+        :func:`~prompt_lint.discovery.iter_prompt_files`. Files open in the
+        editor keep their buffer contents.
+        """
+        count = 0
+        batch: list[PromptSummary] = []
+        for path in iter_prompt_files(os.fspath(root) for root in roots):
+            summary = summarize_file(path)
+            count += 1
+            if summary is not None:
+                batch.append(summary)
+            # Batches grow with the index, so re-sorting the keys stays
+            # linear in the number of files overall
+            if len(batch) >= max(_SCAN_BATCH, len(self._files) // 2):
+                self._apply_batch(batch)
+                batch = []
+        self._apply_batch(batch)
+        return count
+
+    def clear(self) -> None:
+        with self._lock:
+            self._files.clear()
+            self._keys.clear()
+            self._open.clear()
+
+    def _apply_batch(self, summaries: list[PromptSummary]) -> None:
+        with self._lock:
+            self._apply([s for s in summaries if s.uri not in self._open])
+
+    def _apply(self, summaries: list[PromptSummary]) -> None:
+        """Replace the summaries of their files; the caller holds the lock."""
+        added: list[tuple[str, str]] = []
+        for summary in summaries:
+            uri = summary.uri
+            old = self._files.get(uri)
+            names = summary.folded_names()
+            old_names = old.folded_names() if old is not None else set()
+            for name in old_names - names:
+                self._delete_key((name, uri))
+            added.extend((name, uri) for name in names - old_names)
+            self._files[uri] = summary
+
+        if len(added) > 64:
+            # Sorting the appended run merges it in linear time
+            self._keys.extend(added)
+            self._keys.sort()
+        else:
+            for key in added:
+                insort(self._keys, key)
+
+    def _remove(self, uri: str) -> None:
+        old = self._files.pop(uri, None)
+        if old is not None:
+            for name in old.folded_names():
+                self._delete_key((name, uri))
+
+    def _delete_key(self, key: tuple[str, str]) -> None:
+        i = bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            del self._keys[i]
+
+
+def path_to_uri(path: str | os.PathLike[str]) -> str:
+    """The ``file://`` URI of ``path``, spelled the way pygls spells document URIs."""
+    absolute = os.path.abspath(path)
+    return uris.from_fs_path(absolute) or Path(absolute).as_uri()
@@ -0,0 +1,101 @@
+"""Debounced validation of open documents on a background thread.
+
+Parsing stays on the event loop, where incremental re-parses are cheap and
+hover, completion and symbol requests need the current document. Running the
+rules is the expensive part, so it is done by :class:`ValidationScheduler`:
+
+- each edit (re)starts a short delay, so a burst of keystrokes leads to one
+  validation of the last version;
+- a new version cancels the pending validation of the previous one, which
+  stops between two rules if it is already running;
+- results are handed to the publish callback only if they were not
+  cancelled, and the callback drops those that are stale by then.
+
+All validations run on a single worker thread, one at a time. Directory
+listings (:mod:`prompt_lint.fscache`) are only touched from that thread, and
+:meth:`ValidationScheduler.run` executes other work that needs them there too.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import TypeVar
+
+from prompt_lint.lsp.cache import CacheEntry
+from prompt_lint.models import Diagnostic
+
+T = TypeVar("T")
+
+# Seconds between the last edit of a document and its validation
+DEFAULT_DEBOUNCE = 0.15
+
+PublishCallback = Callable[[str, CacheEntry, list[Diagnostic]], None]
+
+
+class ValidationScheduler:
+    """Validate documents off the event loop, keeping only the latest request per URI."""
+
+    def __init__(self, publish: PublishCallback, debounce: float = DEFAULT_DEBOUNCE) -> None:
+        self.debounce = debounce
+        self._publish = publish
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="prompt-lint-validate"
+        )
+        self._pending: dict[str, tuple[asyncio.Task[None], threading.Event]] = {}
+
+    def __contains__(self, uri: str) -> bool:
+        return uri in self._pending
+
+    def schedule(
+        self, uri: str, entry: CacheEntry, delay: float | None = None
+    ) -> asyncio.Task[None]:
+        """Validate ``entry`` after ``delay`` seconds (the debounce by default).
+
+        Must be called from the event loop. A validation already scheduled or
+        running for ``uri`` is cancelled.
+        """
+        self.cancel(uri)
+        cancelled = threading.Event()
+        task = asyncio.ensure_future(
+            self._validate(uri, entry, cancelled, self.debounce if delay is None else delay)
+        )
+        self._pending[uri] = (task, cancelled)
+        task.add_done_callback(lambda _: self._done(uri, task))
+        return task
+
+    def cancel(self, uri: str) -> None:
+        """Cancel the validation of ``uri``, whether it is waiting or running."""
+        pending = self._pending.pop(uri, None)
+        if pending is not None:
+            task, cancelled = pending
+            cancelled.set()
+            task.cancel()
+
+    def cancel_all(self) -> None:
+        for uri in list(self._pending):
+            self.cancel(uri)
+
+    async def run(self, fn: Callable[..., T], *args: object) -> T:
+        """Run ``fn`` on the validation thread, between two validations."""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    def shutdown(self) -> None:
+        self.cancel_all()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _validate(
+        self, uri: str, entry: CacheEntry, cancelled: threading.Event, delay: float
+    ) -> None:
+        if delay > 0:
+            await asyncio.sleep(delay)
+        diagnostics = await self.run(entry.compute_diagnostics, cancelled.is_set)
+        if diagnostics is not None and not cancelled.is_set():
+            self._publish(uri, entry, diagnostics)
+
+    def _done(self, uri: str, task: asyncio.Task[None]) -> None:
+        pending = self._pending.get(uri)
+        if pending is not None and pending[0] is task:
+            del self._pending[uri]
@@ -2,17 +2,61 @@
 
 from __future__ import annotations
 
+import asyncio
+import os
 import re
+import time
+from collections.abc import Iterable, Sequence
 
 from lsprotocol import types
+from pygls import uris
 from pygls.lsp.server import LanguageServer
 
-from prompt_lint import __version__
-from prompt_lint.models import Severity
-from prompt_lint.parser import parse, VAR_REFERENCE_RE
-from prompt_lint.validator import validate
+from prompt_lint import __version__, fscache, includes
+from prompt_lint.lsp.cache import CacheEntry, DocumentCache
+from prompt_lint.lsp.index import (
+    PROMPT_SUFFIX,
+    WATCH_GLOB,
+    IndexedSymbol,
+    WorkspaceIndex,
+    summarize,
+)
+from prompt_lint.lsp.scheduler import ValidationScheduler
+from prompt_lint.models import Diagnostic, PromptDocument, Severity
+from prompt_lint.parser import parse, reparse, resolve_includes, VAR_REFERENCE_RE
+from prompt_lint.rules import get_all_rules, get_registry, select_rules
+
+server = LanguageServer(
+    "prompt-lint",
+    __version__,
+    text_document_sync_kind=types.TextDocumentSyncKind.Incremental,
+)
+
+# Parsed documents and their diagnostics, shared by all handlers. The size can be
+# changed with the "cacheSize" initialization option, and the rules with the
+# "select" and "ignore" options.
+document_cache = DocumentCache()
+
+# Open documents are validated in the background, "debounceMs" after the last
+# edit (see publish_validated() for where the results go)
+validation = ValidationScheduler(lambda *args: publish_validated(*args))
 
-server = LanguageServer("prompt-lint", __version__)
+# Symbols of every prompt under the workspace roots, filled in the background
+# after initialization unless the "indexWorkspace" option is false
+workspace_index = WorkspaceIndex()
+index_workspace = True
+
+# Initialization options, applied to the rules once initialize is answered
+rule_options: object = None
+
+# Directory listings used by R006 for the lifetime of the server, kept current
+# from file watcher events; installed as the active cache on initialization
+file_system_cache = fscache.FileSystemCache()
+
+# Files included by open documents, parsed once and kept until they change on
+# disk, and which open documents include which files
+include_cache = includes.IncludeCache()
+include_graph = includes.DependencyGraph()
 
 # --- Canonical section headings for completion ---
 
@@ -31,11 +75,16 @@ SECTION_COMPLETIONS = [
 # --- Pure logic functions (testable without LSP) ---
 
 
-def build_diagnostics(source: str, path: str) -> list[types.Diagnostic]:
+def build_diagnostics(
+    source: str, path: str, uri: str | None = None, version: int | None = None
+) -> list[types.Diagnostic]:
     """Parse and validate source, returning LSP diagnostics."""
-    prompt_doc = parse(source, path)
-    results = validate(prompt_doc)
+    entry = document_cache.get(source, path, uri=uri if uri is not None else path, version=version)
+    return to_lsp_diagnostics(entry.diagnostics)
+
 
+def to_lsp_diagnostics(results: list[Diagnostic]) -> list[types.Diagnostic]:
+    """Convert prompt-lint diagnostics to LSP diagnostics."""
     return [
         types.Diagnostic(
             range=types.Range(
@@ -54,8 +103,32 @@ def build_diagnostics(source: str, path: str) -> list[types.Diagnostic]:
     ]
 
 
+def _read_only_document(
+    source: str, uri: str | None, version: int | None, path: str | None
+) -> PromptDocument:
+    """The parsed document for a request that does not change it.
+
+    The cached entry is used when current. On a miss the text is parsed
+    without replacing the entry: entries belong to the handlers that
+    validate what they store. Without ``path`` it is taken from ``uri``,
+    so links and includes resolve next to the document.
+    """
+    entry = document_cache.find(source, uri=uri, version=version)
+    if entry is not None:
+        return entry.document
+    if path is None:
+        path = (uris.to_fs_path(uri) if uri is not None else None) or "<stdin>"
+    return parse(source, path)
+
+
 def compute_hover(
-    source: str, lines: list[str], line_num: int, character: int
+    source: str,
+    lines: Sequence[str],
+    line_num: int,
+    character: int,
+    uri: str | None = None,
+    version: int | None = None,
+    path: str | None = None,
 ) -> types.Hover | None:
     """Compute hover information for a position in the document."""
     try:
@@ -68,25 +141,22 @@ def compute_hover(
         end_col = match.end()
         if start_col <= character <= end_col:
             var_name = match.group(1)
-            prompt_doc = parse(source)
-
-            for var in prompt_doc.input_variables:
-                if var.name == var_name:
-                    req_label = "required" if var.required else "optional"
-                    hover_text = (
-                        f"**`{var.name}`**: `{var.type}` ({req_label})\n\n"
-                        f"{var.description}"
-                    )
-                    return types.Hover(
-                        contents=types.MarkupContent(
-                            kind=types.MarkupKind.Markdown,
-                            value=hover_text,
-                        ),
-                        range=types.Range(
-                            start=types.Position(line=line_num, character=start_col),
-                            end=types.Position(line=line_num, character=end_col),
-                        ),
-                    )
+            prompt_doc = _read_only_document(source, uri, version, path)
+
+            var = prompt_doc.get_variable(var_name)
+            if var is not None:
+                req_label = "required" if var.required else "optional"
+                hover_text = f"**`{var.name}`**: `{var.type}` ({req_label})\n\n{var.description}"
+                return types.Hover(
+                    contents=types.MarkupContent(
+                        kind=types.MarkupKind.Markdown,
+                        value=hover_text,
+                    ),
+                    range=types.Range(
+                        start=types.Position(line=line_num, character=start_col),
+                        end=types.Position(line=line_num, character=end_col),
+                    ),
+                )
 
             return types.Hover(
                 contents=types.MarkupContent(
@@ -103,7 +173,13 @@ def compute_hover(
 
 
 def compute_completions(
-    source: str, lines: list[str], line_num: int, character: int
+    source: str,
+    lines: Sequence[str],
+    line_num: int,
+    character: int,
+    uri: str | None = None,
+    version: int | None = None,
+    path: str | None = None,
 ) -> list[types.CompletionItem]:
     """Compute completion items for a position in the document."""
     try:
@@ -116,7 +192,7 @@ def compute_completions(
 
     # Variable completion: triggered by {{
     if line_before_cursor.rstrip().endswith("{{") or re.search(r"\{\{\w*$", line_before_cursor):
-        prompt_doc = parse(source)
+        prompt_doc = _read_only_document(source, uri, version, path)
         for var in prompt_doc.input_variables:
             req_label = "required" if var.required else "optional"
             items.append(
@@ -144,60 +220,436 @@ def compute_completions(
     return items
 
 
+def to_workspace_symbol(symbol: IndexedSymbol) -> types.WorkspaceSymbol:
+    position = types.Position(line=symbol.line, character=symbol.character)
+    return types.WorkspaceSymbol(
+        name=symbol.name,
+        kind=symbol.kind,
+        location=types.Location(
+            uri=symbol.uri,
+            range=types.Range(
+                start=position,
+                end=types.Position(line=symbol.line, character=symbol.character + len(symbol.name)),
+            ),
+        ),
+        container_name=symbol.container,
+    )
+
+
+def compute_workspace_symbols(query: str) -> list[types.WorkspaceSymbol]:
+    """Look up workspace symbols by name prefix in the workspace index."""
+    return [to_workspace_symbol(s) for s in workspace_index.search(query)]
+
+
+def compute_document_symbols(
+    document: PromptDocument, lines: Sequence[str]
+) -> list[types.DocumentSymbol]:
+    """Outline of a document: its prompt name, then sections with their declarations."""
+
+    def symbol(s: IndexedSymbol, end: types.Position | None = None) -> types.DocumentSymbol:
+        selection = types.Range(
+            start=types.Position(line=s.line, character=s.character),
+            end=types.Position(line=s.line, character=s.character + len(s.name)),
+        )
+        if s.kind == types.SymbolKind.Module and s.line < len(lines):
+            # Select the whole heading line
+            selection.end = types.Position(line=s.line, character=len(lines[s.line]))
+        return types.DocumentSymbol(
+            name=s.name,
+            kind=s.kind,
+            range=types.Range(start=selection.start, end=end) if end else selection,
+            selection_range=selection,
+            detail=s.detail,
+        )
+
+    summary = summarize(document, "")
+    section_starts = [s.line for s in summary.symbols if s.kind == types.SymbolKind.Module]
+    ends = iter(section_starts[1:])
+    result: list[types.DocumentSymbol] = []
+    children: list[types.DocumentSymbol] = []
+    for s in summary.symbols:
+        if s.kind == types.SymbolKind.File and document.frontmatter is not None:
+            end_line = document.frontmatter.end_line - 1
+            result.append(symbol(s, types.Position(line=end_line, character=3)))
+        elif s.kind == types.SymbolKind.Module:
+            children = []
+            end = next(ends, None)
+            section = symbol(
+                s,
+                types.Position(line=end, character=0)
+                if end is not None
+                else types.Position(line=len(lines) - 1, character=len(lines[-1])),
+            )
+            section.children = children
+            result.append(section)
+        else:
+            children.append(symbol(s))
+    return result
+
+
+def edited_line_range(
+    changes: Sequence[types.TextDocumentContentChangeEvent],
+) -> tuple[int, int, int] | None:
+    """Compute the line range touched by a batch of incremental changes.
+
+    Returns ``(first_line, last_line, line_delta)`` where the inclusive, 0-based
+    range is expressed in the document *before* the changes, as expected by
+    :func:`prompt_lint.parser.reparse`. Returns None if any change replaces the
+    whole document.
+    """
+    if not changes:
+        return None
+
+    lo = hi = 0
+    total_delta = 0
+    for i, change in enumerate(changes):
+        if not isinstance(change, types.TextDocumentContentChangePartial):
+            return None
+        start = change.range.start.line
+        end = change.range.end.line
+        added = change.text.count("\n")
+        delta = added - (end - start)
+        if i == 0:
+            lo, hi = start, start + added
+        else:
+            # Move the range edited so far into post-change coordinates
+            lo = lo if lo < start else (lo + delta if lo > end else start)
+            hi = hi if hi < start else (hi + delta if hi > end else start + added)
+            lo, hi = min(lo, start), max(hi, start + added)
+        total_delta += delta
+
+    # Lines after the range only moved, so map its end back by the total shift
+    return lo, hi - total_delta, total_delta
+
+
 # --- LSP event handlers ---
 
 
-def _validate_and_publish(ls: LanguageServer, uri: str) -> None:
-    """Parse, validate, and publish diagnostics for a document."""
+def _validate(
+    ls: LanguageServer, uri: str, version: int | None, delay: float | None = None
+) -> None:
+    """Schedule validation of the current text of a document."""
     doc = ls.workspace.get_text_document(uri)
-    diagnostics = build_diagnostics(doc.source, doc.path)
+    entry = document_cache.get(doc.source, doc.path, uri=uri, version=version)
+    include_graph.update(uri, entry.document.included_paths)
+    validation.schedule(uri, entry, delay)
+
+
+def publish_validated(uri: str, entry: CacheEntry, diagnostics: list[Diagnostic]) -> None:
+    """Publish the result of a background validation.
 
-    ls.text_document_publish_diagnostics(
+    Results for an entry that is no longer cached, because the document was
+    edited, closed or had its diagnostics reset meanwhile, are stale and
+    dropped; the newer entry has its own validation scheduled.
+    """
+    if document_cache.peek(uri) is not entry:
+        return
+    server.text_document_publish_diagnostics(
         types.PublishDiagnosticsParams(
-            uri=doc.uri,
-            version=doc.version,
-            diagnostics=diagnostics,
+            uri=uri,
+            version=entry.version,
+            diagnostics=to_lsp_diagnostics(diagnostics),
+        )
+    )
+    if index_workspace:
+        workspace_index.update_document(uri, entry.document)
+
+
+def _selectors(value: object) -> list[str]:
+    """Read a rule selector option given as a list or a comma-separated string."""
+    if isinstance(value, str):
+        return value.split(",")
+    if isinstance(value, list):
+        return [str(v) for v in value]
+    return []
+
+
+def configure_rules(ls: LanguageServer, options: object) -> None:
+    """Apply the "select" and "ignore" initialization options."""
+    registry = get_registry()
+    ls.window_log_message(
+        types.LogMessageParams(
+            type=types.MessageType.Log,
+            message=(
+                f"Loaded {len(registry.rules)} rules in {registry.discovery_time * 1000:.1f} ms"
+            ),
+        )
+    )
+    for error in registry.errors:
+        ls.window_log_message(types.LogMessageParams(type=types.MessageType.Warning, message=error))
+    if not isinstance(options, dict) or not ("select" in options or "ignore" in options):
+        return
+    try:
+        document_cache.rules = select_rules(
+            get_all_rules(),
+            _selectors(options.get("select")),
+            _selectors(options.get("ignore")),
+        )
+    except ValueError as e:
+        ls.window_show_message(
+            types.ShowMessageParams(type=types.MessageType.Error, message=f"prompt-lint: {e}")
+        )
+
+
+def workspace_roots(ls: LanguageServer) -> list[str]:
+    """Local paths of the workspace folders, or of the root if there are none."""
+    roots = [uris.to_fs_path(folder.uri) for folder in ls.workspace.folders.values()]
+    if not roots and ls.workspace.root_path:
+        roots = [ls.workspace.root_path]
+    return [root for root in roots if root]
+
+
+def _watch_files(ls: LanguageServer) -> None:
+    """Ask the client to report changes on disk, if it can.
+
+    Prompt files are watched for the workspace index; creations and
+    deletions of any file invalidate the directory listings used by R006,
+    and changes to Markdown files the included files they may be.
+    """
+    workspace = ls.client_capabilities.workspace
+    watched = workspace.did_change_watched_files if workspace is not None else None
+    if watched is None or not watched.dynamic_registration:
+        return
+    watchers = [
+        types.FileSystemWatcher(
+            glob_pattern="**/*", kind=types.WatchKind.Create | types.WatchKind.Delete
+        ),
+        types.FileSystemWatcher(glob_pattern="**/*.md", kind=types.WatchKind.Change),
+    ]
+    if index_workspace:
+        watchers.append(types.FileSystemWatcher(glob_pattern=WATCH_GLOB))
+    ls.client_register_capability(
+        types.RegistrationParams(
+            registrations=[
+                types.Registration(
+                    id="prompt-lint-watch-files",
+                    method=types.WORKSPACE_DID_CHANGE_WATCHED_FILES,
+                    register_options=types.DidChangeWatchedFilesRegistrationOptions(
+                        watchers=watchers
+                    ),
+                )
+            ]
+        )
+    )
+
+
+def invalidate_listings(changes: Sequence[types.FileEvent]) -> bool:
+    """Drop the directory listings affected by created or deleted files.
+
+    Returns whether any were dropped. Runs on the validation thread, which
+    is the only one using the listings.
+    """
+    touched = False
+    for change in changes:
+        if change.type != types.FileChangeType.Changed:
+            path = uris.to_fs_path(change.uri)
+            if path is not None:
+                file_system_cache.invalidate(path)
+                touched = True
+    return touched
+
+
+def reset_linked_documents() -> list[str]:
+    """Discard the diagnostics of cached documents with links.
+
+    Returns their URIs; the open ones need validating again.
+    """
+    stale = document_cache.with_links()
+    for uri in stale:
+        document_cache.reset_diagnostics(uri)
+    return stale
+
+
+def reload_includes(paths: Iterable[str]) -> list[tuple[str, CacheEntry]]:
+    """Resolve again the includes of cached documents including any of ``paths``.
+
+    ``paths`` are files that changed on disk. Returns the URIs of the
+    affected documents with their new cache entries, which need validating;
+    no other document is touched.
+    """
+    stale: set[str] = set()
+    for path in paths:
+        include_cache.invalidate(path)
+        stale |= include_graph.dependents(os.path.normpath(os.path.abspath(path)))
+    reloaded = []
+    for uri in sorted(stale):
+        entry = document_cache.peek(uri)
+        if entry is None:
+            continue
+        document = resolve_includes(entry.document)
+        include_graph.update(uri, document.included_paths)
+        reloaded.append((uri, document_cache.put(uri, document, entry.version)))
+    return reloaded
+
+
+def apply_file_changes(changes: Sequence[types.FileEvent]) -> None:
+    """Update the workspace index from file watcher events."""
+    for change in changes:
+        if change.type == types.FileChangeType.Deleted:
+            # A deleted directory is reported as a single event
+            workspace_index.remove_tree(change.uri)
+        elif change.uri.endswith(PROMPT_SUFFIX):
+            path = uris.to_fs_path(change.uri)
+            if path is not None:
+                workspace_index.update_file(path)
+
+
+@server.feature(types.INITIALIZE)
+def initialize(ls: LanguageServer, params: types.InitializeParams) -> None:
+    global index_workspace, rule_options
+    options = params.initialization_options
+    if isinstance(options, dict) and isinstance(options.get("cacheSize"), int):
+        document_cache.maxsize = options["cacheSize"]
+    if isinstance(options, dict) and options.get("indexWorkspace") is False:
+        index_workspace = False
+    if isinstance(options, dict) and isinstance(options.get("debounceMs"), int):
+        validation.debounce = max(0, options["debounceMs"]) / 1000
+    fscache.active = file_system_cache
+    includes.active = include_cache
+    # Rules are discovered in initialized(), which clients send before any
+    # document, so importing them does not delay the initialize response
+    rule_options = options
+
+
+@server.feature(types.INITIALIZED)
+async def initialized(ls: LanguageServer, params: types.InitializedParams) -> None:
+    configure_rules(ls, rule_options)
+    # Watch first, so files changed while the scan runs are not missed
+    _watch_files(ls)
+    if not index_workspace:
+        return
+    started = time.perf_counter()
+    count = await asyncio.get_running_loop().run_in_executor(
+        None, workspace_index.scan, workspace_roots(ls)
+    )
+    ls.window_log_message(
+        types.LogMessageParams(
+            type=types.MessageType.Log,
+            message=f"Indexed {count} prompts in {time.perf_counter() - started:.2f} s",
         )
     )
 
 
 @server.feature(types.TEXT_DOCUMENT_DID_OPEN)
 def did_open(ls: LanguageServer, params: types.DidOpenTextDocumentParams) -> None:
-    _validate_and_publish(ls, params.text_document.uri)
+    _validate(ls, params.text_document.uri, params.text_document.version, delay=0)
 
 
 @server.feature(types.TEXT_DOCUMENT_DID_CHANGE)
 def did_change(ls: LanguageServer, params: types.DidChangeTextDocumentParams) -> None:
-    _validate_and_publish(ls, params.text_document.uri)
+    uri = params.text_document.uri
+    version = params.text_document.version
+    doc = ls.workspace.get_text_document(uri)
+    previous = document_cache.peek(uri)
+    line_range = edited_line_range(params.content_changes)
+
+    if previous is None or line_range is None:
+        prompt_doc = parse(doc.source, doc.path)
+    else:
+        prompt_doc = reparse(previous.document, doc.source, *line_range)
+
+    include_graph.update(uri, prompt_doc.included_paths)
+    validation.schedule(uri, document_cache.put(uri, prompt_doc, version))
 
 
 @server.feature(types.TEXT_DOCUMENT_DID_SAVE)
 def did_save(ls: LanguageServer, params: types.DidSaveTextDocumentParams) -> None:
-    _validate_and_publish(ls, params.text_document.uri)
+    doc = ls.workspace.get_text_document(params.text_document.uri)
+    _validate(ls, doc.uri, doc.version, delay=0)
+    # Documents including the saved file see its new content
+    for uri, entry in reload_includes([doc.path]):
+        validation.schedule(uri, entry, delay=0)
+
+
+@server.feature(types.TEXT_DOCUMENT_DID_CLOSE)
+def did_close(ls: LanguageServer, params: types.DidCloseTextDocumentParams) -> None:
+    validation.cancel(params.text_document.uri)
+    document_cache.discard(params.text_document.uri)
+    include_graph.discard(params.text_document.uri)
+    if index_workspace:
+        # The buffer may have had unsaved changes; the file on disk is what remains
+        workspace_index.release(params.text_document.uri)
+
+
+@server.feature(types.WORKSPACE_DID_CHANGE_WATCHED_FILES)
+async def did_change_watched_files(
+    ls: LanguageServer, params: types.DidChangeWatchedFilesParams
+) -> None:
+    if await validation.run(invalidate_listings, params.changes):
+        for uri in reset_linked_documents():
+            if uri in ls.workspace.text_documents:
+                _validate(ls, uri, ls.workspace.get_text_document(uri).version, delay=0)
+    changed = [uris.to_fs_path(change.uri) for change in params.changes]
+    for uri, entry in reload_includes(path for path in changed if path is not None):
+        validation.schedule(uri, entry, delay=0)
+    if index_workspace:
+        # Re-parsing many files, e.g. after a branch switch, must not block requests
+        await asyncio.get_running_loop().run_in_executor(None, apply_file_changes, params.changes)
+
+
+# Hover and completion are coroutines so that pygls runs them as tasks, which
+# a $/cancelRequest arriving before they start can cancel
 
 
 @server.feature(types.TEXT_DOCUMENT_HOVER)
-def hover(ls: LanguageServer, params: types.HoverParams) -> types.Hover | None:
+async def hover(ls: LanguageServer, params: types.HoverParams) -> types.Hover | None:
     """Show variable definition info on hover over {{var}}."""
     doc = ls.workspace.get_text_document(params.text_document.uri)
-    return compute_hover(doc.source, doc.lines, params.position.line, params.position.character)
+    return compute_hover(
+        doc.source,
+        doc.lines,
+        params.position.line,
+        params.position.character,
+        uri=doc.uri,
+        version=doc.version,
+        path=doc.path,
+    )
 
 
 @server.feature(
     types.TEXT_DOCUMENT_COMPLETION,
     types.CompletionOptions(trigger_characters=["{", "#"]),
 )
-def completions(
+async def completions(
     ls: LanguageServer, params: types.CompletionParams
 ) -> types.CompletionList:
     """Provide completions for {{variables and # sections."""
     doc = ls.workspace.get_text_document(params.text_document.uri)
     items = compute_completions(
-        doc.source, doc.lines, params.position.line, params.position.character
+        doc.source,
+        doc.lines,
+        params.position.line,
+        params.position.character,
+        uri=doc.uri,
+        version=doc.version,
+        path=doc.path,
     )
     return types.CompletionList(is_incomplete=False, items=items)
 
 
+@server.feature(types.WORKSPACE_SYMBOL)
+def workspace_symbol(
+    ls: LanguageServer, params: types.WorkspaceSymbolParams
+) -> list[types.WorkspaceSymbol]:
+    """Find prompts, sections, variables and output fields across the workspace."""
+    return compute_workspace_symbols(params.query)
+
+
+@server.feature(types.TEXT_DOCUMENT_DOCUMENT_SYMBOL)
+def document_symbol(
+    ls: LanguageServer, params: types.DocumentSymbolParams
+) -> list[types.DocumentSymbol]:
+    """Outline the open document from its cached parse."""
+    doc = ls.workspace.get_text_document(params.text_document.uri)
+    entry = document_cache.get(doc.source, doc.path, uri=doc.uri, version=doc.version)
+    return compute_document_symbols(entry.document, doc.lines)
+
+
+@server.feature(types.SHUTDOWN)
+def shutdown(ls: LanguageServer, params: None) -> None:
+    validation.shutdown()
+
+
 def main() -> None:
     """Entry point for the LSP server."""
     server.start_io()
@@ -2,8 +2,10 @@
 
 from __future__ import annotations
 
+from collections.abc import Mapping
 from dataclasses import dataclass, field
-from enum import Enum
+from enum import Enum, Flag
+from functools import cached_property
 from typing import Any
 
 
@@ -25,6 +27,35 @@ class SectionKind(Enum):
     CHANGELOG = "Changelog"
 
 
+class Fact(Flag):
+    """Kinds of information the parser extracts from a document.
+
+    Rules declare the facts they read so the parser can skip the rest.
+    Variables, references, output fields and links are stored per section, so
+    any of them implies ``SECTIONS``. ``INCLUDES`` resolves include directives,
+    so the sections of included files count as the document's own.
+    """
+
+    FRONTMATTER = 1
+    SECTIONS = 2
+    VARIABLES = 4
+    REFERENCES = 8
+    OUTPUT_FIELDS = 16
+    LINKS = 32
+    INCLUDES = 64
+
+
+ALL_FACTS = (
+    Fact.FRONTMATTER
+    | Fact.SECTIONS
+    | Fact.VARIABLES
+    | Fact.REFERENCES
+    | Fact.OUTPUT_FIELDS
+    | Fact.LINKS
+    | Fact.INCLUDES
+)
+
+
 # Map heading text (lowered) to canonical SectionKind
 SECTION_ALIASES: dict[str, SectionKind] = {}
 
@@ -67,7 +98,7 @@ REQUIRED_SECTIONS: set[SectionKind] = {
 REQUIRED_FRONTMATTER_FIELDS: list[str] = ["name", "description", "version"]
 
 
-@dataclass
+@dataclass(slots=True)
 class Position:
     """1-based line and column position in source."""
 
@@ -75,7 +106,7 @@ class Position:
     column: int = 1
 
 
-@dataclass
+@dataclass(slots=True)
 class Variable:
     """An input variable definition."""
 
@@ -86,7 +117,7 @@ class Variable:
     position: Position
 
 
-@dataclass
+@dataclass(slots=True)
 class VariableReference:
     """A {{variable}} reference in the document."""
 
@@ -95,7 +126,7 @@ class VariableReference:
     section: SectionKind | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class OutputField:
     """An output field definition (**name**)."""
 
@@ -103,76 +134,461 @@ class OutputField:
     position: Position
 
 
-@dataclass
+@dataclass(slots=True)
+class Link:
+    """A Markdown link or image, ``[text](target)``."""
+
+    target: str
+    position: Position  # of the target
+    # Directory the target is relative to, for links in included files
+    base: str | None = None
+
+
+@dataclass(slots=True)
+class Include:
+    """An include directive, ``<!-- include: path -->``, on a line of its own."""
+
+    target: str
+    position: Position  # of the target
+
+
+@dataclass(slots=True)
+class SourceText:
+    """The text of a document, shared by the document and all its sections.
+
+    Sections refer to their content by offsets into it instead of keeping a
+    copy; :meth:`PromptDocument.drop_source` releases the text.
+    """
+
+    text: str | None
+
+
+@dataclass(init=False, slots=True)
 class Section:
-    """A parsed section of the document."""
+    """A parsed section of the document.
+
+    ``content`` is sliced from the document text on each access; the section
+    only stores the offsets of the lines below its heading. The parser passes
+    ``source`` and the offsets; a section built with ``content`` instead gets
+    a source of its own holding just that text.
+    """
 
     kind: SectionKind | None  # None for unrecognized sections
     raw_heading: str
-    content: str
     start_line: int
-    variables: list[Variable] = field(default_factory=list)
-    references: list[VariableReference] = field(default_factory=list)
-    output_fields: list[OutputField] = field(default_factory=list)
+    source: SourceText = field(repr=False, compare=False)
+    content_start: int
+    content_end: int
+    variables: list[Variable]
+    references: list[VariableReference]
+    output_fields: list[OutputField]
+    links: list[Link]
+    includes: list[Include]
+
+    def __init__(
+        self,
+        kind: SectionKind | None,
+        raw_heading: str,
+        content: str | None = None,
+        start_line: int = 1,
+        variables: list[Variable] | None = None,
+        references: list[VariableReference] | None = None,
+        output_fields: list[OutputField] | None = None,
+        links: list[Link] | None = None,
+        includes: list[Include] | None = None,
+        *,
+        source: SourceText | None = None,
+        content_start: int = 0,
+        content_end: int = 0,
+    ) -> None:
+        if content is not None:
+            if source is not None:
+                raise TypeError("Section takes either content or source")
+            source = SourceText(content)
+            content_start, content_end = 0, len(content)
+        elif source is None:
+            raise TypeError("Section needs content or source")
+        self.kind = kind
+        self.raw_heading = raw_heading
+        self.start_line = start_line
+        self.source = source
+        self.content_start = content_start
+        self.content_end = content_end
+        self.variables = variables if variables is not None else []
+        self.references = references if references is not None else []
+        self.output_fields = output_fields if output_fields is not None else []
+        self.links = links if links is not None else []
+        self.includes = includes if includes is not None else []
+
+    @property
+    def content(self) -> str:
+        """The lines below the heading, up to the next section.
+
+        Raises ValueError once the document source has been dropped.
+        """
+        text = self.source.text
+        if text is None:
+            raise ValueError("The document source has been dropped")
+        return text[self.content_start : self.content_end]
+
 
+@dataclass(slots=True)
+class FrontmatterError:
+    """A YAML syntax error in the frontmatter."""
 
-@dataclass
+    message: str
+    position: Position
+
+
+@dataclass(init=False, eq=False, slots=True)
 class Frontmatter:
-    """Parsed YAML frontmatter."""
+    """YAML frontmatter, loaded lazily the first time ``data`` is accessed.
+
+    The parser passes the YAML text as ``raw``. Built from ``data`` instead,
+    as before loading became lazy, the mapping is used as is and ``raw`` is
+    empty.
+    """
 
-    data: dict[str, Any]
+    raw: str
     start_line: int
     end_line: int
+    _data: dict[str, Any] | None = field(repr=False)
+    _error: FrontmatterError | None = field(repr=False)
+
+    def __init__(
+        self,
+        data: dict[str, Any] | None = None,
+        start_line: int = 1,
+        end_line: int = 1,
+        *,
+        raw: str = "",
+    ) -> None:
+        self.raw = raw
+        self.start_line = start_line
+        self.end_line = end_line
+        self._data = data
+        self._error = None
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Frontmatter):
+            return NotImplemented
+        return (self.data, self.start_line, self.end_line) == (
+            other.data,
+            other.start_line,
+            other.end_line,
+        )
+
+    @property
+    def data(self) -> dict[str, Any]:
+        """The frontmatter mapping; empty if the YAML is malformed or not a mapping."""
+        return self._load()
+
+    @property
+    def error(self) -> FrontmatterError | None:
+        """The YAML syntax error, if loading ``data`` failed."""
+        self._load()
+        return self._error
+
+    def _load(self) -> dict[str, Any]:
+        if self._data is None:
+            from prompt_lint.parser import load_frontmatter
+
+            self._data, self._error = load_frontmatter(self.raw, self.start_line)
+        return self._data
+
+
+@dataclass(slots=True)
+class IncludedFile:
+    """The sections an include directive brings into a document.
+
+    Included sections keep their content, but every position in them is the
+    directive's, where diagnostics about them are reported.
+    """
+
+    include: Include
+    path: str  # absolute
+    # Its sections, followed by those of the files it includes in turn
+    sections: list[Section] = field(default_factory=list)
+    # Every file read for the directive: ``path`` and the files it includes
+    files: list[str] = field(default_factory=list)
+    # Unreadable files and include cycles
+    errors: list[str] = field(default_factory=list)
+
+
+class _DocumentIndex:
+    """Lookup tables derived from a document's sections, each built on first use."""
+
+    def __init__(self, sections: list[Section], includes: list[IncludedFile]) -> None:
+        self._own = sections
+        self._includes = includes
+
+    @cached_property
+    def all_sections(self) -> list[Section]:
+        """All sections, each directive's included ones after the section holding it."""
+        if not self._includes:
+            return self._own
+        sections: list[Section] = []
+        pending = iter(self._includes)
+        included = next(pending, None)
+        for i, section in enumerate(self._own):
+            sections.append(section)
+            end = self._own[i + 1].start_line if i + 1 < len(self._own) else None
+            while included is not None and (end is None or included.include.position.line < end):
+                sections.extend(included.sections)
+                included = next(pending, None)
+        return sections
+
+    def _first_and_included(self, kind: SectionKind) -> list[Section]:
+        """The document's first section of ``kind``, then every included one."""
+        sections = [next((s for s in self._own if s.kind == kind), None)]
+        for included in self._includes:
+            sections.extend(s for s in included.sections if s.kind == kind)
+        return [s for s in sections if s is not None]
+
+    @cached_property
+    def input_sections(self) -> list[Section]:
+        return self._first_and_included(SectionKind.INPUT)
+
+    @cached_property
+    def output_sections(self) -> list[Section]:
+        return self._first_and_included(SectionKind.OUTPUT)
+
+    @cached_property
+    def input_variables(self) -> list[Variable]:
+        if len(self.input_sections) == 1:
+            return self.input_sections[0].variables
+        return [var for section in self.input_sections for var in section.variables]
+
+    @cached_property
+    def output_fields(self) -> list[OutputField]:
+        if len(self.output_sections) == 1:
+            return self.output_sections[0].output_fields
+        return [f for section in self.output_sections for f in section.output_fields]
+
+    @cached_property
+    def sections_by_kind(self) -> dict[SectionKind, Section]:
+        by_kind: dict[SectionKind, Section] = {}
+        for section in self.all_sections:
+            if section.kind is not None and section.kind not in by_kind:
+                by_kind[section.kind] = section
+        return by_kind
+
+    @cached_property
+    def variables_by_name(self) -> dict[str, Variable]:
+        by_name: dict[str, Variable] = {}
+        for var in self.input_variables:
+            if var.name not in by_name:
+                by_name[var.name] = var
+        return by_name
+
+    @cached_property
+    def all_references(self) -> list[VariableReference]:
+        refs: list[VariableReference] = []
+        for section in self.all_sections:
+            if section.kind != SectionKind.INPUT:
+                refs.extend(section.references)
+        return refs
+
+    @cached_property
+    def references_by_name(self) -> dict[str, list[VariableReference]]:
+        by_name: dict[str, list[VariableReference]] = {}
+        for ref in self.all_references:
+            if ref.name in by_name:
+                by_name[ref.name].append(ref)
+            else:
+                by_name[ref.name] = [ref]
+        return by_name
+
+    @cached_property
+    def referenced_names(self) -> frozenset[str]:
+        return frozenset(ref.name for ref in self.all_references)
+
+    @cached_property
+    def output_field_names(self) -> frozenset[str]:
+        return frozenset(f.name for f in self.output_fields)
+
+    @cached_property
+    def output_references(self) -> list[OutputField]:
+        refs: list[OutputField] = []
+        for section in self.all_sections:
+            if section.kind not in (SectionKind.OUTPUT, None):
+                refs.extend(section.output_fields)
+        return refs
+
+    @cached_property
+    def output_reference_names(self) -> frozenset[str]:
+        return frozenset(f.name for f in self.output_references)
+
+    @cached_property
+    def links(self) -> list[Link]:
+        return [link for section in self.all_sections for link in section.links]
 
 
-@dataclass
+@dataclass(init=False)
 class PromptDocument:
-    """A fully parsed .prompt.md document."""
+    """A fully parsed .prompt.md document.
+
+    Accessors are answered from lookup tables built on first use and shared
+    by later calls; treat the returned collections as read-only. Assigning
+    ``sections`` or ``includes`` discards the tables; call :meth:`invalidate`
+    after changing either list in place.
+
+    ``sections`` holds the document's own sections. ``includes`` holds what
+    its include directives resolved to; the accessors below, and
+    :attr:`all_sections`, see the included sections as part of the document.
+
+    ``facts`` records what the parser extracted; collections for facts that
+    were not requested are empty.
+
+    Documents kept around in bulk, e.g. for an index, can release their text
+    with :meth:`drop_source` once parsed; everything extracted stays
+    available.
+
+    The parser shares one ``source`` between the document and its sections;
+    a document built with ``raw_content`` instead gets a source of its own.
+    """
 
     path: str
     frontmatter: Frontmatter | None
     sections: list[Section]
-    raw_content: str
+    source: SourceText
+    facts: Fact
+    includes: list[IncludedFile]
+    _index: _DocumentIndex | None = field(repr=False, compare=False)
+
+    def __init__(
+        self,
+        path: str,
+        frontmatter: Frontmatter | None,
+        sections: list[Section],
+        raw_content: str | None = None,
+        facts: Fact = ALL_FACTS,
+        includes: list[IncludedFile] | None = None,
+        *,
+        source: SourceText | None = None,
+    ) -> None:
+        if raw_content is not None:
+            if source is not None:
+                raise TypeError("PromptDocument takes either raw_content or source")
+            source = SourceText(raw_content)
+        elif source is None:
+            raise TypeError("PromptDocument needs raw_content or source")
+        self.path = path
+        self.frontmatter = frontmatter
+        self.sections = sections
+        self.source = source
+        self.facts = facts
+        self.includes = includes if includes is not None else []
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name in ("sections", "includes"):
+            object.__setattr__(self, "_index", None)
+        object.__setattr__(self, name, value)
+
+    def invalidate(self) -> None:
+        """Discard the lookup tables after ``sections`` or ``includes`` was modified in place."""
+        self._index = None
+
+    @property
+    def raw_content(self) -> str:
+        """The text the document was parsed from.
+
+        Raises ValueError once the source has been dropped.
+        """
+        text = self.source.text
+        if text is None:
+            raise ValueError("The document source has been dropped")
+        return text
+
+    @property
+    def has_source(self) -> bool:
+        return self.source.text is not None
+
+    def drop_source(self) -> None:
+        """Release the document text, keeping only the extracted facts.
+
+        Afterwards :attr:`raw_content` and ``Section.content`` raise
+        ValueError. The frontmatter keeps its own copy of its YAML, so its
+        ``data`` can still be loaded.
+        """
+        self.source.text = None
+
+    def _indexed(self) -> _DocumentIndex:
+        if self._index is None:
+            self._index = _DocumentIndex(self.sections, self.includes)
+        return self._index
+
+    @property
+    def all_sections(self) -> list[Section]:
+        """Own and included sections, in the order the directives place them."""
+        return self._indexed().all_sections
+
+    @property
+    def included_paths(self) -> list[str]:
+        """Every file read to resolve the include directives, each once."""
+        return list(dict.fromkeys(path for i in self.includes for path in i.files))
 
     @property
     def input_variables(self) -> list[Variable]:
-        for section in self.sections:
-            if section.kind == SectionKind.INPUT:
-                return section.variables
-        return []
+        """Variables of the Input section and of any included Input section."""
+        return self._indexed().input_variables
 
     @property
     def all_references(self) -> list[VariableReference]:
-        refs: list[VariableReference] = []
-        for section in self.sections:
-            if section.kind != SectionKind.INPUT:
-                refs.extend(section.references)
-        return refs
+        """References outside the Input section, in document order."""
+        return self._indexed().all_references
 
     @property
     def output_fields(self) -> list[OutputField]:
-        for section in self.sections:
-            if section.kind == SectionKind.OUTPUT:
-                return section.output_fields
-        return []
+        """Fields of the Output section and of any included Output section."""
+        return self._indexed().output_fields
 
     @property
     def output_references_in_steps(self) -> list[OutputField]:
         """Output field references (**name**) found in non-Output sections."""
-        refs: list[OutputField] = []
-        for section in self.sections:
-            if section.kind not in (SectionKind.OUTPUT, None):
-                refs.extend(section.output_fields)
-        return refs
+        return self._indexed().output_references
+
+    @property
+    def variables_by_name(self) -> Mapping[str, Variable]:
+        """Input variables by name; the first definition wins."""
+        return self._indexed().variables_by_name
+
+    @property
+    def references_by_name(self) -> Mapping[str, list[VariableReference]]:
+        """References outside the Input section, grouped by variable name."""
+        return self._indexed().references_by_name
+
+    @property
+    def referenced_names(self) -> frozenset[str]:
+        """Names of the variables referenced outside the Input section."""
+        return self._indexed().referenced_names
+
+    @property
+    def output_field_names(self) -> frozenset[str]:
+        """Names of the fields defined in the Output section."""
+        return self._indexed().output_field_names
+
+    @property
+    def output_reference_names(self) -> frozenset[str]:
+        """Names of output fields referenced outside the Output section."""
+        return self._indexed().output_reference_names
+
+    @property
+    def links(self) -> list[Link]:
+        """Links in all sections, in document order."""
+        return self._indexed().links
 
     def get_section(self, kind: SectionKind) -> Section | None:
-        for section in self.sections:
-            if section.kind == kind:
-                return section
-        return None
+        return self._indexed().sections_by_kind.get(kind)
+
+    def get_variable(self, name: str) -> Variable | None:
+        return self._indexed().variables_by_name.get(name)
+
+    def get_references(self, name: str) -> list[VariableReference]:
+        return self._indexed().references_by_name.get(name, [])
 
 
-@dataclass
+@dataclass(slots=True)
 class Diagnostic:
     """A single lint diagnostic."""
 
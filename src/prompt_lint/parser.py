@@ -2,17 +2,31 @@
 
 from __future__ import annotations
 
+import functools
+import os
 import re
-
-import yaml
-
+import time
+from collections.abc import Iterator
+from dataclasses import replace
+from enum import Enum
+from sys import intern
+from typing import Any
+
+from prompt_lint import includes, profiling
 from prompt_lint.models import (
+    ALL_FACTS,
+    Fact,
     Frontmatter,
+    FrontmatterError,
+    Include,
+    IncludedFile,
+    Link,
     OutputField,
     Position,
     PromptDocument,
     Section,
     SectionKind,
+    SourceText,
     Variable,
     VariableReference,
     SECTION_ALIASES,
@@ -31,24 +45,79 @@ INPUT_VAR_RE = re.compile(
     r"(?:\s*[-–—]\s*(.+))?"  # optional description
 )
 OUTPUT_FIELD_RE = re.compile(r"\*\*([^*]+)\*\*")
+# Inline links and images, [text](target "title"); the target may be in <>
+LINK_RE = re.compile(
+    r"!?\[[^\]\n]*\]\(\s*"
+    r"(<[^>\n]*>|[^)\s]+)"  # target
+    r"(?:\s+(?:\"[^\"]*\"|'[^']*'|\([^)]*\)))?"  # optional title
+    r"\s*\)"
+)
+# Reference link definitions, [label]: target
+LINK_DEFINITION_RE = re.compile(r"^ {0,3}\[[^\]]+\]:\s*(<[^>\n]*>|\S+)")
+INLINE_CODE_RE = re.compile(r"`[^`]*`")
+# <!-- include: path -->, alone on its (stripped) line
+INCLUDE_RE = re.compile(r"^<!--\s*include:\s*(.*?)\s*-->$")
 CODE_BLOCK_RE = re.compile(r"^```")
 FRONTMATTER_DELIMITER = "---"
 
 
-def parse(content: str, path: str = "<stdin>") -> PromptDocument:
-    """Parse a .prompt.md file content into a PromptDocument."""
+def parse(content: str, path: str = "<stdin>", facts: Fact = ALL_FACTS) -> PromptDocument:
+    """Parse a .prompt.md file content into a PromptDocument.
+
+    Only the requested ``facts`` are extracted; without ``Fact.SECTIONS`` (or
+    a fact implying it) the body is not scanned at all. With
+    ``Fact.INCLUDES``, include directives are resolved against ``path``
+    through the active :class:`~prompt_lint.includes.IncludeCache`.
+    """
+    document = _parse(content, path, facts)
+    if document.facts & Fact.INCLUDES:
+        document.includes = _include_files(document)
+    return document
+
+
+def parse_include(content: str, path: str) -> PromptDocument:
+    """Parse a file included by other documents.
+
+    All facts are extracted, but include directives are left unresolved:
+    the includer resolves them, following the chain of includes from its
+    own path so that cycles are detected.
+    """
+    return _parse(content, path, ALL_FACTS)
+
+
+def _parse(content: str, path: str, facts: Fact) -> PromptDocument:
+    profiler = profiling.active
+    started = time.perf_counter() if profiler is not None else 0.0
+    facts = _normalize_facts(facts)
     lines = content.split("\n")
+    source = SourceText(content)
     frontmatter = _parse_frontmatter(lines)
-    body_start = frontmatter.end_line if frontmatter else 0
-    sections = _parse_sections(lines, body_start)
+    if profiler is not None:
+        now = time.perf_counter()
+        profiler.record("frontmatter", now - started)
+        started = now
+    if facts & Fact.SECTIONS:
+        body_start = frontmatter.end_line if frontmatter else 0
+        sections = _parse_sections(lines, body_start, source, facts)
+    else:
+        sections = []
+    if profiler is not None:
+        profiler.record("sections", time.perf_counter() - started)
     return PromptDocument(
         path=path,
         frontmatter=frontmatter,
         sections=sections,
-        raw_content=content,
+        source=source,
+        facts=facts,
     )
 
 
+def _normalize_facts(facts: Fact) -> Fact:
+    if facts & (Fact.VARIABLES | Fact.REFERENCES | Fact.OUTPUT_FIELDS | Fact.LINKS | Fact.INCLUDES):
+        facts |= Fact.SECTIONS
+    return facts
+
+
 def parse_file(path: str) -> PromptDocument:
     """Parse a .prompt.md file from disk."""
     with open(path, encoding="utf-8") as f:
@@ -56,6 +125,208 @@ def parse_file(path: str) -> PromptDocument:
     return parse(content, path)
 
 
+def reparse(
+    doc: PromptDocument, content: str, first_line: int, last_line: int, line_delta: int
+) -> PromptDocument:
+    """Re-parse only the sections of ``doc`` touched by an edit.
+
+    ``first_line``..``last_line`` is the inclusive, 0-based range of lines in
+    ``doc.raw_content`` that were edited, and ``line_delta`` is the number of
+    lines the edit added (negative if it removed lines). ``content`` is the full
+    text after the edit. Sections outside the edited range are reused, shifted
+    by ``line_delta``; the edited sections are re-scanned, extending into the
+    following section while an unterminated code fence would swallow its
+    heading. Edits reaching the frontmatter or the first heading, and
+    documents whose source was dropped, fall back to a full :func:`parse`.
+    """
+    lines = content.split("\n")
+    old_content = doc.source.text
+    sections = doc.sections
+    if (
+        not sections
+        or old_content is None
+        or len(lines) != old_content.count("\n") + 1 + line_delta
+        or first_line <= sections[0].start_line - 1
+        # An unclosed frontmatter may be closed by a "---" typed anywhere below
+        or (doc.frontmatter is None and lines[0].strip() == FRONTMATTER_DELIMITER)
+    ):
+        return parse(content, doc.path, doc.facts)
+
+    # First affected section: the one whose heading precedes the edit. If the
+    # edit touches a heading, the section before it is re-scanned too, since
+    # removing the heading merges both.
+    first = 0
+    last = 0
+    for i, section in enumerate(sections):
+        heading_idx = section.start_line - 1
+        if heading_idx < first_line:
+            first = i
+        if heading_idx <= last_line:
+            last = i
+        else:
+            break
+
+    region_start = sections[first].start_line - 1
+    # The text before the edit is unchanged, so offsets there still hold
+    region_offset = sections[first].content_start - len(lines[region_start]) - 1
+    source = SourceText(content)
+    while True:
+        if last + 1 < len(sections):
+            region_end = sections[last + 1].start_line - 1 + line_delta
+        else:
+            region_end = len(lines)
+        rescanned, in_code_block = _build_sections(
+            lines, region_start, region_end, source, region_offset, doc.facts
+        )
+        if not in_code_block or region_end == len(lines):
+            break
+        last += 1
+
+    # Untouched sections move to the new text, keeping their extracted facts
+    offset_delta = len(content) - len(old_content)
+    preceding = [_shift_section(s, source, 0, 0) for s in sections[:first]]
+    following = [_shift_section(s, source, line_delta, offset_delta) for s in sections[last + 1 :]]
+
+    document = PromptDocument(
+        path=doc.path,
+        frontmatter=doc.frontmatter,
+        sections=preceding + rescanned + following,
+        source=source,
+        facts=doc.facts,
+    )
+    if document.facts & Fact.INCLUDES:
+        document.includes = _include_files(document)
+    return document
+
+
+def resolve_includes(doc: PromptDocument) -> PromptDocument:
+    """``doc`` with its include directives resolved again, e.g. after an included file changed.
+
+    Returns a new document sharing the sections and source of ``doc``. The
+    active include cache must have been told about the change.
+    """
+    document = PromptDocument(
+        path=doc.path,
+        frontmatter=doc.frontmatter,
+        sections=doc.sections,
+        source=doc.source,
+        facts=doc.facts,
+    )
+    if document.facts & Fact.INCLUDES:
+        document.includes = _include_files(document)
+    return document
+
+
+def _include_files(doc: PromptDocument) -> list[IncludedFile]:
+    """Resolve the include directives of ``doc``, relative to its path."""
+    directives = [include for section in doc.sections for include in section.includes]
+    if not directives:
+        return []
+    if doc.path == "<stdin>":
+        base = os.getcwd()
+        chain = []
+    else:
+        own = os.path.abspath(doc.path)
+        base = os.path.dirname(own)
+        chain = [own]
+    cache = includes.current()
+    return [
+        _include_file(cache, include, base, chain, base, include.position) for include in directives
+    ]
+
+
+def _include_file(
+    cache: includes.IncludeCache,
+    include: Include,
+    base: str,
+    chain: list[str],
+    root: str,
+    position: Position,
+) -> IncludedFile:
+    """Load the file ``include`` names, relative to ``base``, and the files it includes.
+
+    ``chain`` holds the files whose directives led here, to detect cycles;
+    ``root`` is the directory of the document, to show paths relative to it,
+    and ``position`` that of the document's directive, where everything
+    included through it is reported.
+    """
+    path = os.path.normpath(os.path.join(base, include.target))
+    included = IncludedFile(include=include, path=path, files=[path])
+    if path in chain:
+        cycle = chain[chain.index(path) :] + [path]
+        included.errors.append(
+            "Include cycle: " + " -> ".join(os.path.relpath(p, root) for p in cycle)
+        )
+        return included
+    try:
+        document = cache.load(path)
+    except (OSError, UnicodeDecodeError) as e:
+        reason = e.strerror if isinstance(e, OSError) and e.strerror else "not valid UTF-8"
+        included.errors.append(f'Cannot include "{include.target}": {reason}')
+        return included
+
+    directory = os.path.dirname(path)
+    for section in document.sections:
+        included.sections.append(_relocate_section(section, position, directory))
+        for inner in section.includes:
+            nested = _include_file(cache, inner, directory, chain + [path], root, position)
+            included.sections.extend(nested.sections)
+            included.files.extend(nested.files)
+            included.errors.extend(f'In "{include.target}": {e}' for e in nested.errors)
+    return included
+
+
+def _relocate_section(section: Section, position: Position, base: str) -> Section:
+    """Copy an included ``section``, with every position moved to the directive's."""
+    return Section(
+        kind=section.kind,
+        raw_heading=section.raw_heading,
+        start_line=position.line,
+        source=section.source,
+        content_start=section.content_start,
+        content_end=section.content_end,
+        variables=[replace(v, position=position) for v in section.variables],
+        references=[replace(r, position=position) for r in section.references],
+        output_fields=[replace(f, position=position) for f in section.output_fields],
+        links=[replace(link, position=position, base=link.base or base) for link in section.links],
+    )
+
+
+def _shift_section(section: Section, source: SourceText, lines: int, offset: int) -> Section:
+    """Copy ``section`` into ``source``, moved ``lines`` lines and ``offset`` characters down."""
+    if not lines:
+        return Section(
+            kind=section.kind,
+            raw_heading=section.raw_heading,
+            start_line=section.start_line,
+            source=source,
+            content_start=section.content_start + offset,
+            content_end=section.content_end + offset,
+            variables=section.variables,
+            references=section.references,
+            output_fields=section.output_fields,
+            links=section.links,
+            includes=section.includes,
+        )
+
+    def shift(position: Position) -> Position:
+        return Position(line=position.line + lines, column=position.column)
+
+    return Section(
+        kind=section.kind,
+        raw_heading=section.raw_heading,
+        start_line=section.start_line + lines,
+        source=source,
+        content_start=section.content_start + offset,
+        content_end=section.content_end + offset,
+        variables=[replace(v, position=shift(v.position)) for v in section.variables],
+        references=[replace(r, position=shift(r.position)) for r in section.references],
+        output_fields=[replace(f, position=shift(f.position)) for f in section.output_fields],
+        links=[replace(link, position=shift(link.position)) for link in section.links],
+        includes=[replace(i, position=shift(i.position)) for i in section.includes],
+    )
+
+
 def _parse_frontmatter(lines: list[str]) -> Frontmatter | None:
     """Extract YAML frontmatter between --- delimiters."""
     if not lines or lines[0].strip() != FRONTMATTER_DELIMITER:
@@ -70,149 +341,292 @@ def _parse_frontmatter(lines: list[str]) -> Frontmatter | None:
     if end_idx is None:
         return None
 
-    yaml_content = "\n".join(lines[1:end_idx])
-    try:
-        data = yaml.safe_load(yaml_content)
-    except yaml.YAMLError:
-        data = {}
+    return Frontmatter(raw="\n".join(lines[1:end_idx]), start_line=1, end_line=end_idx + 1)
 
-    if not isinstance(data, dict):
-        data = {}
-
-    return Frontmatter(data=data, start_line=1, end_line=end_idx + 1)
 
+def load_frontmatter(
+    raw: str, start_line: int
+) -> tuple[dict[str, Any], FrontmatterError | None]:
+    """Load frontmatter YAML, returning its mapping and any syntax error.
 
-def _parse_sections(lines: list[str], start_line: int) -> list[Section]:
-    """Split body into sections by H1 headings."""
-    sections: list[Section] = []
-    current_heading: str | None = None
-    current_start: int = start_line
-    current_lines: list[str] = []
-    in_code_block = False
+    ``start_line`` is the 1-based line of the opening ``---``, used to report
+    errors at their position in the file.
+    """
+    # Imported on first use: documents without frontmatter never need it
+    import yaml
 
-    for i in range(start_line, len(lines)):
-        line = lines[i]
-        if CODE_BLOCK_RE.match(line.strip()):
-            in_code_block = not in_code_block
-        match = HEADING_RE.match(line)
-        if match and not in_code_block:
-            # Save previous section if we had a heading
-            if current_heading is not None:
-                sections.append(
-                    _build_section(current_heading, current_lines, current_start)
-                )
-            current_heading = match.group(1).strip()
-            current_start = i + 1  # 1-based
-            current_lines = []
+    profiler = profiling.active
+    started = time.perf_counter() if profiler is not None else 0.0
+    try:
+        data = yaml.load(raw, Loader=_safe_loader())
+    except yaml.YAMLError as e:
+        mark = getattr(e, "problem_mark", None)
+        problem = getattr(e, "problem", None) or str(e)
+        if mark is not None:
+            position = Position(line=start_line + 1 + mark.line, column=mark.column + 1)
         else:
-            if current_heading is not None:
-                current_lines.append(line)
-
-    # Save the last section
-    if current_heading is not None:
-        sections.append(_build_section(current_heading, current_lines, current_start))
+            position = Position(line=start_line)
+        return {}, FrontmatterError(message=problem, position=position)
+    finally:
+        if profiler is not None:
+            profiler.record("yaml", time.perf_counter() - started)
 
-    return sections
-
-
-def _build_section(heading: str, content_lines: list[str], start_line: int) -> Section:
-    """Build a Section from raw heading and content lines."""
-    kind = _resolve_section_kind(heading)
-    content = "\n".join(content_lines)
+    if not isinstance(data, dict):
+        data = {}
+    return data, None
+
+
+@functools.cache
+def _safe_loader() -> type[Any]:
+    """Prefer the libyaml-backed loader, falling back to the pure-Python one."""
+    import yaml
+
+    loader: type[Any] = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    return loader
+
+
+class EventType(Enum):
+    """Kinds of events emitted by :func:`scan`."""
+
+    HEADING = "heading"
+    FENCE = "fence"
+    REFERENCE = "reference"
+    OUTPUT_FIELD = "output_field"
+    INPUT_VARIABLE = "input_variable"
+    LINK = "link"
+    INCLUDE = "include"
+
+
+# (event type, 0-based line index, 1-based column, regex match). Plain tuples
+# keep per-event overhead low on large documents.
+ScanEvent = tuple[EventType, int, int, "re.Match[str]"]
+
+
+def scan(
+    lines: list[str], start: int = 0, end: int | None = None, facts: Fact = ALL_FACTS
+) -> Iterator[ScanEvent]:
+    """Walk ``lines[start:end]`` once, emitting structural events in source order.
+
+    Headings are only recognized outside fenced code blocks, and references and
+    output fields inside code blocks are skipped. Input variable lines are
+    matched inside the Input section regardless of fences. Heading and fence
+    events are always emitted; the others only for the requested ``facts``.
+    """
+    if end is None:
+        end = len(lines)
+    want_variables = bool(facts & Fact.VARIABLES)
+    want_references = bool(facts & Fact.REFERENCES)
+    want_output_fields = bool(facts & Fact.OUTPUT_FIELDS)
+    want_links = bool(facts & Fact.LINKS)
+    want_includes = bool(facts & Fact.INCLUDES)
+    heading_event = EventType.HEADING
+    fence_event = EventType.FENCE
+    reference_event = EventType.REFERENCE
+    output_field_event = EventType.OUTPUT_FIELD
+    input_variable_event = EventType.INPUT_VARIABLE
+    link_event = EventType.LINK
+    include_event = EventType.INCLUDE
+    in_code_block = False
+    in_input = False
 
-    section = Section(
-        kind=kind,
-        raw_heading=heading,
-        content=content,
-        start_line=start_line,
-    )
+    for i in range(start, end):
+        line = lines[i]
+        stripped = line.strip()
 
-    if kind == SectionKind.INPUT:
-        section.variables = _extract_input_variables(content_lines, start_line)
+        if stripped.startswith("```"):
+            in_code_block = not in_code_block
+            match = CODE_BLOCK_RE.match(stripped)
+            assert match is not None
+            yield (fence_event, i, 1, match)
+            continue
 
-    section.output_fields = _extract_output_fields(content_lines, start_line)
+        if not in_code_block and line.startswith("#"):
+            match = HEADING_RE.match(line)
+            if match:
+                in_input = (
+                    want_variables and _resolve_section_kind(match.group(1)) == SectionKind.INPUT
+                )
+                yield (heading_event, i, 1, match)
+                continue
 
-    section.references = _extract_references(content_lines, start_line, kind)
+        if in_input and stripped.startswith(("-", "*")):
+            match = INPUT_VAR_RE.match(stripped)
+            if match:
+                yield (input_variable_event, i, line.find("`") + 1, match)
 
-    return section
+        if in_code_block:
+            continue
 
+        if want_references and "{{" in line:
+            for match in VAR_REFERENCE_RE.finditer(line):
+                yield (reference_event, i, match.start() + 1, match)
+
+        if want_output_fields and "**" in line:
+            for match in OUTPUT_FIELD_RE.finditer(line):
+                yield (output_field_event, i, match.start() + 1, match)
+
+        if want_links and "[" in line:
+            yield from _scan_links(line, i, link_event)
+
+        if want_includes and stripped.startswith("<!--"):
+            match = INCLUDE_RE.match(stripped)
+            if match and match.group(1):
+                column = len(line) - len(line.lstrip()) + match.start(1) + 1
+                yield (include_event, i, column, match)
+
+
+def _scan_links(line: str, i: int, link_event: EventType) -> Iterator[ScanEvent]:
+    """Emit link events for ``line``, skipping links inside inline code."""
+    code_spans = [m.span() for m in INLINE_CODE_RE.finditer(line)] if "`" in line else []
+    matches = list(LINK_RE.finditer(line)) if "](" in line else []
+    if "]:" in line:
+        definition = LINK_DEFINITION_RE.match(line)
+        if definition:
+            matches.append(definition)
+    for match in matches:
+        start = match.start(1)
+        if not any(lo <= start < hi for lo, hi in code_spans):
+            # Point past the "<" of an angle-bracketed target
+            column = start + 2 if line[start] == "<" else start + 1
+            yield (link_event, i, column, match)
+
+
+def _parse_sections(
+    lines: list[str], start_line: int, source: SourceText, facts: Fact = ALL_FACTS
+) -> list[Section]:
+    """Split body into sections by H1 headings."""
+    offset = sum(map(len, lines[:start_line])) + start_line
+    sections, _ = _build_sections(lines, start_line, len(lines), source, offset, facts)
+    return sections
 
-def _resolve_section_kind(heading: str) -> SectionKind | None:
-    """Resolve a heading to a canonical SectionKind."""
-    normalized = heading.lower().strip()
-    return SECTION_ALIASES.get(normalized)
 
+def _build_sections(
+    lines: list[str],
+    start: int,
+    end: int,
+    source: SourceText,
+    offset: int,
+    facts: Fact = ALL_FACTS,
+) -> tuple[list[Section], bool]:
+    """Build Sections for ``lines[start:end]`` from scan events.
 
-def _extract_input_variables(lines: list[str], base_line: int) -> list[Variable]:
-    """Extract variable definitions from an Input section."""
+    ``offset`` is the position of ``lines[start]`` in ``source``. Also
+    returns whether a code fence is still open at ``end``.
+    """
+    sections: list[Section] = []
+    in_code_block = False
+    heading: str | None = None
+    kind: SectionKind | None = None
+    heading_idx = start
     variables: list[Variable] = []
-    for i, line in enumerate(lines):
-        match = INPUT_VAR_RE.match(line.strip())
-        if match:
+    references: list[VariableReference] = []
+    output_fields: list[OutputField] = []
+    links: list[Link] = []
+    section_includes: list[Include] = []
+    seen_fields: set[str] = set()
+    heading_event = EventType.HEADING
+    fence_event = EventType.FENCE
+    reference_event = EventType.REFERENCE
+    output_field_event = EventType.OUTPUT_FIELD
+    input_variable_event = EventType.INPUT_VARIABLE
+    link_event = EventType.LINK
+    include_event = EventType.INCLUDE
+    # Offsets are only asked for in increasing line order, so each line's
+    # length is added once
+    offset_line = start
+
+    def offset_of(idx: int) -> int:
+        nonlocal offset, offset_line
+        offset += sum(map(len, lines[offset_line:idx])) + idx - offset_line
+        offset_line = idx
+        return offset
+
+    def close(end: int) -> None:
+        assert heading is not None
+        content_start = offset_of(heading_idx + 1)
+        # Without the newline ending the last line
+        content_end = max(offset_of(end) - 1, content_start)
+        sections.append(
+            Section(
+                kind=kind,
+                raw_heading=heading,
+                start_line=heading_idx + 1,  # 1-based
+                source=source,
+                content_start=content_start,
+                content_end=content_end,
+                variables=variables,
+                references=references,
+                output_fields=output_fields,
+                links=links,
+                includes=section_includes,
+            )
+        )
+
+    for etype, idx, column, match in scan(lines, start, end, facts):
+        if etype is reference_event:
+            if heading is not None:
+                references.append(
+                    VariableReference(
+                        name=intern(match.group(1)),
+                        position=Position(line=idx + 1, column=column),
+                        section=kind,
+                    )
+                )
+        elif etype is output_field_event:
+            if heading is not None:
+                name = intern(match.group(1).strip())
+                if name not in seen_fields:
+                    seen_fields.add(name)
+                    output_fields.append(
+                        OutputField(name=name, position=Position(line=idx + 1, column=column))
+                    )
+        elif etype is heading_event:
+            if heading is not None:
+                close(idx)
+            heading = intern(match.group(1).strip())
+            kind = _resolve_section_kind(heading)
+            heading_idx = idx
+            variables, references, output_fields, links = [], [], [], []
+            section_includes = []
+            seen_fields = set()
+        elif etype is input_variable_event:
+            # Only emitted inside an Input section, so a heading is always open
             variables.append(
                 Variable(
-                    name=match.group(1),
-                    type=match.group(2),
+                    name=intern(match.group(1)),
+                    type=intern(match.group(2)),
                     required=match.group(3) == "required",
                     description=match.group(4) or "",
-                    position=Position(line=base_line + i + 1, column=line.find("`") + 1),
+                    position=Position(line=idx + 1, column=column),
                 )
             )
-    return variables
-
-
-def _extract_output_fields(lines: list[str], base_line: int) -> list[OutputField]:
-    """Extract **output_name** patterns from an Output section."""
-    fields: list[OutputField] = []
-    seen: set[str] = set()
-    in_code_block = False
-
-    for i, line in enumerate(lines):
-        if CODE_BLOCK_RE.match(line.strip()):
-            in_code_block = not in_code_block
-            continue
-        if in_code_block:
-            continue
-
-        for match in OUTPUT_FIELD_RE.finditer(line):
-            name = match.group(1).strip()
-            if name not in seen:
-                seen.add(name)
-                fields.append(
-                    OutputField(
-                        name=name,
-                        position=Position(
-                            line=base_line + i + 1,
-                            column=match.start() + 1,
-                        ),
+        elif etype is link_event:
+            if heading is not None:
+                links.append(
+                    Link(
+                        target=match.group(1).strip("<>"),
+                        position=Position(line=idx + 1, column=column),
+                    )
+                )
+        elif etype is include_event:
+            if heading is not None:
+                section_includes.append(
+                    Include(
+                        target=match.group(1),
+                        position=Position(line=idx + 1, column=column),
                     )
                 )
-    return fields
+        elif etype is fence_event:
+            in_code_block = not in_code_block
 
+    # Save the last section
+    if heading is not None:
+        close(end)
 
-def _extract_references(
-    lines: list[str], base_line: int, kind: SectionKind | None
-) -> list[VariableReference]:
-    """Extract {{variable}} references from content lines, skipping code blocks."""
-    refs: list[VariableReference] = []
-    in_code_block = False
+    return sections, in_code_block
 
-    for i, line in enumerate(lines):
-        if CODE_BLOCK_RE.match(line.strip()):
-            in_code_block = not in_code_block
-            continue
-        if in_code_block:
-            continue
 
-        for match in VAR_REFERENCE_RE.finditer(line):
-            refs.append(
-                VariableReference(
-                    name=match.group(1),
-                    position=Position(
-                        line=base_line + i + 1,
-                        column=match.start() + 1,
-                    ),
-                    section=kind,
-                )
-            )
-    return refs
+def _resolve_section_kind(heading: str) -> SectionKind | None:
+    """Resolve a heading to a canonical SectionKind."""
+    normalized = heading.lower().strip()
+    return SECTION_ALIASES.get(normalized)
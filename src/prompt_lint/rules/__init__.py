@@ -2,9 +2,17 @@
 
 from __future__ import annotations
 
+import functools
+import time
 from abc import ABC, abstractmethod
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
 
-from prompt_lint.models import Diagnostic, PromptDocument
+from prompt_lint.models import ALL_FACTS, Diagnostic, Fact, PromptDocument
+
+if TYPE_CHECKING:
+    from importlib.metadata import EntryPoints
 
 
 class RuleBase(ABC):
@@ -18,13 +26,36 @@ class RuleBase(ABC):
     @abstractmethod
     def description(self) -> str: ...
 
+    @property
+    def facts(self) -> Fact:
+        """Document facts read by :meth:`check`; the parser may skip the others."""
+        return ALL_FACTS
+
     @abstractmethod
     def check(self, doc: PromptDocument) -> list[Diagnostic]: ...
 
 
-def get_all_rules() -> list[RuleBase]:
-    """Return instances of all built-in rules."""
+# Entry-point group through which installed packages provide extra rules. Each
+# entry point names a RuleBase subclass or instance.
+ENTRY_POINT_GROUP = "prompt_lint.rules"
+
+
+def entry_points(group: str) -> EntryPoints:
+    """The installed entry points in ``group``.
+
+    ``importlib.metadata`` is imported here, as it costs more than the rest
+    of the rule system and is only needed when the registry is built.
+    """
+    from importlib.metadata import entry_points as installed_entry_points
+
+    return installed_entry_points(group=group)
+
+
+def builtin_rules() -> list[RuleBase]:
+    """Return new instances of the rules shipped with prompt-lint."""
+    from prompt_lint.rules.file_links import FileLinkRule
     from prompt_lint.rules.frontmatter import FrontmatterRule
+    from prompt_lint.rules.includes import IncludeRule
     from prompt_lint.rules.output_reachable import OutputReachableRule
     from prompt_lint.rules.required_sections import RequiredSectionsRule
     from prompt_lint.rules.variable_defined import VariableDefinedRule
@@ -36,4 +67,91 @@ def get_all_rules() -> list[RuleBase]:
         VariableUnusedRule(),
         OutputReachableRule(),
         FrontmatterRule(),
+        FileLinkRule(),
+        IncludeRule(),
+    ]
+
+
+@dataclass
+class RuleRegistry:
+    """The rules available in this process, discovered once."""
+
+    rules: list[RuleBase]
+    # Wall time spent importing and instantiating rules, in seconds
+    discovery_time: float = 0.0
+    # Entry points that failed to load, as human-readable messages
+    errors: list[str] = field(default_factory=list)
+    # Rule ID -> "name==version" of the distribution providing a plugin rule
+    providers: dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def discover(cls) -> RuleRegistry:
+        """Collect the built-in rules and those registered under ``ENTRY_POINT_GROUP``.
+
+        A plugin rule whose ID is already taken is skipped with an error, so
+        built-in rules cannot be shadowed.
+        """
+        started = time.perf_counter()
+        rules = builtin_rules()
+        errors: list[str] = []
+        providers: dict[str, str] = {}
+        seen = {rule.rule_id for rule in rules}
+        for ep in entry_points(group=ENTRY_POINT_GROUP):
+            try:
+                obj = ep.load()
+                rule = obj() if isinstance(obj, type) else obj
+            except Exception as e:
+                errors.append(f"Failed to load rule {ep.name!r} from {ep.value}: {e}")
+                continue
+            if not isinstance(rule, RuleBase):
+                errors.append(f"Entry point {ep.name!r} ({ep.value}) is not a rule")
+            elif rule.rule_id in seen:
+                errors.append(f"Rule {rule.rule_id} from {ep.value} is already defined")
+            else:
+                seen.add(rule.rule_id)
+                rules.append(rule)
+                dist = getattr(ep, "dist", None)
+                if dist is not None:
+                    providers[rule.rule_id] = f"{dist.name}=={dist.version}"
+        return cls(rules, time.perf_counter() - started, errors, providers)
+
+
+@functools.cache
+def get_registry() -> RuleRegistry:
+    """Return the process-wide rule registry, discovering rules on first use."""
+    return RuleRegistry.discover()
+
+
+def get_all_rules() -> list[RuleBase]:
+    """Return all registered rules, built-in ones first.
+
+    Rule instances are shared across calls; only the list is new.
+    """
+    return list(get_registry().rules)
+
+
+def _matches(rule_id: str, prefixes: Iterable[str]) -> bool:
+    return any(rule_id.startswith(prefix) for prefix in prefixes)
+
+
+def select_rules(
+    rules: Sequence[RuleBase], select: Iterable[str] = (), ignore: Iterable[str] = ()
+) -> list[RuleBase]:
+    """Filter ``rules`` by rule ID prefix.
+
+    A rule is kept if it matches a ``select`` prefix (or ``select`` is empty)
+    and matches no ``ignore`` prefix, so ``select=["R00"], ignore=["R004"]``
+    keeps every R00x rule except R004. Raises ValueError for a prefix that matches no
+    rule, which is almost always a typo.
+    """
+    select = [s.strip() for s in select if s.strip()]
+    ignore = [s.strip() for s in ignore if s.strip()]
+    known = [rule.rule_id for rule in rules]
+    unknown = [p for p in (*select, *ignore) if not any(r.startswith(p) for r in known)]
+    if unknown:
+        raise ValueError(f"Unknown rule selector: {', '.join(unknown)}")
+    return [
+        rule
+        for rule in rules
+        if (not select or _matches(rule.rule_id, select)) and not _matches(rule.rule_id, ignore)
     ]
@@ -0,0 +1,83 @@
+"""R006: File links must resolve to existing files."""
+
+from __future__ import annotations
+
+import functools
+import os
+import re
+from urllib.parse import unquote
+
+from prompt_lint import fscache
+from prompt_lint.models import Diagnostic, Fact, PromptDocument, Severity
+from prompt_lint.rules import RuleBase
+
+# "https:", "mailto:" and the like; also matches Windows drive letters
+_SCHEME_RE = re.compile(r"^[a-zA-Z][a-zA-Z0-9+.-]*:")
+
+
+@functools.lru_cache(maxsize=4096)
+def link_path(target: str) -> str | None:
+    """The relative file path a link target points to, or None if it is not one.
+
+    URLs, in-document anchors, root-relative paths and targets built from
+    ``{{variables}}`` are not file links. Anchors and query strings are
+    dropped and percent-escapes decoded.
+    """
+    if target.startswith(("#", "/")) or "{{" in target or _SCHEME_RE.match(target):
+        return None
+    path = unquote(target.split("#", 1)[0].split("?", 1)[0])
+    return path or None
+
+
+class FileLinkRule(RuleBase):
+    @property
+    def rule_id(self) -> str:
+        return "R006"
+
+    @property
+    def description(self) -> str:
+        return "File links must resolve to existing files"
+
+    @property
+    def facts(self) -> Fact:
+        return Fact.LINKS | Fact.INCLUDES
+
+    def check(self, doc: PromptDocument) -> list[Diagnostic]:
+        diagnostics: list[Diagnostic] = []
+        links = doc.links
+        if not links:
+            return diagnostics
+
+        fs = fscache.current()
+        if doc.path == "<stdin>":
+            base = os.getcwd()
+        else:
+            base = os.path.dirname(os.path.abspath(doc.path))
+
+        for link in links:
+            path = link_path(link.target)
+            if path is None:
+                continue
+            # Links in included files are relative to those files
+            link_base = link.base or base
+            resolved, spelling = fs.resolve_in(link_base, path)
+            if spelling == resolved:
+                continue
+            if spelling is None:
+                message = f'File link "{link.target}" does not resolve to an existing file'
+            else:
+                message = (
+                    f'File link "{link.target}" does not match the case of '
+                    f'"{os.path.relpath(spelling, link_base)}"'
+                )
+            diagnostics.append(
+                Diagnostic(
+                    rule_id=self.rule_id,
+                    severity=Severity.ERROR,
+                    message=message,
+                    position=link.position,
+                    path=doc.path,
+                )
+            )
+
+        return diagnostics
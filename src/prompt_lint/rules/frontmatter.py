@@ -4,6 +4,7 @@ from __future__ import annotations
 
 from prompt_lint.models import (
     Diagnostic,
+    Fact,
     Position,
     PromptDocument,
     REQUIRED_FRONTMATTER_FIELDS,
@@ -21,6 +22,10 @@ class FrontmatterRule(RuleBase):
     def description(self) -> str:
         return "Frontmatter must contain required fields"
 
+    @property
+    def facts(self) -> Fact:
+        return Fact.FRONTMATTER
+
     def check(self, doc: PromptDocument) -> list[Diagnostic]:
         diagnostics: list[Diagnostic] = []
 
@@ -36,6 +41,19 @@ class FrontmatterRule(RuleBase):
             )
             return diagnostics
 
+        error = doc.frontmatter.error
+        if error is not None:
+            diagnostics.append(
+                Diagnostic(
+                    rule_id=self.rule_id,
+                    severity=Severity.ERROR,
+                    message=f"Invalid YAML frontmatter: {error.message}",
+                    position=error.position,
+                    path=doc.path,
+                )
+            )
+            return diagnostics
+
         for field_name in REQUIRED_FRONTMATTER_FIELDS:
             if field_name not in doc.frontmatter.data:
                 diagnostics.append(
@@ -0,0 +1,33 @@
+"""R007: Include directives must resolve without cycles."""
+
+from __future__ import annotations
+
+from prompt_lint.models import Diagnostic, Fact, PromptDocument, Severity
+from prompt_lint.rules import RuleBase
+
+
+class IncludeRule(RuleBase):
+    @property
+    def rule_id(self) -> str:
+        return "R007"
+
+    @property
+    def description(self) -> str:
+        return "Include directives must resolve without cycles"
+
+    @property
+    def facts(self) -> Fact:
+        return Fact.INCLUDES
+
+    def check(self, doc: PromptDocument) -> list[Diagnostic]:
+        return [
+            Diagnostic(
+                rule_id=self.rule_id,
+                severity=Severity.ERROR,
+                message=message,
+                position=included.include.position,
+                path=doc.path,
+            )
+            for included in doc.includes
+            for message in included.errors
+        ]
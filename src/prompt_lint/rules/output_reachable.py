@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from prompt_lint.models import Diagnostic, PromptDocument, Severity
+from prompt_lint.models import Diagnostic, Fact, PromptDocument, Severity
 from prompt_lint.rules import RuleBase
 
 
@@ -15,9 +15,13 @@ class OutputReachableRule(RuleBase):
     def description(self) -> str:
         return "Output fields should be referenced in Steps or other sections"
 
+    @property
+    def facts(self) -> Fact:
+        return Fact.OUTPUT_FIELDS | Fact.INCLUDES
+
     def check(self, doc: PromptDocument) -> list[Diagnostic]:
         diagnostics: list[Diagnostic] = []
-        referenced_names = {f.name for f in doc.output_references_in_steps}
+        referenced_names = doc.output_reference_names
 
         for field in doc.output_fields:
             if field.name not in referenced_names:
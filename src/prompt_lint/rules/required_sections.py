@@ -4,10 +4,10 @@ from __future__ import annotations
 
 from prompt_lint.models import (
     Diagnostic,
+    Fact,
     Position,
     PromptDocument,
     REQUIRED_SECTIONS,
-    SectionKind,
     Severity,
 )
 from prompt_lint.rules import RuleBase
@@ -22,12 +22,16 @@ class RequiredSectionsRule(RuleBase):
     def description(self) -> str:
         return "Required sections must exist and be non-empty"
 
+    @property
+    def facts(self) -> Fact:
+        return Fact.SECTIONS | Fact.INCLUDES
+
     def check(self, doc: PromptDocument) -> list[Diagnostic]:
         diagnostics: list[Diagnostic] = []
-        present_kinds = {s.kind for s in doc.sections}
 
         for required in REQUIRED_SECTIONS:
-            if required not in present_kinds:
+            section = doc.get_section(required)
+            if section is None:
                 diagnostics.append(
                     Diagnostic(
                         rule_id=self.rule_id,
@@ -37,17 +41,15 @@ class RequiredSectionsRule(RuleBase):
                         path=doc.path,
                     )
                 )
-            else:
-                section = doc.get_section(required)
-                if section and not section.content.strip():
-                    diagnostics.append(
-                        Diagnostic(
-                            rule_id=self.rule_id,
-                            severity=Severity.ERROR,
-                            message=f'Required section "{required.value}" is empty',
-                            position=Position(line=section.start_line),
-                            path=doc.path,
-                        )
+            elif not section.content.strip():
+                diagnostics.append(
+                    Diagnostic(
+                        rule_id=self.rule_id,
+                        severity=Severity.ERROR,
+                        message=f'Required section "{required.value}" is empty',
+                        position=Position(line=section.start_line),
+                        path=doc.path,
                     )
+                )
 
         return diagnostics
@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from prompt_lint.models import Diagnostic, PromptDocument, Severity
+from prompt_lint.models import Diagnostic, Fact, PromptDocument, Severity
 from prompt_lint.rules import RuleBase
 
 
@@ -15,12 +15,16 @@ class VariableDefinedRule(RuleBase):
     def description(self) -> str:
         return "Referenced variables must be defined in Input"
 
+    @property
+    def facts(self) -> Fact:
+        return Fact.VARIABLES | Fact.REFERENCES | Fact.INCLUDES
+
     def check(self, doc: PromptDocument) -> list[Diagnostic]:
         diagnostics: list[Diagnostic] = []
-        defined_names = {v.name for v in doc.input_variables}
+        defined = doc.variables_by_name
 
         for ref in doc.all_references:
-            if ref.name not in defined_names:
+            if ref.name not in defined:
                 section_label = ref.section.value if ref.section else "unknown"
                 diagnostics.append(
                     Diagnostic(
@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from prompt_lint.models import Diagnostic, PromptDocument, Severity
+from prompt_lint.models import Diagnostic, Fact, PromptDocument, Severity
 from prompt_lint.rules import RuleBase
 
 
@@ -15,9 +15,13 @@ class VariableUnusedRule(RuleBase):
     def description(self) -> str:
         return "Defined variables should be referenced"
 
+    @property
+    def facts(self) -> Fact:
+        return Fact.VARIABLES | Fact.REFERENCES | Fact.INCLUDES
+
     def check(self, doc: PromptDocument) -> list[Diagnostic]:
         diagnostics: list[Diagnostic] = []
-        referenced_names = {ref.name for ref in doc.all_references}
+        referenced_names = doc.referenced_names
 
         for var in doc.input_variables:
             if var.name not in referenced_names:
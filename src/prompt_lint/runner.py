@@ -0,0 +1,536 @@
+"""Lint execution engine: cache lookups, de-duplication and parallel workers."""
+
+from __future__ import annotations
+
+import itertools
+import os
+import time
+from collections import deque
+from collections.abc import Generator, Iterable, Iterator, Sequence
+from dataclasses import dataclass, field, replace
+from typing import TYPE_CHECKING
+
+from prompt_lint import fscache, includes, profiling
+from prompt_lint.cache import ResultCache, content_key
+from prompt_lint.models import Diagnostic, Fact
+from prompt_lint.parser import parse
+from prompt_lint.rules import RuleBase, get_all_rules
+from prompt_lint.validator import required_facts, validate
+
+if TYPE_CHECKING:
+    # Imported where a pool is started, so in-process runs do not pay for them
+    from concurrent.futures import Future, ProcessPoolExecutor
+
+# Files per task sent to a worker process; large enough to amortize IPC
+DEFAULT_CHUNK_SIZE = 16
+
+# Chunks per worker that Linter keeps queued when no limit is given
+DEFAULT_CHUNKS_IN_FLIGHT = 4
+
+# A file path, or a (path, content) pair for text that is not on disk
+LintInput = str | os.PathLike[str] | tuple[str, str]
+
+
+@dataclass
+class LintResult:
+    """Diagnostics for one file, or the reason it could not be linted."""
+
+    path: str
+    diagnostics: list[Diagnostic] = field(default_factory=list)
+    error: str | None = None
+    # Paths the rules looked up on disk, so cached results can be re-checked
+    dependencies: list[fscache.Dependency] = field(default_factory=list)
+    # Files read for include directives, with their content keys
+    includes: list[includes.IncludeDependency] = field(default_factory=list)
+
+
+def default_jobs() -> int:
+    """Number of worker processes used when ``--jobs`` is not given."""
+    return os.cpu_count() or 1
+
+
+def lint_source(
+    content: str, path: str, rules: Sequence[RuleBase], facts: Fact | None = None
+) -> LintResult:
+    """Parse and validate one document, capturing failures in the result.
+
+    Only the ``facts`` the rules need are parsed; pass them in when linting
+    many files to avoid recomputing them per file.
+    """
+    if facts is None:
+        facts = required_facts(rules)
+    profiler = profiling.active
+    started = time.perf_counter() if profiler is not None else 0.0
+    try:
+        with (
+            fscache.session() as fs,
+            fs.recording() as dependencies,
+            includes.session() as included,
+        ):
+            doc = parse(content, path, facts)
+            diagnostics = validate(doc, list(rules))
+            result = LintResult(
+                path,
+                diagnostics,
+                dependencies=dependencies,
+                includes=included.dependencies(doc.included_paths),
+            )
+    except Exception as e:
+        result = LintResult(path, error=f"Failed to parse: {e}")
+    if profiler is not None:
+        profiler.record_file(path, time.perf_counter() - started)
+    return result
+
+
+# --- Worker process side ---
+
+_worker_rules: Sequence[RuleBase] = ()
+_worker_facts = Fact(0)
+_worker_profile = False
+
+
+def _init_worker(rules: Sequence[RuleBase], profile: bool = False) -> None:
+    global _worker_rules, _worker_facts, _worker_profile
+    _worker_rules = rules
+    _worker_facts = required_facts(rules)
+    _worker_profile = profile
+    # The worker lives for one run, so its listings and included files can be
+    # kept throughout
+    fscache.active = fscache.FileSystemCache()
+    includes.active = includes.IncludeCache()
+
+
+def _lint_chunk(
+    chunk: list[tuple[str, str]],
+) -> tuple[list[LintResult], profiling.Profiler | None]:
+    """Lint a chunk, returning the chunk's timings too when profiling."""
+    if not _worker_profile:
+        return [lint_source(c, p, _worker_rules, _worker_facts) for p, c in chunk], None
+    with profiling.profile() as profiler:
+        results = [lint_source(c, p, _worker_rules, _worker_facts) for p, c in chunk]
+    return results, profiler
+
+
+_worker_generation = -1
+
+
+def _lint_batch(chunk: list[tuple[str, str | None]], generation: int) -> list[LintResult]:
+    """Lint a chunk for :class:`Linter`, reading the files without content."""
+    global _worker_generation
+    if generation != _worker_generation:
+        # The worker outlives the call, so listings are only kept within one
+        _worker_generation = generation
+        fscache.active = fscache.FileSystemCache()
+        includes.active = includes.IncludeCache()
+    return [_lint_input(p, c, _worker_rules, _worker_facts) for p, c in chunk]
+
+
+def _lint_input(
+    path: str, content: str | None, rules: Sequence[RuleBase], facts: Fact
+) -> LintResult:
+    if content is None:
+        try:
+            with open(path, encoding="utf-8") as f:
+                content = f.read()
+        except (OSError, UnicodeDecodeError) as e:
+            return LintResult(path, error=f"Failed to parse: {e}")
+    return lint_source(content, path, rules, facts)
+
+
+# --- Main process side ---
+
+
+class _Slot:
+    """A target waiting for its result, in output order."""
+
+    __slots__ = ("path", "result", "key", "future", "index", "source")
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.result: LintResult | None = None
+        self.key: str | None = None
+        self.future: Future[tuple[list[LintResult], profiling.Profiler | None]] | None = None
+        self.index = 0
+        # Earlier slot with identical content whose result is reused
+        self.source: _Slot | None = None
+
+
+def run_lint(
+    targets: Iterable[str],
+    rules: Sequence[RuleBase],
+    jobs: int = 1,
+    cache: ResultCache | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Generator[LintResult, None, None]:
+    """Lint ``targets`` and yield one result per target, in input order.
+
+    Results are answered from ``cache`` when possible, and files with
+    identical content are linted once. With ``jobs > 1`` the remaining files
+    are sent to a process pool in chunks of ``chunk_size``; the pool is only
+    started once a full chunk of work has accumulated, so small runs stay
+    in-process. Closing the generator early cancels the chunks not yet
+    started and stops reading ``targets``.
+    """
+    pending: deque[_Slot] = deque()
+    by_key: dict[str, _Slot] = {}
+    work: list[tuple[_Slot, str]] = []
+    pool: ProcessPoolExecutor | None = None
+    facts = required_facts(rules)
+    # Directory listings and included files shared by the whole run; only
+    # active while this generator is working, not while the caller handles
+    # a result
+    fs = fscache.active or fscache.FileSystemCache()
+    included = includes.active or includes.IncludeCache()
+
+    def submit() -> None:
+        nonlocal pool
+        from concurrent.futures import Future, ProcessPoolExecutor
+
+        if pool is None:
+            pool = ProcessPoolExecutor(
+                jobs,
+                initializer=_init_worker,
+                initargs=(rules, profiling.active is not None),
+            )
+        future: Future[tuple[list[LintResult], profiling.Profiler | None]]
+        try:
+            future = pool.submit(_lint_chunk, [(slot.path, content) for slot, content in work])
+        except Exception as e:  # e.g. BrokenProcessPool after a worker died
+            future = Future()
+            future.set_exception(e)
+        for index, (slot, _) in enumerate(work):
+            slot.future = future
+            slot.index = index
+        work.clear()
+
+    try:
+        for path in targets:
+            slot = _Slot(path)
+            pending.append(slot)
+            with fscache.session(fs), includes.session(included):
+                _plan(slot, rules, facts, cache, by_key, work if jobs > 1 else None)
+            if len(work) >= chunk_size:
+                submit()
+            while pending and _ready(pending[0]):
+                yield _finish(pending.popleft(), cache)
+
+        if work:
+            if pool is None:
+                # Not worth starting workers for less than one chunk
+                with fscache.session(fs), includes.session(included):
+                    for slot, content in work:
+                        slot.result = lint_source(content, slot.path, rules, facts)
+                work.clear()
+            else:
+                submit()
+        while pending:
+            yield _finish(pending.popleft(), cache)
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _plan(
+    slot: _Slot,
+    rules: Sequence[RuleBase],
+    facts: Fact,
+    cache: ResultCache | None,
+    by_key: dict[str, _Slot],
+    work: list[tuple[_Slot, str]] | None,
+) -> None:
+    """Resolve ``slot`` from the cache or a duplicate, or queue it as work.
+
+    With ``work`` set to None the file is linted immediately, in-process.
+    """
+    path = slot.path
+    profiler = profiling.active
+    if cache is not None:
+        started = time.perf_counter() if profiler is not None else 0.0
+        cached = cache.lookup(path)
+        if profiler is not None:
+            profiler.record("cache", time.perf_counter() - started)
+        if cached is not None:
+            slot.result = LintResult(path, cached)
+            return
+
+    started = time.perf_counter() if profiler is not None else 0.0
+    try:
+        with open(path, encoding="utf-8") as f:
+            content = f.read()
+    except (OSError, UnicodeDecodeError) as e:
+        slot.result = LintResult(path, error=f"Failed to parse: {e}")
+        return
+    finally:
+        if profiler is not None:
+            profiler.record("read", time.perf_counter() - started)
+
+    key = slot.key = content_key(content)
+    # Links and includes resolve relative to the file, so copies elsewhere
+    # may differ
+    if facts & (Fact.LINKS | Fact.INCLUDES):
+        dedupe_key = f"{key}:{os.path.dirname(path)}"
+    else:
+        dedupe_key = key
+    original = by_key.get(dedupe_key)
+    if original is not None:
+        slot.source = original
+        return
+    if cache is not None:
+        started = time.perf_counter() if profiler is not None else 0.0
+        cached = cache.load(key, path)
+        if profiler is not None:
+            profiler.record("cache", time.perf_counter() - started)
+        if cached is not None:
+            slot.result = LintResult(path, cached)
+            return
+
+    by_key[dedupe_key] = slot
+    if work is None:
+        slot.result = lint_source(content, path, rules, facts)
+    else:
+        work.append((slot, content))
+
+
+def _ready(slot: _Slot) -> bool:
+    if slot.source is not None:
+        return _ready(slot.source)
+    if slot.result is not None:
+        return True
+    return slot.future is not None and slot.future.done()
+
+
+def _resolve(slot: _Slot) -> LintResult:
+    if slot.result is None:
+        if slot.source is not None:
+            original = _resolve(slot.source)
+            slot.result = LintResult(
+                slot.path,
+                [replace(d, path=slot.path) for d in original.diagnostics],
+                original.error,
+                original.dependencies,
+                original.includes,
+            )
+        else:
+            assert slot.future is not None
+            try:
+                results, chunk_profile = slot.future.result()
+                slot.result = results[slot.index]
+            except Exception as e:
+                # A crashed worker only fails the files it was processing
+                slot.result = LintResult(slot.path, error=f"Failed to lint: {e!r}")
+            else:
+                # Every chunk has exactly one slot at index 0, so timings merge once
+                if chunk_profile is not None and slot.index == 0 and profiling.active:
+                    profiling.active.merge(chunk_profile)
+    return slot.result
+
+
+def _finish(slot: _Slot, cache: ResultCache | None) -> LintResult:
+    result = _resolve(slot)
+    if cache is not None and slot.key is not None and result.error is None:
+        profiler = profiling.active
+        started = time.perf_counter() if profiler is not None else 0.0
+        cache.store(slot.key, slot.path, result.diagnostics, result.dependencies, result.includes)
+        if profiler is not None:
+            profiler.record("cache", time.perf_counter() - started)
+    return result
+
+
+# --- Batch API ---
+
+
+class Linter:
+    """Lints many documents, keeping rules and worker processes between calls.
+
+    With ``jobs > 1`` a process pool is started on the first call that has a
+    full chunk of work, and reused by later calls until :meth:`close`. Use it
+    as a context manager to shut the pool down on exit.
+    """
+
+    def __init__(
+        self,
+        rules: Sequence[RuleBase] | None = None,
+        jobs: int = 1,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> None:
+        self.rules = list(rules) if rules is not None else get_all_rules()
+        self.jobs = jobs
+        self.chunk_size = chunk_size
+        self._facts = required_facts(self.rules)
+        self._pool: ProcessPoolExecutor | None = None
+        # Tells workers that a new call started, so they drop their listings
+        self._generations = itertools.count()
+
+    def __enter__(self) -> Linter:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Shut the worker processes down; a later call starts new ones."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    def lint_many(
+        self,
+        sources: Iterable[LintInput],
+        max_in_flight: int | None = None,
+        ordered: bool = False,
+    ) -> Iterator[LintResult]:
+        """Lint ``sources`` and yield one result per input as results finish.
+
+        Each source is a file path, read by whichever process lints it, or a
+        ``(path, content)`` pair; the path then only labels the result and
+        diagnostics, and resolves relative links. ``sources`` is consumed
+        lazily: at most ``max_in_flight`` documents (default: a few chunks
+        per worker) are queued or being linted at a time, so memory stays
+        flat however many there are. With ``ordered``, results come in input
+        order instead, at the cost of waiting for slow documents.
+        """
+        if max_in_flight is None:
+            limit = self.jobs * self.chunk_size * DEFAULT_CHUNKS_IN_FLIGHT
+        else:
+            limit = max_in_flight
+        if limit < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        inputs = (_split_input(source) for source in sources)
+        if self.jobs <= 1:
+            return self._lint_in_process(inputs)
+        return self._lint_in_pool(inputs, min(self.chunk_size, limit), limit, ordered)
+
+    def _lint_in_process(self, inputs: Iterator[tuple[str, str | None]]) -> Iterator[LintResult]:
+        fs = fscache.FileSystemCache()
+        included = includes.IncludeCache()
+        for path, content in inputs:
+            # Only active while linting, not while the caller handles a result
+            with fscache.session(fs), includes.session(included):
+                result = _lint_input(path, content, self.rules, self._facts)
+            yield result
+
+    def _lint_in_pool(
+        self,
+        inputs: Iterator[tuple[str, str | None]],
+        chunk_size: int,
+        limit: int,
+        ordered: bool,
+    ) -> Iterator[LintResult]:
+        from concurrent.futures import FIRST_COMPLETED, Future, wait
+
+        generation = next(self._generations)
+        # Submitted chunks in input order, with their paths
+        in_flight: dict[Future[list[LintResult]], list[str]] = {}
+        queued = 0
+        chunk: list[tuple[str, str | None]] = []
+
+        def submit() -> None:
+            nonlocal queued
+            future: Future[list[LintResult]]
+            try:
+                # Arguments are pickled later, so the list must not be reused
+                future = self._start_pool().submit(_lint_batch, list(chunk), generation)
+            except Exception as e:  # e.g. BrokenProcessPool after a worker died
+                future = Future()
+                future.set_exception(e)
+            in_flight[future] = [path for path, _ in chunk]
+            queued += len(chunk)
+            chunk.clear()
+
+        def finished(block: bool) -> Iterator[LintResult]:
+            """Yield the results of finished chunks, waiting for one if ``block``."""
+            nonlocal queued
+            if block:
+                # Ordered results can only continue with the oldest chunk
+                wait([next(iter(in_flight))] if ordered else in_flight, None, FIRST_COMPLETED)
+            for future in list(in_flight):
+                if not future.done():
+                    if ordered:
+                        break
+                    continue
+                paths = in_flight.pop(future)
+                queued -= len(paths)
+                yield from self._collect(future, paths)
+
+        try:
+            for path, content in inputs:
+                chunk.append((path, content))
+                if len(chunk) >= chunk_size:
+                    submit()
+                    yield from finished(block=False)
+                # Make room before reading the next input
+                while in_flight and queued + len(chunk) >= limit:
+                    yield from finished(block=True)
+            if chunk:
+                if self._pool is None and not in_flight:
+                    # Not worth starting workers for less than one chunk
+                    fs = fscache.FileSystemCache()
+                    included = includes.IncludeCache()
+                    for path, content in chunk:
+                        with fscache.session(fs), includes.session(included):
+                            result = _lint_input(path, content, self.rules, self._facts)
+                        yield result
+                    chunk.clear()
+                else:
+                    submit()
+            while in_flight:
+                yield from finished(block=True)
+        finally:
+            # The caller stopped early; the pool stays up for later calls
+            for future in in_flight:
+                future.cancel()
+
+    def _start_pool(self) -> ProcessPoolExecutor:
+        from concurrent.futures import ProcessPoolExecutor
+
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                self.jobs, initializer=_init_worker, initargs=(self.rules,)
+            )
+        return self._pool
+
+    def _collect(self, future: Future[list[LintResult]], paths: list[str]) -> list[LintResult]:
+        from concurrent.futures.process import BrokenProcessPool
+
+        try:
+            return future.result()
+        except Exception as e:
+            if isinstance(e, BrokenProcessPool) and self._pool is not None:
+                # Start over with new workers on the next chunk
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+            # A crashed worker only fails the files it was processing
+            return [LintResult(path, error=f"Failed to lint: {e!r}") for path in paths]
+
+
+def _split_input(source: LintInput) -> tuple[str, str | None]:
+    if isinstance(source, tuple):
+        path, content = source
+        return path, content
+    return os.fspath(source), None
+
+
+# Shared by lint_many() calls, so their rules and workers are reused
+_shared_linter: Linter | None = None
+
+
+def lint_many(
+    sources: Iterable[LintInput],
+    jobs: int = 1,
+    rules: Sequence[RuleBase] | None = None,
+    max_in_flight: int | None = None,
+    ordered: bool = False,
+) -> Iterator[LintResult]:
+    """Lint file paths or ``(path, content)`` pairs, yielding results as they finish.
+
+    See :meth:`Linter.lint_many`. Calls with the same ``jobs`` and rules
+    share one :class:`Linter`, so worker processes are started once;
+    create a :class:`Linter` directly to control their lifetime.
+    """
+    global _shared_linter
+    selected = list(rules) if rules is not None else get_all_rules()
+    linter = _shared_linter
+    if linter is None or linter.jobs != jobs or linter.rules != selected:
+        # A previous linter still in use keeps its pool until it is collected
+        linter = _shared_linter = Linter(selected, jobs)
+    return linter.lint_many(sources, max_in_flight, ordered)
@@ -1,22 +1,54 @@
-"""Validation engine that orchestrates rules against parsed documents."""
-
-from __future__ import annotations
-
-from prompt_lint.models import Diagnostic, PromptDocument
-from prompt_lint.rules import RuleBase, get_all_rules
-
-
-def validate(doc: PromptDocument, rules: list[RuleBase] | None = None) -> list[Diagnostic]:
-    """Run all rules against a document and return diagnostics."""
-    if rules is None:
-        rules = get_all_rules()
-
-    diagnostics: list[Diagnostic] = []
-    for rule in rules:
-        results = rule.check(doc)
-        for diag in results:
-            diag.path = doc.path
-        diagnostics.extend(results)
-
-    diagnostics.sort(key=lambda d: (d.path, d.position.line, d.position.column))
-    return diagnostics
+"""Validation engine that orchestrates rules against parsed documents."""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Callable, Iterable
+
+from prompt_lint import profiling
+from prompt_lint.models import Diagnostic, Fact, PromptDocument
+from prompt_lint.rules import RuleBase, get_all_rules
+
+
+def required_facts(rules: Iterable[RuleBase]) -> Fact:
+    """The facts the parser must extract for ``rules`` to run."""
+    facts = Fact(0)
+    for rule in rules:
+        facts |= rule.facts
+    return facts
+
+
+def validate(
+    doc: PromptDocument,
+    rules: list[RuleBase] | None = None,
+    cancelled: Callable[[], bool] | None = None,
+) -> list[Diagnostic]:
+    """Run all rules against a document and return diagnostics.
+
+    ``cancelled`` is checked before each rule; once it returns true the
+    remaining rules are skipped and the result is incomplete.
+    """
+    if rules is None:
+        rules = get_all_rules()
+
+    profiler = profiling.active
+    validate_started = time.perf_counter() if profiler is not None else 0.0
+
+    diagnostics: list[Diagnostic] = []
+    for rule in rules:
+        if cancelled is not None and cancelled():
+            break
+        if profiler is None:
+            results = rule.check(doc)
+        else:
+            started = time.perf_counter()
+            results = rule.check(doc)
+            profiler.record_rule(rule.rule_id, time.perf_counter() - started)
+        for diag in results:
+            diag.path = doc.path
+        diagnostics.extend(results)
+
+    diagnostics.sort(key=lambda d: (d.path, d.position.line, d.position.column))
+    if profiler is not None:
+        profiler.record("rules", time.perf_counter() - validate_started)
+    return diagnostics
@@ -0,0 +1,538 @@
+"""Watch mode: re-lint files as they change and report what changed.
+
+:class:`WatchSession` holds the diagnostics of every target, and the parsed
+documents of the files edited since it started, so that a save costs an
+incremental :func:`~prompt_lint.parser.reparse` of the edited lines plus the
+rules for that one file, whatever the size of the tree. Editing a file that
+prompts include re-lints those prompts, and only those.
+
+Changes on disk are reported by an :class:`InotifyWatcher` on Linux, which
+asks the kernel for events through ``ctypes``, or else by a
+:class:`PollingWatcher`, which compares directory snapshots. Events are
+coalesced over a short window, so an editor writing a file in several steps,
+or a ``git checkout`` touching many, leads to one update.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass, field
+
+from prompt_lint import fscache, includes
+from prompt_lint.discovery import PRUNED_DIRECTORIES, iter_prompt_files, walk_tree
+from prompt_lint.formatters import format_text
+from prompt_lint.models import PromptDocument, Severity
+from prompt_lint.parser import parse, reparse, resolve_includes
+from prompt_lint.rules import RuleBase
+from prompt_lint.runner import LintResult, run_lint
+from prompt_lint.validator import required_facts, validate
+
+PROMPT_SUFFIX = ".prompt.md"
+
+# Seconds without events after which a batch of changes is handled
+DEFAULT_DEBOUNCE = 0.05
+# Upper bound on the coalescing window while events keep arriving
+MAX_COALESCE = 1.0
+DEFAULT_POLL_INTERVAL = 0.5
+
+
+def changed_line_range(old: str, new: str) -> tuple[int, int, int] | None:
+    """The lines of ``old`` replaced to obtain ``new``, for :func:`reparse`.
+
+    Returns ``(first_line, last_line, line_delta)`` with an inclusive,
+    0-based range in ``old``, or None if the texts are equal.
+    """
+    if old == new:
+        return None
+    old_lines = old.split("\n")
+    new_lines = new.split("\n")
+    shortest = min(len(old_lines), len(new_lines))
+    first = 0
+    while first < shortest and old_lines[first] == new_lines[first]:
+        first += 1
+    # Lines appended at the end edit the last line
+    first = min(first, len(old_lines) - 1)
+    # Common suffix, not overlapping the common prefix
+    suffix = 0
+    while (
+        suffix < shortest - first
+        and old_lines[len(old_lines) - 1 - suffix] == new_lines[len(new_lines) - 1 - suffix]
+    ):
+        suffix += 1
+    delta = len(new_lines) - len(old_lines)
+    last = max(first, len(old_lines) - 1 - suffix)
+    return first, last, delta
+
+
+@dataclass
+class FileChange:
+    """Diagnostics of one file that appeared or went away in an update.
+
+    Each line is formatted like the text output of ``lint``; files that
+    could not be linted have a single ``path: error`` line.
+    """
+
+    path: str
+    added: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+
+
+def _lines(result: LintResult | None) -> list[str]:
+    if result is None:
+        return []
+    if result.error is not None:
+        return [f"{result.path}: {result.error}"]
+    return [format_text(d) for d in result.diagnostics]
+
+
+def _dependency_key(path: str) -> str:
+    # Links may differ from the file name in case only, which R006 reports
+    return os.path.normcase(path).casefold()
+
+
+class WatchSession:
+    """The lint state of a set of targets, updated file by file."""
+
+    def __init__(self, roots: Sequence[str], rules: Sequence[RuleBase]) -> None:
+        # Directories whose prompt files are targets, and individual files
+        self.directories = [os.path.normpath(r) for r in roots if os.path.isdir(r)]
+        self.files = {os.path.normpath(r) for r in roots if not os.path.isdir(r)}
+        self.rules = list(rules)
+        self.facts = required_facts(self.rules)
+        self.results: dict[str, LintResult] = {}
+        self.documents: dict[str, PromptDocument] = {}
+        self.fs = fscache.FileSystemCache()
+        self.includes = includes.IncludeCache()
+        # Targets and the files they include
+        self.graph = includes.DependencyGraph()
+        # Folded path looked up by R006 -> targets whose result depends on it
+        self._dependents: dict[str, set[str]] = {}
+        # Directory -> targets in it, to find those below a deleted directory
+        self._by_directory: dict[str, set[str]] = {}
+
+    def targets(self) -> list[str]:
+        """Every file to lint, as ``lint`` would expand the roots."""
+        found = set(self.files)
+        for directory in self.directories:
+            found.update(_find_prompts(directory))
+        return sorted(found)
+
+    def start(self, jobs: int = 1) -> list[LintResult]:
+        """Lint every target, with ``jobs`` worker processes; returns the results."""
+        self.results.clear()
+        self.documents.clear()
+        self._dependents.clear()
+        self._by_directory.clear()
+        self.fs.clear()
+        self.includes.clear()
+        self.graph = includes.DependencyGraph()
+        with fscache.session(self.fs), includes.session(self.includes):
+            results = list(run_lint(self.targets(), self.rules, jobs=jobs))
+        for result in results:
+            self._store(result)
+        return results
+
+    def is_target(self, path: str) -> bool:
+        path = os.path.normpath(path)
+        if path in self.files:
+            return True
+        return path.endswith(PROMPT_SUFFIX) and any(
+            _is_within(path, directory) for directory in self.directories
+        )
+
+    def update(self, paths: Iterable[str]) -> list[FileChange]:
+        """Re-lint what the changed ``paths`` affect; returns the changed diagnostics.
+
+        A path may be a file or a directory that was created, modified or
+        deleted. Besides the targets among them, targets whose links
+        resolved to a created or deleted path, and targets including a
+        changed file, are checked again.
+        """
+        stale: set[str] = set()
+        for path in {os.path.normpath(p) for p in paths}:
+            self.fs.invalidate(path)
+            self.includes.invalidate(path)
+            stale.update(self.graph.dependents(os.path.abspath(path)))
+            if self.is_target(path):
+                stale.add(path)
+            if os.path.isdir(path) and not os.path.islink(path):
+                # A directory created or moved here as a whole
+                stale.update(p for p in _find_prompts(path) if self.is_target(p))
+            if not os.path.isfile(path):
+                # Possibly a directory deleted or moved away as a whole
+                for directory, targets in self._by_directory.items():
+                    if _is_within(directory, path):
+                        stale.update(targets)
+            stale.update(self._dependents.get(_dependency_key(os.path.abspath(path)), ()))
+
+        changes = []
+        for path in sorted(stale):
+            old = self.results.get(path)
+            new = self._lint(path)
+            before, after = _lines(old), _lines(new)
+            added = [line for line in after if line not in before]
+            removed = [line for line in before if line not in after]
+            if added or removed:
+                changes.append(FileChange(path, added, removed))
+        return changes
+
+    def totals(self) -> tuple[int, int]:
+        """The error and warning counts over all targets, as ``lint`` counts them."""
+        errors = warnings = 0
+        for result in self.results.values():
+            if result.error is not None:
+                errors += 1
+                continue
+            for diag in result.diagnostics:
+                if diag.severity == Severity.ERROR:
+                    errors += 1
+                else:
+                    warnings += 1
+        return errors, warnings
+
+    def _lint(self, path: str) -> LintResult | None:
+        """Lint one target again, or forget it if it is gone."""
+        self._forget(path)
+        try:
+            with open(path, encoding="utf-8") as f:
+                content = f.read()
+        except FileNotFoundError:
+            self.documents.pop(path, None)
+            return None
+        except (OSError, UnicodeDecodeError) as e:
+            self.documents.pop(path, None)
+            result = LintResult(path, error=f"Failed to parse: {e}")
+            self._store(result)
+            return result
+
+        try:
+            with (
+                fscache.session(self.fs),
+                self.fs.recording() as dependencies,
+                includes.session(self.includes),
+            ):
+                document = self._parse(path, content)
+                diagnostics = validate(document, self.rules)
+            result = LintResult(
+                path,
+                diagnostics,
+                dependencies=dependencies,
+                includes=self.includes.dependencies(document.included_paths),
+            )
+        except Exception as e:
+            self.documents.pop(path, None)
+            result = LintResult(path, error=f"Failed to parse: {e}")
+        self._store(result)
+        return result
+
+    def _parse(self, path: str, content: str) -> PromptDocument:
+        previous = self.documents.get(path)
+        if previous is not None:
+            edited = changed_line_range(previous.raw_content, content)
+            if edited is not None:
+                document = reparse(previous, content, *edited)
+            elif previous.includes:
+                # Unchanged itself, but what it includes may have changed
+                document = resolve_includes(previous)
+            else:
+                document = previous
+        else:
+            document = parse(content, path, self.facts)
+        self.documents[path] = document
+        return document
+
+    def _store(self, result: LintResult) -> None:
+        self.results[result.path] = result
+        self._by_directory.setdefault(os.path.dirname(result.path), set()).add(result.path)
+        for looked_up, _ in result.dependencies:
+            self._dependents.setdefault(_dependency_key(looked_up), set()).add(result.path)
+        self.graph.update(result.path, (included for included, _ in result.includes))
+
+    def _forget(self, path: str) -> None:
+        old = self.results.pop(path, None)
+        if old is None:
+            return
+        self.graph.discard(path)
+        directory = os.path.dirname(path)
+        self._by_directory[directory].discard(path)
+        if not self._by_directory[directory]:
+            del self._by_directory[directory]
+        for looked_up, _ in old.dependencies:
+            dependents = self._dependents.get(_dependency_key(looked_up))
+            if dependents is not None:
+                dependents.discard(path)
+                if not dependents:
+                    del self._dependents[_dependency_key(looked_up)]
+
+
+def _is_within(path: str, directory: str) -> bool:
+    return path == directory or path.startswith(directory.rstrip(os.sep) + os.sep)
+
+
+def _find_prompts(directory: str) -> Iterable[str]:
+    return (os.path.normpath(p) for p in iter_prompt_files([directory]))
+
+
+# --- Change notification ---
+
+
+class Watcher(ABC):
+    """Reports paths created, modified or deleted under a set of roots."""
+
+    @abstractmethod
+    def wait(self, timeout: float | None = None) -> set[str]:
+        """Block until something changes, or ``timeout`` seconds pass.
+
+        Returns the changed paths, coalescing events until none arrive for
+        :data:`DEFAULT_DEBOUNCE` seconds. Paths may be directories, e.g. the
+        roots themselves if the watcher lost track of events.
+        """
+
+    def close(self) -> None:
+        """Release the resources held by the watcher."""
+
+    def __enter__(self) -> Watcher:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+class PollingWatcher(Watcher):
+    """Finds changes by comparing directory snapshots every ``interval`` seconds.
+
+    Any file created or deleted is reported, and Markdown files, prompts or
+    files they include, whose size or modification time changed. Each poll
+    walks the tree, skipping the directories the prompt search prunes.
+    """
+
+    def __init__(
+        self,
+        roots: Sequence[str],
+        interval: float = DEFAULT_POLL_INTERVAL,
+        debounce: float = DEFAULT_DEBOUNCE,
+    ) -> None:
+        self.roots = [os.path.normpath(r) for r in roots]
+        self.interval = interval
+        self.debounce = debounce
+        self._snapshot = self._take_snapshot()
+
+    def wait(self, timeout: float | None = None) -> set[str]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        changed: set[str] = set()
+        while True:
+            snapshot = self._take_snapshot()
+            found = {
+                path
+                for path in snapshot.keys() | self._snapshot.keys()
+                if snapshot.get(path) != self._snapshot.get(path)
+            }
+            self._snapshot = snapshot
+            if found:
+                changed |= found
+                # Poll again shortly, until the tree is quiet
+                time.sleep(self.debounce)
+                continue
+            if changed:
+                return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return changed
+            time.sleep(
+                self.interval
+                if deadline is None
+                else max(0.0, min(self.interval, deadline - time.monotonic()))
+            )
+
+    def _take_snapshot(self) -> dict[str, tuple[int, int] | None]:
+        # Path -> (mtime_ns, size) for Markdown files, None for other entries
+        snapshot: dict[str, tuple[int, int] | None] = {}
+        for root in self.roots:
+            if not os.path.isdir(root):
+                try:
+                    st = os.stat(root)
+                except OSError:
+                    continue
+                snapshot[root] = (st.st_mtime_ns, st.st_size)
+                continue
+            for dirpath, dirnames, filenames in walk_tree(root):
+                for name in dirnames:
+                    snapshot[os.path.join(dirpath, name)] = None
+                for name in filenames:
+                    path = os.path.join(dirpath, name)
+                    if not name.endswith(".md"):
+                        snapshot[path] = None
+                        continue
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    snapshot[path] = (st.st_mtime_ns, st.st_size)
+        return snapshot
+
+
+class InotifyWatcher(Watcher):
+    """Receives change events from the Linux kernel; no work while idle.
+
+    Every directory below the roots is watched, except those the prompt
+    search prunes (see :func:`~prompt_lint.discovery.walk_tree`), and
+    directories created later are added as they appear. Raises OSError where
+    inotify is not available.
+    """
+
+    _EVENT = struct.Struct("iIII")
+    _MASK = (
+        0x00000002  # IN_MODIFY
+        | 0x00000008  # IN_CLOSE_WRITE
+        | 0x00000040  # IN_MOVED_FROM
+        | 0x00000080  # IN_MOVED_TO
+        | 0x00000100  # IN_CREATE
+        | 0x00000200  # IN_DELETE
+        | 0x00000400  # IN_DELETE_SELF
+        | 0x00000800  # IN_MOVE_SELF
+    )
+    _CREATED_DIRECTORY = 0x00000080 | 0x00000100  # IN_MOVED_TO | IN_CREATE
+    _IGNORED = 0x00008000
+    _OVERFLOW = 0x00004000
+    _ISDIR = 0x40000000
+    _NONBLOCK_CLOEXEC = 0o4000 | 0o2000000
+
+    def __init__(self, roots: Sequence[str], debounce: float = DEFAULT_DEBOUNCE) -> None:
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux")
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._add_watch.restype = ctypes.c_int
+        fd = libc.inotify_init1(self._NONBLOCK_CLOEXEC)
+        if fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, f"inotify_init1: {os.strerror(error)}")
+        self._fd = fd
+        self.roots = [os.path.normpath(r) for r in roots]
+        self.debounce = debounce
+        self._directories: dict[int, str] = {}
+        # Whether a directory could not be watched, so the warning is given once
+        self._warned = False
+        for root in self.roots:
+            if os.path.isdir(root):
+                self._watch_tree(root)
+            else:
+                # Files given as roots are watched through their directory
+                self._watch(os.path.dirname(root) or os.curdir)
+
+    def wait(self, timeout: float | None = None) -> set[str]:
+        changed: set[str] = set()
+        if not self._read(timeout, changed):
+            return changed
+        started = time.monotonic()
+        while time.monotonic() - started < MAX_COALESCE and self._read(self.debounce, changed):
+            pass
+        return changed
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def _read(self, timeout: float | None, changed: set[str]) -> bool:
+        """Collect the events available within ``timeout``; False if there were none."""
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return False
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return False
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = self._EVENT.unpack_from(data, offset)
+            offset += self._EVENT.size
+            name = data[offset : offset + length].rstrip(b"\0")
+            offset += length
+            if mask & self._OVERFLOW:
+                # Events were lost: report the roots so everything is checked
+                changed.update(self.roots)
+                continue
+            directory = self._directories.get(wd)
+            if directory is None:
+                continue
+            if mask & self._IGNORED:
+                del self._directories[wd]
+                continue
+            path = os.path.join(directory, os.fsdecode(name)) if name else directory
+            changed.add(path)
+            if (
+                mask & self._ISDIR
+                and mask & self._CREATED_DIRECTORY
+                and os.fsdecode(name) not in PRUNED_DIRECTORIES
+            ):
+                # Files may have been created before the directory was watched
+                changed.update(self._watch_tree(path))
+        return True
+
+    def _watch_tree(self, root: str) -> list[str]:
+        """Watch ``root`` and the directories below it; returns the files found."""
+        found: list[str] = []
+        for dirpath, _, filenames in walk_tree(root):
+            self._watch(dirpath)
+            found.extend(os.path.join(dirpath, name) for name in filenames)
+        return found
+
+    def _watch(self, directory: str) -> None:
+        wd = self._add_watch(self._fd, os.fsencode(directory), self._MASK)
+        if wd >= 0:
+            self._directories[wd] = directory
+            return
+        error = ctypes.get_errno()
+        # A directory removed before it was watched needs no watch
+        if error in (errno.ENOENT, errno.ENOTDIR) or self._warned:
+            return
+        self._warned = True
+        hint = "; raise fs.inotify.max_user_watches or use --poll" if error == errno.ENOSPC else ""
+        print(
+            f"Warning: Cannot watch {directory} for changes: {os.strerror(error)}{hint}",
+            file=sys.stderr,
+        )
+
+
+def create_watcher(
+    roots: Sequence[str], poll: bool = False, interval: float = DEFAULT_POLL_INTERVAL
+) -> Watcher:
+    """An :class:`InotifyWatcher` if possible, else a :class:`PollingWatcher`."""
+    if not poll:
+        try:
+            return InotifyWatcher(roots)
+        except (OSError, AttributeError):
+            # Not Linux, or a libc without inotify
+            pass
+    return PollingWatcher(roots, interval)
+
+
+def watch(
+    session: WatchSession,
+    watcher: Watcher,
+    report: Callable[[list[FileChange], float], None],
+    should_stop: Callable[[], bool] = lambda: False,
+) -> None:
+    """Apply the changes ``watcher`` reports to ``session`` until ``should_stop()``.
+
+    ``report`` receives the changed diagnostics of each update with the
+    seconds it took, and is only called when something changed.
+    """
+    while not should_stop():
+        paths = watcher.wait(timeout=0.5)
+        if not paths:
+            continue
+        started = time.perf_counter()
+        changes = session.update(paths)
+        if changes:
+            report(changes, time.perf_counter() - started)
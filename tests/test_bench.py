@@ -0,0 +1,105 @@
+"""Tests for the benchmark corpus generator and harness."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from prompt_lint.bench import (
+    CorpusSpec,
+    compare,
+    format_report,
+    generate_document,
+    run_benchmarks,
+    write_corpus,
+)
+from prompt_lint.cli import main
+from prompt_lint.models import SectionKind
+from prompt_lint.parser import parse
+
+
+def _report(ops_per_sec: float, peak_memory: int | None) -> dict[str, object]:
+    return {"benchmarks": {"parse": {"ops_per_sec": ops_per_sec, "peak_memory": peak_memory}}}
+
+
+class TestCorpus:
+    def test_generation_is_reproducible(self) -> None:
+        spec = CorpusSpec(seed=3)
+        assert generate_document(spec, 5) == generate_document(CorpusSpec(seed=3), 5)
+        assert generate_document(spec, 5) != generate_document(CorpusSpec(seed=4), 5)
+
+    def test_documents_follow_the_spec(self) -> None:
+        spec = CorpusSpec(variables=4, extra_sections=2, examples_lines=30, japanese_ratio=1.0)
+        doc = parse(generate_document(spec, 0))
+        assert doc.frontmatter is not None
+        assert len(doc.input_variables) == 4
+        assert len(doc.sections) == 4 + 2 + 1
+        assert all(s.kind is not None for s in doc.sections)
+        assert all("（" in s.raw_heading for s in doc.sections)
+        examples = doc.get_section(SectionKind.EXAMPLES)
+        assert examples is not None
+        assert examples.content.count("\n") >= 29
+
+    def test_write_corpus(self, tmp_path: Path) -> None:
+        paths = write_corpus(CorpusSpec(files=3), tmp_path)
+        assert [p.name for p in paths] == [
+            "prompt_00000.prompt.md",
+            "prompt_00001.prompt.md",
+            "prompt_00002.prompt.md",
+        ]
+
+
+class TestHarness:
+    def test_run_benchmarks(self, tmp_path: Path) -> None:
+        paths = write_corpus(CorpusSpec(files=4), tmp_path)
+        report = run_benchmarks(paths, ["parse", "validate", "lsp_hover"], repeat=1)
+        results = report["benchmarks"]
+        assert set(results) == {"parse", "validate", "lsp_hover"}
+        assert results["parse"]["ops"] == 4
+        assert results["parse"]["peak_memory"] > 0
+        assert results["lsp_hover"]["ops"] > 4
+        assert report["corpus"]["files"] == 4
+        assert "parse" in format_report(report)
+
+    def test_lean_load_drops_sources(self, tmp_path: Path) -> None:
+        paths = write_corpus(CorpusSpec(files=4), tmp_path)
+        results = run_benchmarks(paths, ["load", "load_lean"], repeat=1)["benchmarks"]
+        assert results["load_lean"]["ops"] == 4
+        assert results["load_lean"]["peak_memory"] < results["load"]["peak_memory"]
+
+    def test_compare_flags_regressions(self) -> None:
+        baseline = _report(1000, 1_000_000)
+        assert compare(_report(950, 1_050_000), baseline, 0.10) == []
+        regressions = compare(_report(800, 1_200_000), baseline, 0.10)
+        assert len(regressions) == 2
+        assert regressions[0].startswith("parse: throughput")
+
+    def test_compare_ignores_untraced_memory(self) -> None:
+        assert compare(_report(1000, None), _report(1000, 10), 0.10) == []
+
+
+class TestBenchCommand:
+    def test_writes_json_and_compares(self, tmp_path: Path) -> None:
+        runner = CliRunner()
+        out = tmp_path / "bench.json"
+        args = ["bench", "--files-count", "3", "--repeat", "1", "-b", "parse"]
+        result = runner.invoke(main, [*args, "-o", str(out)])
+        assert result.exit_code == 0, result.output
+        report = json.loads(out.read_text(encoding="utf-8"))
+        assert report["corpus"]["files"] == 3
+        assert report["corpus"]["seed"] == 0
+
+        report["benchmarks"]["parse"]["ops_per_sec"] *= 100
+        out.write_text(json.dumps(report), encoding="utf-8")
+        result = runner.invoke(main, [*args, "--compare", str(out)])
+        assert result.exit_code == 1
+        assert "Regression: parse: throughput" in result.output
+
+    def test_real_files(self, fixtures_dir: Path) -> None:
+        result = CliRunner().invoke(
+            main, ["bench", "--repeat", "1", "-b", "validate", str(fixtures_dir)]
+        )
+        assert result.exit_code == 0, result.output
+        assert "validate" in result.output
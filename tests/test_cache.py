@@ -0,0 +1,210 @@
+"""Tests for the on-disk result cache."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+
+import prompt_lint.cache as cache_module
+from prompt_lint.cache import (
+    MAX_NAMESPACES,
+    CacheDirectoryError,
+    ResultCache,
+    content_key,
+    rules_fingerprint,
+)
+from prompt_lint.models import Diagnostic, Position, Severity
+from prompt_lint.rules import RuleRegistry, get_all_rules
+
+CONTENT = "# Role\nR\n"
+
+
+def _diagnostic() -> Diagnostic:
+    return Diagnostic(
+        rule_id="R001",
+        severity=Severity.ERROR,
+        message='Required section "Input" is missing',
+        position=Position(line=1),
+    )
+
+
+def _write(path: Path, content: str = CONTENT) -> str:
+    path.write_text(content, encoding="utf-8")
+    return str(path)
+
+
+class TestResultCache:
+    def test_round_trip_through_disk(self, tmp_path: Path) -> None:
+        target = _write(tmp_path / "a.prompt.md")
+        cache = ResultCache(tmp_path / "cache", get_all_rules())
+        assert cache.lookup(target) is None
+        cache.store(content_key(CONTENT), target, [_diagnostic()])
+        cache.save()
+
+        reloaded = ResultCache(tmp_path / "cache", get_all_rules())
+        diagnostics = reloaded.lookup(target)
+        assert diagnostics is not None
+        assert diagnostics[0].rule_id == "R001"
+        assert diagnostics[0].path == target
+
+    def test_stat_change_misses_but_content_hits(self, tmp_path: Path) -> None:
+        target = _write(tmp_path / "a.prompt.md")
+        cache = ResultCache(tmp_path / "cache", get_all_rules())
+        cache.lookup(target)
+        cache.store(content_key(CONTENT), target, [_diagnostic()])
+        cache.save()
+
+        os.utime(target, ns=(0, 0))
+        reloaded = ResultCache(tmp_path / "cache", get_all_rules())
+        assert reloaded.lookup(target) is None
+        diagnostics = reloaded.load(content_key(CONTENT), target)
+        assert diagnostics is not None
+        assert len(diagnostics) == 1
+
+    def test_identical_content_shares_an_entry(self, tmp_path: Path) -> None:
+        first = _write(tmp_path / "a.prompt.md")
+        second = _write(tmp_path / "b.prompt.md")
+        cache = ResultCache(tmp_path / "cache", get_all_rules())
+        cache.store(content_key(CONTENT), first, [_diagnostic()])
+
+        diagnostics = cache.load(content_key(CONTENT), second)
+        assert diagnostics is not None
+        assert diagnostics[0].path == second
+
+    def test_clean_files_need_no_entry(self, tmp_path: Path) -> None:
+        target = _write(tmp_path / "a.prompt.md")
+        cache = ResultCache(tmp_path / "cache", get_all_rules())
+        cache.lookup(target)
+        cache.store(content_key(CONTENT), target, [])
+        cache.save()
+
+        assert not list(cache.directory.glob("*/*.json"))
+        assert ResultCache(tmp_path / "cache", get_all_rules()).lookup(target) == []
+
+    def test_other_rule_sets_are_kept(self, tmp_path: Path) -> None:
+        target = _write(tmp_path / "a.prompt.md")
+        old = ResultCache(tmp_path / "cache", get_all_rules()[:1])
+        old.store(content_key(CONTENT), target, [_diagnostic()])
+        old.save()
+
+        current = ResultCache(tmp_path / "cache", get_all_rules())
+        assert current.namespace != old.namespace
+        assert current.lookup(target) is None
+        current.save()
+        assert ResultCache(tmp_path / "cache", get_all_rules()[:1]).lookup(target) is not None
+
+    def test_plugin_versions_change_the_namespace(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        rules = get_all_rules()
+
+        def fingerprint(provider: str) -> str:
+            registry = RuleRegistry(rules, providers={rules[-1].rule_id: provider})
+            monkeypatch.setattr(cache_module, "get_registry", lambda: registry)
+            return rules_fingerprint(rules)
+
+        assert fingerprint("extra==1.0") == fingerprint("extra==1.0")
+        assert fingerprint("extra==1.0") != fingerprint("extra==1.1")
+
+    def test_least_recently_used_namespaces_are_pruned(self, tmp_path: Path) -> None:
+        target = _write(tmp_path / "a.prompt.md")
+        rules = get_all_rules()
+        # Distinct rule sets: every prefix of the rules, then some suffixes
+        rule_sets = [rules[:n] for n in range(1, len(rules) + 1)]
+        rule_sets += [rules[n:] for n in range(1, MAX_NAMESPACES + 2 - len(rule_sets))]
+        caches = [ResultCache(tmp_path / "cache", r) for r in rule_sets]
+        assert len({c.namespace for c in caches}) == MAX_NAMESPACES + 1
+        for age, cache in enumerate(caches):
+            cache.store(content_key(CONTENT), target, [_diagnostic()])
+            cache.save()
+            os.utime(cache.directory, (age, age))
+        ResultCache(tmp_path / "cache", rule_sets[-1]).save()
+
+        kept = {p.name for p in (tmp_path / "cache").iterdir() if p.is_dir()}
+        assert kept == {c.namespace for c in caches[1:]}
+
+    def test_directories_it_did_not_create_are_kept(self, tmp_path: Path) -> None:
+        target = _write(tmp_path / "a.prompt.md")
+        (tmp_path / "cache" / "important").mkdir(parents=True)
+        (tmp_path / "cache" / "0123456789abcdef").mkdir()
+        (tmp_path / "cache" / "important" / "notes.txt").write_text("keep", encoding="utf-8")
+        with pytest.raises(CacheDirectoryError):
+            ResultCache(tmp_path / "cache", get_all_rules())
+
+        # Once marked as a cache, only namespaces are pruned
+        cache = ResultCache(tmp_path / "empty", get_all_rules())
+        (tmp_path / "empty" / "important").mkdir()
+        cache.store(content_key(CONTENT), target, [_diagnostic()])
+        cache.save()
+        assert (tmp_path / "empty" / "important").is_dir()
+        assert (tmp_path / "cache" / "important" / "notes.txt").exists()
+
+    def test_write_failures_are_kept_not_raised(self, tmp_path: Path) -> None:
+        target = _write(tmp_path / "a.prompt.md")
+        cache = ResultCache(tmp_path / "cache", get_all_rules())
+        # A file where the namespace directory should be
+        cache.directory.write_text("", encoding="utf-8")
+        cache.store(content_key(CONTENT), target, [_diagnostic()])
+        assert isinstance(cache.write_error, OSError)
+        cache.save()
+        assert cache.directory.is_file()
+
+    def test_an_empty_directory_can_be_used(self, tmp_path: Path) -> None:
+        (tmp_path / "cache").mkdir()
+        cache = ResultCache(tmp_path / "cache", get_all_rules())
+        assert (tmp_path / "cache" / "CACHEDIR.TAG").exists()
+        assert cache.lookup(_write(tmp_path / "a.prompt.md")) is None
+
+    def test_orphaned_entries_are_pruned(self, tmp_path: Path) -> None:
+        target = _write(tmp_path / "a.prompt.md")
+        cache = ResultCache(tmp_path / "cache", get_all_rules())
+        cache.store(content_key(CONTENT), target, [_diagnostic()])
+        cache.save()
+
+        _write(tmp_path / "a.prompt.md", CONTENT + "more\n")
+        cache = ResultCache(tmp_path / "cache", get_all_rules())
+        cache.lookup(target)
+        cache.store(content_key(CONTENT + "more\n"), target, [_diagnostic()])
+        cache.save()
+
+        entries = {p.stem for p in cache.directory.glob("*/*.json")}
+        assert entries == {content_key(CONTENT + "more\n")}
+
+    def test_corrupt_index_is_ignored(self, tmp_path: Path) -> None:
+        cache = ResultCache(tmp_path / "cache", get_all_rules())
+        cache.directory.mkdir(parents=True, exist_ok=True)
+        (cache.directory / "index.json").write_text("{not json", encoding="utf-8")
+        target = _write(tmp_path / "a.prompt.md")
+        assert ResultCache(tmp_path / "cache", get_all_rules()).lookup(target) is None
+
+
+class TestDependencies:
+    def test_result_is_served_while_dependencies_hold(self, tmp_path: Path) -> None:
+        target = _write(tmp_path / "a.prompt.md")
+        linked = tmp_path / "notes.md"
+        linked.write_text("notes\n", encoding="utf-8")
+        cache = ResultCache(tmp_path / "cache", get_all_rules())
+        cache.lookup(target)
+        cache.store(content_key(CONTENT), target, [], [(str(linked), str(linked))])
+        cache.save()
+
+        assert ResultCache(tmp_path / "cache", get_all_rules()).lookup(target) == []
+        linked.unlink()
+        reloaded = ResultCache(tmp_path / "cache", get_all_rules())
+        assert reloaded.lookup(target) is None
+        assert reloaded.load(content_key(CONTENT), target) is None
+
+    def test_shared_entry_is_checked_from_each_directory(self, tmp_path: Path) -> None:
+        (tmp_path / "one").mkdir()
+        (tmp_path / "two").mkdir()
+        first = _write(tmp_path / "one" / "a.prompt.md")
+        second = _write(tmp_path / "two" / "a.prompt.md")
+        linked = tmp_path / "one" / "notes.md"
+        linked.write_text("notes\n", encoding="utf-8")
+        cache = ResultCache(tmp_path / "cache", get_all_rules())
+        cache.lookup(first)
+        cache.store(content_key(CONTENT), first, [_diagnostic()], [(str(linked), str(linked))])
+
+        assert cache.load(content_key(CONTENT), first) is not None
+        # notes.md does not exist next to the second copy
+        assert cache.load(content_key(CONTENT), second) is None
@@ -2,13 +2,22 @@
 
 from __future__ import annotations
 
+import json
+import shutil
 from pathlib import Path
 
+import pytest
 from click.testing import CliRunner
 
 from prompt_lint.cli import main
 
 
+@pytest.fixture(autouse=True)
+def _isolated_cwd(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    # Keep the default result cache directory out of the source tree
+    monkeypatch.chdir(tmp_path)
+
+
 class TestCli:
     def setup_method(self) -> None:
         self.runner = CliRunner()
@@ -52,8 +61,168 @@ class TestCli:
         # Should process multiple files
         assert "R001" in result.output or "R002" in result.output or "R005" in result.output
 
+    def test_jobs_do_not_change_output(self, fixtures_dir: Path) -> None:
+        serial = self.runner.invoke(main, ["lint", "--no-cache", "-j", "1", str(fixtures_dir)])
+        parallel = self.runner.invoke(main, ["lint", "--no-cache", "-j", "2", str(fixtures_dir)])
+        assert parallel.output == serial.output
+        assert parallel.exit_code == serial.exit_code == 1
+
+    def test_json_format(self, undefined_variable: Path) -> None:
+        result = self.runner.invoke(main, ["lint", "--format", "json", str(undefined_variable)])
+        assert result.exit_code == 1
+        records = json.loads(result.output)
+        assert {r["rule_id"] for r in records} == {"R002"}
+
+    def test_select_and_ignore(self, undefined_variable: Path) -> None:
+        selected = self.runner.invoke(main, ["lint", "--select", "R005", str(undefined_variable)])
+        assert selected.exit_code == 0
+        assert "R002" not in selected.output
+        ignored = self.runner.invoke(
+            main, ["lint", "--ignore", "R001,R002", str(undefined_variable)]
+        )
+        assert ignored.exit_code == 0
+
+    def test_unknown_selector_is_a_usage_error(self, valid_minimal: Path) -> None:
+        result = self.runner.invoke(main, ["lint", "--select", "Z9", str(valid_minimal)])
+        assert result.exit_code == 2
+        assert "Unknown rule selector: Z9" in result.output
+
     def test_lint_example_files(self) -> None:
         examples_dir = Path(__file__).parent.parent / "examples"
         if examples_dir.exists():
             result = self.runner.invoke(main, ["lint", str(examples_dir)])
             assert result.exit_code == 0
+
+
+class TestCliCache:
+    def setup_method(self) -> None:
+        self.runner = CliRunner()
+
+    def test_warm_run_matches_cold_run(self, undefined_variable: Path, tmp_path: Path) -> None:
+        cold = self.runner.invoke(main, ["lint", str(undefined_variable)])
+        assert (tmp_path / ".prompt-lint-cache").is_dir()
+        warm = self.runner.invoke(main, ["lint", str(undefined_variable)])
+        assert warm.output == cold.output
+        assert warm.exit_code == cold.exit_code == 1
+
+    def test_no_cache_writes_nothing(self, valid_minimal: Path, tmp_path: Path) -> None:
+        result = self.runner.invoke(main, ["lint", "--no-cache", str(valid_minimal)])
+        assert result.exit_code == 0
+        assert not (tmp_path / ".prompt-lint-cache").exists()
+
+    def test_cache_dir_option(self, valid_minimal: Path, tmp_path: Path) -> None:
+        cache_dir = tmp_path / "custom-cache"
+        result = self.runner.invoke(
+            main, ["lint", "--cache-dir", str(cache_dir), str(valid_minimal)]
+        )
+        assert result.exit_code == 0
+        assert cache_dir.is_dir()
+
+    def test_unusable_cache_dir_is_skipped(self, undefined_variable: Path, tmp_path: Path) -> None:
+        (tmp_path / "file").write_text("", encoding="utf-8")
+        args = ["lint", "--cache-dir", str(tmp_path / "file" / "cache"), str(undefined_variable)]
+        result = self.runner.invoke(main, args)
+        assert result.exit_code == 1
+        assert "Warning: Cannot use the result cache" in result.output
+        assert "R002" in result.output
+
+    def test_cache_dir_must_be_a_cache(self, valid_minimal: Path, tmp_path: Path) -> None:
+        (tmp_path / "src").mkdir()
+        result = self.runner.invoke(main, ["lint", "--cache-dir", ".", str(valid_minimal)])
+        assert result.exit_code == 2
+        assert "was not created by prompt-lint" in result.output
+        assert (tmp_path / "src").is_dir()
+
+    def test_link_target_changes_invalidate_cached_result(
+        self, valid_minimal: Path, tmp_path: Path
+    ) -> None:
+        target = tmp_path / "linked.prompt.md"
+        target.write_text(valid_minimal.read_text() + "\nSee [notes](notes.md).\n")
+        result = self.runner.invoke(main, ["lint", str(target)])
+        assert result.exit_code == 1
+        assert "R006" in result.output
+
+        (tmp_path / "notes.md").write_text("notes\n")
+        assert self.runner.invoke(main, ["lint", str(target)]).exit_code == 0
+        (tmp_path / "notes.md").unlink()
+        assert "R006" in self.runner.invoke(main, ["lint", str(target)]).output
+
+    def test_modified_file_is_relinted(self, valid_minimal: Path, tmp_path: Path) -> None:
+        target = tmp_path / "edited.prompt.md"
+        shutil.copy(valid_minimal, target)
+        assert self.runner.invoke(main, ["lint", str(target)]).exit_code == 0
+
+        target.write_text(target.read_text() + "\n3. Use {{missing}}\n")
+        result = self.runner.invoke(main, ["lint", str(target)])
+        assert result.exit_code == 1
+        assert "missing" in result.output
+
+
+class TestCliEarlyExit:
+    def setup_method(self) -> None:
+        self.runner = CliRunner()
+
+    def test_fail_fast_stops_at_the_first_file_with_errors(self, fixtures_dir: Path) -> None:
+        result = self.runner.invoke(main, ["lint", "--no-cache", "--fail-fast", str(fixtures_dir)])
+        assert result.exit_code == 1
+        assert "empty_section.prompt.md:13:1: R001" in result.stdout
+        assert "R005" not in result.stdout
+        assert "Stopped at the first file with errors" in result.stderr
+
+    def test_fail_fast_in_parallel(self, valid_minimal: Path, tmp_path: Path) -> None:
+        tree = tmp_path / "tree"
+        tree.mkdir()
+        for i in range(200):
+            shutil.copy(valid_minimal, tree / f"p{i:03}.prompt.md")
+        (tree / "p005.prompt.md").write_text("# Role\n")
+        result = self.runner.invoke(
+            main, ["lint", "--no-cache", "--fail-fast", "-j", "2", str(tree)]
+        )
+        assert result.exit_code == 1
+        assert {line.split(":")[0] for line in result.stdout.splitlines() if ": R" in line} == {
+            str(tree / "p005.prompt.md")
+        }
+
+    def test_fail_fast_without_errors_lints_everything(
+        self, unused_variable: Path, valid_minimal: Path
+    ) -> None:
+        result = self.runner.invoke(
+            main, ["lint", "--no-cache", "--fail-fast", str(unused_variable), str(valid_minimal)]
+        )
+        assert result.exit_code == 0
+        assert result.stdout.count("R003") == 2
+        assert result.stderr == ""
+
+    def test_max_diagnostics(self, fixtures_dir: Path) -> None:
+        result = self.runner.invoke(
+            main, ["lint", "--no-cache", "--max-diagnostics", "2", str(fixtures_dir)]
+        )
+        assert result.exit_code == 1
+        assert result.stdout.count(": R0") == 2
+        assert "Found 2 error(s)." in result.stdout
+        assert "Showing the first 2 diagnostic(s)." in result.stderr
+
+        result = self.runner.invoke(
+            main,
+            ["lint", "--no-cache", "--max-diagnostics", "3", "--format", "json", str(fixtures_dir)],
+        )
+        assert len(json.loads(result.stdout)) == 3
+
+    def test_max_diagnostics_keeps_an_accurate_exit_code(
+        self, unused_variable: Path, undefined_variable: Path
+    ) -> None:
+        # The error comes after the only diagnostic shown
+        args = ["lint", "--no-cache", "--max-diagnostics", "1"]
+        result = self.runner.invoke(main, [*args, str(unused_variable), str(undefined_variable)])
+        assert result.exit_code == 1
+        assert "R002" not in result.stdout
+        assert "Found 1 warning(s)." in result.stdout
+
+        result = self.runner.invoke(main, [*args, str(unused_variable)])
+        assert result.exit_code == 0
+
+        result = self.runner.invoke(
+            main, ["lint", "--no-cache", "--max-diagnostics", "0", str(undefined_variable)]
+        )
+        assert result.exit_code == 1
+        assert result.stdout == ""
@@ -0,0 +1,158 @@
+"""Tests for the lint daemon and its client."""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from prompt_lint import client
+from prompt_lint.daemon import Daemon
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="needs Unix sockets")
+
+DOC = """\
+---
+name: test
+description: Test prompt
+version: "1.0"
+---
+
+# Role
+You are a helper.
+
+# Input
+- `query`: string (required) - User query
+
+# Output
+- **answer**: The answer
+
+# Steps
+1. Read {{query}} and {{missing}}
+2. Generate **answer**
+"""
+
+
+@pytest.fixture
+def daemon(tmp_path: Path) -> Iterator[Daemon]:
+    server = Daemon(str(tmp_path / "run" / "d.sock"), idle_timeout=None)
+    assert server.bind()
+    thread = threading.Thread(target=server.serve)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.stop()
+        thread.join()
+        server.close()
+
+
+@pytest.fixture
+def prompt(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    path = tmp_path / "a.prompt.md"
+    path.write_text(DOC, encoding="utf-8")
+    monkeypatch.chdir(tmp_path)
+    return path
+
+
+class TestDaemon:
+    def test_runs_the_command_in_the_client_directory(
+        self, daemon: Daemon, prompt: Path, capfd: pytest.CaptureFixture[str]
+    ) -> None:
+        status = client.run(["lint", "--no-cache", prompt.name], daemon.path, autostart=False)
+        out, err = capfd.readouterr()
+        assert status == 1
+        assert out.startswith('a.prompt.md:17:23: R002 error: Variable "{{missing}}"')
+        assert "Found 1 error(s)." in out
+
+        status = client.run(["lint", "--select", "ZZ", prompt.name], daemon.path, autostart=False)
+        out, err = capfd.readouterr()
+        assert status == 2
+        assert "Unknown rule selector: ZZ" in err
+
+    def test_requests_reuse_the_process(
+        self, daemon: Daemon, prompt: Path, capfd: pytest.CaptureFixture[str]
+    ) -> None:
+        for _ in range(3):
+            assert client.run(["lint", prompt.name], daemon.path, autostart=False) == 1
+        out, _ = capfd.readouterr()
+        assert out.count("R002") == 3
+        # The result cache lives in the client's directory
+        assert (prompt.parent / ".prompt-lint-cache").is_dir()
+
+    def test_one_daemon_per_socket(self, daemon: Daemon) -> None:
+        second = Daemon(daemon.path)
+        assert not second.bind()
+        second.close()
+
+    def test_stop_request(self, tmp_path: Path) -> None:
+        server = Daemon(str(tmp_path / "d.sock"), idle_timeout=None)
+        assert server.bind()
+        thread = threading.Thread(target=server.serve)
+        thread.start()
+        assert client.stop(server.path)
+        thread.join(timeout=5)
+        assert not thread.is_alive()
+        server.close()
+        assert not os.path.exists(server.path)
+        assert not client.stop(server.path)
+
+
+class TestClient:
+    def test_wants_daemon(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.delenv(client.DAEMON_ENV, raising=False)
+        assert client.wants_daemon(["lint", "--daemon", "a.prompt.md"])
+        assert not client.wants_daemon(["lint", "a.prompt.md"])
+        assert not client.wants_daemon(["bench", "--daemon"])
+        assert not client.wants_daemon(["lint", "--", "--daemon"])
+        monkeypatch.setenv(client.DAEMON_ENV, "1")
+        assert client.wants_daemon(["lint", "a.prompt.md"])
+        assert not client.wants_daemon(["lint", "--no-daemon", "a.prompt.md"])
+
+    def test_unavailable_daemon_falls_back_in_process(
+        self,
+        tmp_path: Path,
+        prompt: Path,
+        monkeypatch: pytest.MonkeyPatch,
+        capfd: pytest.CaptureFixture[str],
+    ) -> None:
+        with pytest.raises(client.DaemonUnavailable):
+            client.run(["lint", prompt.name], str(tmp_path / "none.sock"), autostart=False)
+
+        monkeypatch.setenv(client.DAEMON_DIR_ENV, str(tmp_path / "run"))
+        monkeypatch.setattr(client, "start_daemon", lambda path: None)
+        monkeypatch.setattr(client, "STARTUP_TIMEOUT", 0.05)
+        monkeypatch.setattr(sys, "argv", ["prompt-lint", "lint", "--daemon", prompt.name])
+        with pytest.raises(SystemExit) as exc_info:
+            client.main()
+        assert exc_info.value.code == 1
+        assert "R002" in capfd.readouterr().out
+
+    def test_private_socket_directory(self, tmp_path: Path) -> None:
+        shared = tmp_path / "shared"
+        shared.mkdir(mode=0o777)
+        shared.chmod(0o777)
+        with pytest.raises(client.DaemonUnavailable, match="not a private directory"):
+            client.ensure_private_directory(str(shared))
+
+    def test_autostart(self, tmp_path: Path, prompt: Path) -> None:
+        env = {**os.environ, client.DAEMON_DIR_ENV: str(tmp_path / "run")}
+        command = [sys.executable, "-m", "prompt_lint"]
+        try:
+            result = subprocess.run(
+                [*command, "lint", "--daemon", "--no-cache", prompt.name],
+                env=env,
+                capture_output=True,
+                text=True,
+                timeout=30,
+            )
+            assert result.returncode == 1
+            assert "R002" in result.stdout
+            assert any(p.suffix == ".sock" for p in (tmp_path / "run").iterdir())
+        finally:
+            subprocess.run([*command, "daemon", "--stop"], env=env, timeout=30, check=False)
@@ -0,0 +1,131 @@
+"""Tests for prompt file discovery."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from prompt_lint.cli import main
+from prompt_lint.discovery import find_prompt_files, iter_prompt_files
+
+DOC = """\
+---
+name: test
+description: Test prompt
+version: "1.0"
+---
+
+# Role
+You are a helper.
+
+# Input
+- `query`: string (required) - User query
+
+# Output
+- **answer**: The answer
+
+# Steps
+1. Read {{query}}
+2. Generate **answer**
+"""
+
+
+def touch(path: Path, content: str = DOC) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def tree(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    for name in (
+        "b.prompt.md",
+        "b/a.prompt.md",
+        "a.prompt.md",
+        "notes.md",
+        "docs/generated/x.prompt.md",
+        ".github/prompts/gh.prompt.md",
+        ".git/hooks/h.prompt.md",
+        "node_modules/pkg/n.prompt.md",
+        "venv/lib/v.prompt.md",
+    ):
+        touch(tmp_path / name)
+    touch(tmp_path / "venv" / "pyvenv.cfg", "home = /usr\n")
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+class TestDiscovery:
+    def test_walk_prunes_tool_directories_and_sorts_by_path(self, tree: Path) -> None:
+        found = find_prompt_files(["."])
+        expected = [
+            "./.github/prompts/gh.prompt.md",
+            "./a.prompt.md",
+            "./b.prompt.md",
+            "./b/a.prompt.md",
+            "./docs/generated/x.prompt.md",
+        ]
+        assert found == expected
+        assert found == sorted(found)
+
+    def test_order_matches_sorted_rglob(self, tree: Path) -> None:
+        for name in ("b-x/c.prompt.md", "b.x/d.prompt.md", "B/e.prompt.md", "b0.prompt.md"):
+            touch(tree / name)
+        pruned = (".git", "node_modules", "venv")
+        expected = sorted(
+            str(p) for p in Path(".").rglob("*.prompt.md") if p.parts[0] not in pruned
+        )
+        assert find_prompt_files(["."]) == [os.path.join(".", p) for p in expected]
+
+    def test_explicit_virtualenv_is_searched(self, tree: Path) -> None:
+        assert find_prompt_files(["venv"]) == ["venv/lib/v.prompt.md"]
+
+    def test_exclude_globs(self, tree: Path) -> None:
+        assert find_prompt_files(["."], exclude=["docs/generated", "b"]) == [
+            "./.github/prompts/gh.prompt.md",
+            "./a.prompt.md",
+            "./b.prompt.md",
+        ]
+        assert find_prompt_files(["."], exclude=["*.prompt.md"]) == []
+        # Files given explicitly are always linted
+        assert find_prompt_files(["a.prompt.md"], exclude=["*.prompt.md"]) == ["a.prompt.md"]
+
+    def test_gitignore(self, tree: Path) -> None:
+        (tree / ".git" / "info").mkdir(parents=True)
+        touch(tree / ".gitignore", "docs/\n/b.prompt.md\n*.prompt.md\n!a.prompt.md\n")
+        touch(tree / "b" / ".gitignore", "!*.prompt.md\n")
+        assert find_prompt_files(["."], gitignore=True) == ["./a.prompt.md", "./b/a.prompt.md"]
+        # .gitignore files above the given directory apply too
+        assert find_prompt_files(["docs"], gitignore=True) == []
+        assert find_prompt_files(["docs"]) == ["docs/generated/x.prompt.md"]
+
+    def test_duplicates_are_yielded_once(self, tree: Path) -> None:
+        found = find_prompt_files(["b/a.prompt.md", ".", "b"])
+        assert found[0] == "b/a.prompt.md"
+        assert len(found) == 5
+        assert len({os.path.realpath(p) for p in found}) == 5
+
+    @pytest.mark.skipif(not hasattr(os, "symlink"), reason="needs symlinks")
+    def test_symlink_loops_terminate(self, tree: Path) -> None:
+        os.symlink(tree / "b", tree / "b" / "loop")
+        os.symlink(tree / "a.prompt.md", tree / "b" / "alias.prompt.md")
+        found = find_prompt_files(["b"])
+        assert found == ["b/a.prompt.md", "b/alias.prompt.md"]
+        assert find_prompt_files(["."]).count("./b/alias.prompt.md") == 0
+
+    def test_is_lazy(self, tree: Path) -> None:
+        files = iter_prompt_files(["."])
+        assert next(files) == "./.github/prompts/gh.prompt.md"
+
+
+class TestCliDiscovery:
+    def test_lint_exclude(self, tree: Path) -> None:
+        touch(tree / "docs" / "generated" / "x.prompt.md", "# Role\n")
+        runner = CliRunner()
+        result = runner.invoke(main, ["lint", "--no-cache", "."])
+        assert result.exit_code == 1
+        result = runner.invoke(main, ["lint", "--no-cache", "--exclude", "generated", "."])
+        assert result.exit_code == 0, result.output
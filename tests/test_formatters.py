@@ -0,0 +1,125 @@
+"""Tests for output formatters."""
+
+from __future__ import annotations
+
+import json
+
+from prompt_lint.formatters import (
+    JsonFormatter,
+    JsonLinesFormatter,
+    SarifFormatter,
+    TextFormatter,
+    format_text,
+)
+from prompt_lint.models import Diagnostic, Position, Severity
+from prompt_lint.rules import get_all_rules
+from prompt_lint.runner import LintResult
+
+
+def _result(path: str = "a.prompt.md") -> LintResult:
+    return LintResult(
+        path,
+        [
+            Diagnostic(
+                rule_id="R002",
+                severity=Severity.ERROR,
+                message='Variable "{{x}}" is used in Steps but not defined in Input',
+                position=Position(line=4, column=7),
+                path=path,
+            ),
+            Diagnostic(
+                rule_id="R003",
+                severity=Severity.WARNING,
+                message='Variable "y" is defined in Input but never referenced',
+                position=Position(line=2, column=3),
+                path=path,
+            ),
+        ],
+    )
+
+
+class _Collector:
+    def __init__(self) -> None:
+        self.out: list[str] = []
+        self.err: list[str] = []
+
+
+def _run(formatter_cls: type, results: list[LintResult]) -> _Collector:
+    collected = _Collector()
+    formatter = formatter_cls(collected.out.append, collected.err.append, get_all_rules())
+    for result in results:
+        formatter.file(result)
+    formatter.finish(1, 1)
+    return collected
+
+
+class TestTextFormatter:
+    def test_format_text(self) -> None:
+        diag = _result().diagnostics[0]
+        assert format_text(diag).startswith("a.prompt.md:4:7: R002 error: ")
+
+    def test_parse_error_goes_to_stderr(self) -> None:
+        collected = _run(TextFormatter, [LintResult("b.prompt.md", error="Failed to parse: x")])
+        assert collected.err == ["b.prompt.md: Failed to parse: x"]
+        assert collected.out[-1] == "Found 1 error(s), 1 warning(s)."
+
+
+class TestJsonLinesFormatter:
+    def test_one_object_per_diagnostic(self) -> None:
+        collected = _run(JsonLinesFormatter, [_result()])
+        lines = "\n".join(collected.out).splitlines()
+        records = [json.loads(line) for line in lines]
+        assert [r["rule_id"] for r in records] == ["R002", "R003"]
+        assert records[0] == {
+            "path": "a.prompt.md",
+            "line": 4,
+            "column": 7,
+            "rule_id": "R002",
+            "severity": "error",
+            "message": 'Variable "{{x}}" is used in Steps but not defined in Input',
+        }
+
+    def test_written_per_file(self) -> None:
+        collected = _Collector()
+        formatter = JsonLinesFormatter(collected.out.append, collected.err.append, [])
+        formatter.file(_result())
+        assert collected.out  # available before finish()
+
+    def test_parse_error_record(self) -> None:
+        collected = _run(JsonLinesFormatter, [LintResult("b.prompt.md", error="boom")])
+        record = json.loads(collected.out[0])
+        assert record["rule_id"] is None
+        assert record["message"] == "boom"
+
+
+class TestJsonFormatter:
+    def test_single_array(self) -> None:
+        collected = _run(JsonFormatter, [_result("a.prompt.md"), _result("b.prompt.md")])
+        assert len(collected.out) == 1
+        records = json.loads(collected.out[0])
+        assert [r["path"] for r in records] == ["a.prompt.md"] * 2 + ["b.prompt.md"] * 2
+
+
+class TestSarifFormatter:
+    def test_log_structure(self) -> None:
+        collected = _run(SarifFormatter, [_result()])
+        log = json.loads(collected.out[0])
+        assert log["version"] == "2.1.0"
+        run = log["runs"][0]
+        rules = run["tool"]["driver"]["rules"]
+        assert [r["id"] for r in rules] == [r.rule_id for r in get_all_rules()]
+        first = run["results"][0]
+        assert first["ruleId"] == "R002"
+        assert rules[first["ruleIndex"]]["id"] == "R002"
+        assert first["level"] == "error"
+        region = first["locations"][0]["physicalLocation"]["region"]
+        assert region == {"startLine": 4, "startColumn": 7}
+        assert run["results"][1]["level"] == "warning"
+
+    def test_parse_error_is_a_notification(self) -> None:
+        collected = _run(SarifFormatter, [LintResult("b.prompt.md", error="boom")])
+        run = json.loads(collected.out[0])["runs"][0]
+        invocation = run["invocations"][0]
+        assert invocation["executionSuccessful"] is False
+        assert invocation["toolExecutionNotifications"][0]["message"]["text"] == "boom"
+        assert run["results"] == []
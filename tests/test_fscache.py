@@ -0,0 +1,65 @@
+"""Tests for the per-run directory listing cache."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from prompt_lint import fscache
+from prompt_lint.fscache import FileSystemCache
+
+
+class TestFileSystemCache:
+    def test_resolve(self, tmp_path: Path) -> None:
+        (tmp_path / "Sub").mkdir()
+        (tmp_path / "Sub" / "File.md").write_text("", encoding="utf-8")
+        fs = FileSystemCache()
+        exact = str(tmp_path / "Sub" / "File.md")
+        assert fs.resolve(exact) == exact
+        assert fs.resolve(str(tmp_path / "sub" / "file.md")) == exact
+        assert fs.resolve(str(tmp_path / "Sub" / "Other.md")) is None
+        assert fs.resolve(str(tmp_path / "Sub" / "File.md" / "x")) is None
+        assert fs.exists(str(tmp_path / "Sub" / ".." / "Sub"))
+        assert not fs.exists(str(tmp_path / "sub"))
+
+    def test_listings_are_reused_until_invalidated(self, tmp_path: Path) -> None:
+        fs = FileSystemCache()
+        target = tmp_path / "new.md"
+        assert not fs.exists(str(target))
+        target.write_text("", encoding="utf-8")
+        assert not fs.exists(str(target))
+
+        fs.invalidate(str(target))
+        assert fs.exists(str(target))
+        assert fs.listdir(str(tmp_path)) == frozenset({"new.md"})
+
+    def test_invalidating_a_directory_drops_lookups_below_it(self, tmp_path: Path) -> None:
+        fs = FileSystemCache()
+        nested = tmp_path / "a" / "b.md"
+        assert fs.resolve(str(nested)) is None
+        nested.parent.mkdir()
+        nested.write_text("", encoding="utf-8")
+        fs.invalidate(str(nested.parent))
+        assert fs.exists(str(nested))
+
+    def test_recording(self, tmp_path: Path) -> None:
+        fs = FileSystemCache()
+        with fs.recording() as recorded:
+            fs.resolve(str(tmp_path / "x" / ".." / "missing.md"))
+            fs.resolve(str(tmp_path))
+        fs.resolve(str(tmp_path / "later.md"))
+        assert recorded == [
+            (os.path.join(str(tmp_path), "missing.md"), None),
+            (str(tmp_path), str(tmp_path)),
+        ]
+
+
+class TestSession:
+    def test_nested_sessions_share_the_cache(self) -> None:
+        assert fscache.active is None
+        with fscache.session() as outer:
+            with fscache.session() as inner:
+                assert inner is outer
+            assert fscache.current() is outer
+        assert fscache.active is None
+        assert fscache.current() is not fscache.current()
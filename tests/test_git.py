@@ -0,0 +1,218 @@
+"""Tests for linting files changed in git."""
+
+from __future__ import annotations
+
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from prompt_lint.cli import main
+from prompt_lint.git import ChangeSet, GitError, _read_staged, collect_changes
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+
+DOC = """\
+---
+name: test
+description: Test prompt
+version: "1.0"
+---
+
+# Role
+You are a helper.
+
+# Input
+- `query`: string (required) - User query
+
+# Output
+- **answer**: The answer
+
+# Steps
+1. Read {{query}}
+2. Generate **answer**
+"""
+
+
+def git(repo: Path, *args: str) -> None:
+    subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True)
+
+
+def commit(repo: Path, message: str) -> None:
+    git(repo, "add", "-A")
+    git(repo, "commit", "-q", "-m", message)
+
+
+@pytest.fixture
+def repo(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    git(tmp_path, "init", "-q", "-b", "main")
+    git(tmp_path, "config", "user.email", "dev@example.com")
+    git(tmp_path, "config", "user.name", "Dev")
+    (tmp_path / "prompts").mkdir()
+    for name in ("a", "b", "c"):
+        (tmp_path / "prompts" / f"{name}.prompt.md").write_text(DOC, encoding="utf-8")
+    (tmp_path / "README.md").write_text("readme\n", encoding="utf-8")
+    commit(tmp_path, "initial")
+    git(tmp_path, "checkout", "-q", "-b", "feature")
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+class TestCollectChanges:
+    def test_modified_and_untracked_prompts(self, repo: Path) -> None:
+        (repo / "prompts" / "a.prompt.md").write_text(DOC + "\n", encoding="utf-8")
+        (repo / "prompts" / "b.prompt.md").unlink()
+        (repo / "prompts" / "new.prompt.md").write_text(DOC, encoding="utf-8")
+        (repo / "README.md").write_text("changed\n", encoding="utf-8")
+        changes = collect_changes(["."], "main")
+        assert changes.files == ["prompts/a.prompt.md", "prompts/new.prompt.md"]
+        assert changes.contents is None
+
+    def test_changes_are_measured_from_the_merge_base(self, repo: Path) -> None:
+        (repo / "prompts" / "a.prompt.md").write_text(DOC + "\n", encoding="utf-8")
+        commit(repo, "feature work")
+        git(repo, "checkout", "-q", "main")
+        (repo / "prompts" / "c.prompt.md").write_text(DOC + "\n\n", encoding="utf-8")
+        commit(repo, "main moves on")
+        git(repo, "checkout", "-q", "feature")
+        assert collect_changes(["."], "main").files == ["prompts/a.prompt.md"]
+
+    def test_targets_limit_the_files(self, repo: Path) -> None:
+        for name in ("a", "b"):
+            (repo / "prompts" / f"{name}.prompt.md").write_text(DOC + "\n", encoding="utf-8")
+        assert collect_changes(["prompts/b.prompt.md"], "main").files == ["prompts/b.prompt.md"]
+        assert collect_changes(["README.md"], "main").files == []
+
+    def test_changed_lines(self, repo: Path) -> None:
+        lines = DOC.split("\n")
+        lines[7] = "You are a careful helper."
+        lines.insert(17, "2. Check {{query}} again")
+        (repo / "prompts" / "a.prompt.md").write_text("\n".join(lines), encoding="utf-8")
+        (repo / "prompts" / "new.prompt.md").write_text(DOC, encoding="utf-8")
+        changes = collect_changes(["prompts"], "main", lines=True)
+        assert changes.lines == {
+            "prompts/a.prompt.md": [(8, 8), (18, 18)],
+            "prompts/new.prompt.md": None,
+        }
+        assert changes.in_changed_lines("prompts/a.prompt.md", 18)
+        assert not changes.in_changed_lines("prompts/a.prompt.md", 9)
+        assert changes.in_changed_lines("prompts/new.prompt.md", 1)
+
+    def test_names_with_spaces(self, repo: Path) -> None:
+        path = repo / "prompts" / "my file.prompt.md"
+        path.write_text(DOC, encoding="utf-8")
+        commit(repo, "spaces")
+        path.write_text(DOC + "added\n", encoding="utf-8")
+        changes = collect_changes(["prompts"], "HEAD", lines=True)
+        assert changes.lines == {"prompts/my file.prompt.md": [(19, 19)]}
+        git(repo, "add", str(path))
+        names = ["prompts/my file.prompt.md", "prompts/gone file.prompt.md"]
+        assert _read_staged(names, str(repo)) == {names[0]: DOC + "added\n"}
+
+    def test_staged_content_comes_from_the_index(self, repo: Path) -> None:
+        path = repo / "prompts" / "a.prompt.md"
+        path.write_text(DOC + "staged\n", encoding="utf-8")
+        git(repo, "add", str(path))
+        path.write_text(DOC + "not staged\n", encoding="utf-8")
+        (repo / "prompts" / "untracked.prompt.md").write_text(DOC, encoding="utf-8")
+        changes = collect_changes(["."], staged=True, lines=True)
+        assert changes.files == ["prompts/a.prompt.md"]
+        assert changes.contents == {"prompts/a.prompt.md": DOC + "staged\n"}
+        assert changes.lines == {"prompts/a.prompt.md": [(19, 19)]}
+
+    def test_unknown_revision(self, repo: Path) -> None:
+        with pytest.raises(GitError, match="Unknown revision: nope"):
+            collect_changes(["."], "nope")
+
+    def test_in_changed_lines_outside_the_change_set(self) -> None:
+        assert not ChangeSet(files=["a"]).in_changed_lines("a", 1)
+
+
+class TestCliChangedFiles:
+    def setup_method(self) -> None:
+        self.runner = CliRunner()
+
+    def test_changed_since_lints_only_changed_files(self, repo: Path) -> None:
+        undefined = DOC.replace("1. Read {{query}}", "1. Read {{query}} and {{other}}")
+        (repo / "prompts" / "a.prompt.md").write_text(undefined, encoding="utf-8")
+        (repo / "prompts" / "c.prompt.md").write_text(undefined, encoding="utf-8")
+        commit(repo, "both broken")
+        (repo / "prompts" / "a.prompt.md").write_text(undefined + "\n", encoding="utf-8")
+
+        result = self.runner.invoke(main, ["lint", "--no-cache", "--changed-since", "HEAD"])
+        assert result.exit_code == 1
+        assert "prompts/a.prompt.md:17" in result.output
+        assert "c.prompt.md" not in result.output
+
+        # The broken line was committed earlier, not changed since HEAD
+        result = self.runner.invoke(
+            main, ["lint", "--no-cache", "--changed-since", "HEAD", "--diff-lines-only"]
+        )
+        assert result.exit_code == 0
+        assert "R002" not in result.output
+
+    def test_diff_lines_only_with_a_space_in_the_name(self, repo: Path) -> None:
+        path = repo / "prompts" / "my file.prompt.md"
+        path.write_text(DOC, encoding="utf-8")
+        commit(repo, "spaces")
+        path.write_text(DOC + "\n# Constraints\nUse {{other}}\n", encoding="utf-8")
+        result = self.runner.invoke(
+            main, ["lint", "--no-cache", "--changed-since", "HEAD", "--diff-lines-only"]
+        )
+        assert result.exit_code == 1
+        assert "prompts/my file.prompt.md:21" in result.output
+
+    def test_staged(self, repo: Path) -> None:
+        path = repo / "prompts" / "a.prompt.md"
+        path.write_text(DOC.replace("1. Read {{query}}", "1. Read {{missing}}"), encoding="utf-8")
+        git(repo, "add", str(path))
+        path.write_text(DOC, encoding="utf-8")
+        result = self.runner.invoke(main, ["lint", "--staged", "prompts"])
+        assert result.exit_code == 1
+        assert 'Variable "{{missing}}"' in result.output
+
+    def test_staged_file_that_is_not_utf8(self, repo: Path) -> None:
+        path = repo / "prompts" / "a.prompt.md"
+        path.write_bytes(DOC.encode("utf-8") + b"\xff\n")
+        git(repo, "add", str(path))
+        result = self.runner.invoke(main, ["lint", "--staged"])
+        assert result.exit_code == 1
+        assert "Failed to parse: 'utf-8' codec can't decode" in result.output
+
+    def test_exclude_and_gitignore_apply_to_changed_files(self, repo: Path) -> None:
+        broken = DOC.replace("1. Read {{query}}", "1. Read {{missing}}")
+        (repo / "prompts" / "drafts").mkdir()
+        (repo / "prompts" / "drafts" / "d.prompt.md").write_text(broken, encoding="utf-8")
+        (repo / "prompts" / "a.prompt.md").write_text(broken, encoding="utf-8")
+        args = ["lint", "--no-cache", "--changed-since", "HEAD"]
+
+        result = self.runner.invoke(main, [*args, "--exclude", "drafts", "--exclude", "a.*"])
+        assert result.exit_code == 0, result.output
+        result = self.runner.invoke(main, [*args, "--exclude", "prompts/drafts", "."])
+        assert "drafts" not in result.output
+        assert "prompts/a.prompt.md" in result.output
+        # Patterns with a slash are relative to the directory given
+        result = self.runner.invoke(main, [*args, "--exclude", "drafts/*", "prompts"])
+        assert "drafts" not in result.output
+        # Files given explicitly are always linted
+        result = self.runner.invoke(main, [*args, "--exclude", "a.*", "prompts/a.prompt.md"])
+        assert result.exit_code == 1
+
+        # A file that is tracked but matches .gitignore still shows up in the diff
+        git(repo, "add", "prompts/a.prompt.md")
+        (repo / ".gitignore").write_text("a.prompt.md\n", encoding="utf-8")
+        result = self.runner.invoke(main, [*args, "--respect-gitignore", "prompts"])
+        assert "prompts/a.prompt.md" not in result.output
+        assert "drafts/d.prompt.md" in result.output
+
+    def test_usage_errors(self, repo: Path) -> None:
+        result = self.runner.invoke(main, ["lint"])
+        assert result.exit_code == 2
+        assert "Missing argument" in result.output
+        result = self.runner.invoke(main, ["lint", "--diff-lines-only", "prompts"])
+        assert result.exit_code == 2
+        result = self.runner.invoke(main, ["lint", "--changed-since", "nope"])
+        assert result.exit_code == 2
+        assert "Unknown revision: nope" in result.output
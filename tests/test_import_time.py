@@ -0,0 +1,86 @@
+"""Imports of the entry points, listed with ``python -X importtime``.
+
+The modules they must not import are checked on every run. Wall-clock
+budgets depend on the machine: by default only a loose multiple of each is
+enforced, to catch gross regressions on slow runners too, and the budgets
+themselves with ``PROMPT_LINT_IMPORT_BUDGET=1`` in the environment.
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+# Cumulative import time allowed per module, in milliseconds: about twice what
+# they take on a development machine, so only real regressions fail
+BUDGETS_MS = {
+    "prompt_lint.client": 50,
+    "prompt_lint.cli": 300,
+}
+# Allowance for shared or slow machines unless PROMPT_LINT_IMPORT_BUDGET is set
+LOOSE_FACTOR = 1 if os.environ.get("PROMPT_LINT_IMPORT_BUDGET") else 5
+
+# Modules only imported on the code paths that need them
+DEFERRED = {
+    "prompt_lint.client": {
+        "click",
+        "typing",
+        "yaml",
+        "concurrent.futures",
+        "pygls",
+        "prompt_lint.cli",
+        "prompt_lint.models",
+    },
+    "prompt_lint.cli": {
+        "yaml",
+        "pygls",
+        "importlib.metadata",
+        "concurrent.futures",
+        "subprocess",
+        "prompt_lint.cache",
+        "prompt_lint.bench.harness",
+        "prompt_lint.parser",
+        "prompt_lint.runner",
+        "prompt_lint.validator",
+        "prompt_lint.git",
+        "prompt_lint.bench.corpus",
+    },
+}
+
+
+def import_times(module: str) -> dict[str, int]:
+    """Cumulative import time in microseconds of each module imported by ``module``."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+class TestImportTime:
+    @pytest.mark.parametrize("module", sorted(DEFERRED))
+    def test_heavy_modules_are_deferred(self, module: str) -> None:
+        assert not DEFERRED[module] & import_times(module).keys()
+
+    @pytest.mark.parametrize("module", sorted(BUDGETS_MS))
+    def test_budget(self, module: str) -> None:
+        # Best of three, against noise from other processes
+        best = min(import_times(module)[module] for _ in range(3)) / 1000
+        budget = BUDGETS_MS[module] * LOOSE_FACTOR
+        assert best <= budget, f"{module} took {best:.1f} ms to import, over {budget} ms"
+
+    def test_lsp_server_defers_rule_discovery(self) -> None:
+        pytest.importorskip("pygls")
+        imported = import_times("prompt_lint.lsp.server")
+        assert not {"yaml", "importlib.metadata"} & imported.keys()
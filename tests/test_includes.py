@@ -0,0 +1,220 @@
+"""Tests for include directives, the include cache and the dependency graph."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+
+import prompt_lint.parser as parser_module
+from prompt_lint import includes
+from prompt_lint.cache import ResultCache
+from prompt_lint.includes import DependencyGraph, IncludeCache
+from prompt_lint.models import SectionKind
+from prompt_lint.parser import parse, reparse, resolve_includes
+from prompt_lint.rules import get_all_rules
+from prompt_lint.runner import lint_source, run_lint
+
+DOC = """\
+---
+name: test
+description: Test prompt
+version: "1.0"
+---
+
+# Role
+You are a helper.
+<!-- include: shared/io.md -->
+
+# Steps
+1. Read {{query}} in a {{tone}} tone
+2. Generate **answer**
+"""
+
+SHARED = """\
+# Input
+- `query`: string (required) - User query
+- `tone`: string (optional) - Tone of the answer
+
+# Output
+- **answer**: The answer
+"""
+
+
+@pytest.fixture
+def tree(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    (tmp_path / "shared").mkdir()
+    (tmp_path / "shared" / "io.md").write_text(SHARED, encoding="utf-8")
+    (tmp_path / "a.prompt.md").write_text(DOC, encoding="utf-8")
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def lint(path: Path) -> list[str]:
+    result = lint_source(path.read_text(encoding="utf-8"), str(path), get_all_rules())
+    assert result.error is None
+    return [
+        f"{d.position.line}:{d.position.column}: {d.rule_id} {d.message}"
+        for d in result.diagnostics
+    ]
+
+
+class TestParseIncludes:
+    def test_included_sections_count_as_the_documents(self, tree: Path) -> None:
+        doc = parse(DOC, str(tree / "a.prompt.md"))
+        assert [s.raw_heading for s in doc.sections] == ["Role", "Steps"]
+        assert [s.raw_heading for s in doc.all_sections] == ["Role", "Input", "Output", "Steps"]
+        assert set(doc.variables_by_name) == {"query", "tone"}
+        assert doc.output_field_names == {"answer"}
+        section = doc.get_section(SectionKind.INPUT)
+        assert section is not None and "`tone`" in section.content
+        assert doc.included_paths == [str(tree / "shared" / "io.md")]
+        assert lint(tree / "a.prompt.md") == []
+
+    def test_included_facts_are_reported_at_the_directive(self, tree: Path) -> None:
+        (tree / "shared" / "io.md").write_text(
+            SHARED + "\n# Constraints\nMention {{missing}}\n", encoding="utf-8"
+        )
+        assert lint(tree / "a.prompt.md") == [
+            '9:15: R002 Variable "{{missing}}" is used in Constraints but not defined in Input'
+        ]
+
+    def test_own_input_variables_are_kept(self, tree: Path) -> None:
+        (tree / "shared" / "io.md").write_text(
+            "# Input\n- `tone`: string (optional) - Tone\n", encoding="utf-8"
+        )
+        content = DOC.replace(
+            "# Steps",
+            "# Input\n- `query`: string (required) - Q\n\n# Output\n- **answer**: A\n\n# Steps",
+        )
+        (tree / "a.prompt.md").write_text(content, encoding="utf-8")
+        assert lint(tree / "a.prompt.md") == []
+
+    def test_nested_includes_and_their_links(self, tree: Path) -> None:
+        (tree / "shared" / "io.md").write_text(
+            SHARED + "<!-- include: more/rules.md -->\n", encoding="utf-8"
+        )
+        (tree / "shared" / "more").mkdir()
+        (tree / "shared" / "more" / "rules.md").write_text(
+            "# Constraints\nSee [style](style.md) and [gone](gone.md)\n", encoding="utf-8"
+        )
+        (tree / "shared" / "more" / "style.md").write_text("style\n", encoding="utf-8")
+        doc = parse(DOC, str(tree / "a.prompt.md"))
+        assert [s.raw_heading for s in doc.all_sections][-2:] == ["Constraints", "Steps"]
+        assert doc.included_paths == [
+            str(tree / "shared" / "io.md"),
+            str(tree / "shared" / "more" / "rules.md"),
+        ]
+        # Links resolve relative to the file they are written in
+        assert lint(tree / "a.prompt.md") == [
+            '9:15: R006 File link "gone.md" does not resolve to an existing file'
+        ]
+
+    def test_missing_file_and_cycles(self, tree: Path) -> None:
+        (tree / "shared" / "io.md").write_text(
+            SHARED + "<!-- include: ../a.prompt.md -->\n", encoding="utf-8"
+        )
+        (tree / "b.prompt.md").write_text(
+            DOC.replace("shared/io.md", "nowhere.md"), encoding="utf-8"
+        )
+        [message] = lint(tree / "a.prompt.md")
+        assert message == (
+            '9:15: R007 In "shared/io.md": '
+            "Include cycle: a.prompt.md -> shared/io.md -> a.prompt.md"
+        )
+        messages = lint(tree / "b.prompt.md")
+        assert '9:15: R007 Cannot include "nowhere.md": No such file or directory' in messages
+
+    def test_directives_in_code_blocks_are_ignored(self, tree: Path) -> None:
+        content = DOC.replace(
+            "<!-- include: shared/io.md -->", "```\n<!-- include: shared/io.md -->\n```"
+        )
+        assert parse(content, str(tree / "a.prompt.md")).includes == []
+
+    def test_reparse_keeps_includes(self, tree: Path) -> None:
+        doc = parse(DOC, str(tree / "a.prompt.md"))
+        edited = DOC.replace("1. Read", "0. Start\n1. Read")
+        # Line 13 (0-based 12) of the old text, one line added
+        updated = reparse(doc, edited, 12, 12, 1)
+        assert updated.sections[0] is not doc.sections[0]
+        assert set(updated.variables_by_name) == {"query", "tone"}
+        assert updated.includes[0].include.position.line == 9
+
+    def test_resolve_includes_after_a_change(self, tree: Path) -> None:
+        with includes.session() as cache:
+            doc = parse(DOC, str(tree / "a.prompt.md"))
+            (tree / "shared" / "io.md").write_text(
+                "# Input\n- `query`: string (required) - Q\n", encoding="utf-8"
+            )
+            assert "tone" in resolve_includes(doc).variables_by_name
+            cache.invalidate(str(tree / "shared" / "io.md"))
+            refreshed = resolve_includes(doc)
+        assert "tone" not in refreshed.variables_by_name
+        assert refreshed.sections is doc.sections
+
+
+class TestIncludeCache:
+    def test_each_file_is_parsed_once_per_run(
+        self, tree: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        for i in range(1, 20):
+            (tree / f"p{i}.prompt.md").write_text(DOC.replace("helper", f"helper {i}"), "utf-8")
+        parsed: list[str] = []
+        parse_include = parser_module.parse_include
+
+        def counting_parse_include(content: str, path: str) -> object:
+            parsed.append(path)
+            return parse_include(content, path)
+
+        monkeypatch.setattr(parser_module, "parse_include", counting_parse_include)
+        results = list(run_lint(sorted(map(str, tree.glob("*.prompt.md"))), get_all_rules()))
+        assert len(results) == 20
+        assert all(not r.diagnostics and r.error is None for r in results)
+        assert parsed == [str(tree / "shared" / "io.md")]
+
+    def test_keys_and_invalidation(self, tree: Path) -> None:
+        cache = IncludeCache()
+        path = str(tree / "shared" / "io.md")
+        key = cache.key(path)
+        assert key is not None
+        assert cache.load(path) is cache.load(path)
+        (tree / "shared" / "io.md").write_text("# Input\n", encoding="utf-8")
+        assert cache.key(path) == key
+        cache.invalidate(os.path.relpath(path))
+        assert cache.key(path) not in (key, None)
+        assert cache.key(str(tree / "gone.md")) is None
+        with pytest.raises(FileNotFoundError):
+            cache.load(str(tree / "gone.md"))
+
+    def test_result_cache_checks_included_files(self, tree: Path) -> None:
+        target = str(tree / "a.prompt.md")
+        directory = tree / ".cache"
+        cache = ResultCache(directory, get_all_rules())
+        [result] = run_lint([target], get_all_rules(), cache=cache)
+        shared = str(tree / "shared" / "io.md")
+        assert result.includes == [(shared, IncludeCache().key(shared))]
+        cache.save()
+
+        with includes.session(IncludeCache()):
+            assert ResultCache(directory, get_all_rules()).lookup(target) == []
+        (tree / "shared" / "io.md").write_text("# Input\n", encoding="utf-8")
+        with includes.session(IncludeCache()):
+            reloaded = ResultCache(directory, get_all_rules())
+            assert reloaded.lookup(target) is None
+        [result] = run_lint([target], get_all_rules(), cache=reloaded)
+        assert {d.rule_id for d in result.diagnostics} == {"R001", "R002"}
+
+
+class TestDependencyGraph:
+    def test_dependents(self) -> None:
+        graph = DependencyGraph()
+        graph.update("a", ["x", "y"])
+        graph.update("b", ["y"])
+        assert graph.dependents("y") == {"a", "b"}
+        assert graph.includes("a") == {"x", "y"}
+        graph.update("a", ["x"])
+        assert graph.dependents("y") == {"b"}
+        graph.discard("b")
+        assert graph.dependents("y") == set()
+        assert graph.dependents("x") == {"a"}
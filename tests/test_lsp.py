@@ -4,7 +4,12 @@ from __future__ import annotations
 
 from lsprotocol import types
 
-from prompt_lint.lsp.server import build_diagnostics, compute_hover, compute_completions
+from prompt_lint.lsp.server import (
+    build_diagnostics,
+    compute_completions,
+    compute_hover,
+    edited_line_range,
+)
 
 
 VALID_DOC = """\
@@ -163,3 +168,37 @@ class TestComputeCompletions:
         for item in items:
             assert item.detail is not None
             assert item.kind == types.CompletionItemKind.Variable
+
+
+def _change(
+    start: tuple[int, int], end: tuple[int, int], text: str
+) -> types.TextDocumentContentChangePartial:
+    return types.TextDocumentContentChangePartial(
+        range=types.Range(
+            start=types.Position(line=start[0], character=start[1]),
+            end=types.Position(line=end[0], character=end[1]),
+        ),
+        text=text,
+    )
+
+
+class TestEditedLineRange:
+    def test_single_line_edit(self) -> None:
+        assert edited_line_range([_change((16, 3), (16, 7), "Use")]) == (16, 16, 0)
+
+    def test_inserted_newlines(self) -> None:
+        assert edited_line_range([_change((5, 0), (5, 0), "a\nb\n")]) == (5, 5, 2)
+
+    def test_deleted_lines(self) -> None:
+        assert edited_line_range([_change((5, 0), (8, 0), "")]) == (5, 8, -3)
+
+    def test_multiple_changes_are_merged(self) -> None:
+        changes = [
+            _change((10, 0), (10, 0), "x\n"),
+            _change((2, 0), (2, 1), "y"),
+        ]
+        # Range is reported in coordinates before both edits
+        assert edited_line_range(changes) == (2, 10, 1)
+
+    def test_full_change_returns_none(self) -> None:
+        assert edited_line_range([types.TextDocumentContentChangeWholeDocument(text="x")]) is None
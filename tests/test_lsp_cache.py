@@ -0,0 +1,202 @@
+"""Tests for the LSP document cache."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from lsprotocol import types
+
+import prompt_lint.lsp.cache as cache_module
+from prompt_lint import fscache, includes
+from prompt_lint.lsp import server
+from prompt_lint.lsp.cache import DocumentCache
+from prompt_lint.parser import parse
+from prompt_lint.rules import get_all_rules
+
+DOC = """\
+---
+name: test
+description: Test prompt
+version: "1.0"
+---
+
+# Role
+You are a helper.
+
+# Input
+- `query`: string (required) - User query
+
+# Output
+- **answer**: The answer
+
+# Steps
+1. Read {{query}} and {{other}}
+2. Generate **answer**
+"""
+
+
+@pytest.fixture
+def parse_calls(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    calls: list[str] = []
+
+    def counting_parse(source: str, path: str = "<stdin>") -> object:
+        calls.append(path)
+        return parse(source, path)
+
+    monkeypatch.setattr(cache_module, "parse", counting_parse)
+    return calls
+
+
+class TestDocumentCache:
+    def test_same_version_is_a_hit(self, parse_calls: list[str]) -> None:
+        cache = DocumentCache()
+        first = cache.get(DOC, "a.prompt.md", uri="file:///a", version=1)
+        second = cache.get(DOC, "a.prompt.md", uri="file:///a", version=1)
+        assert first is second
+        assert len(parse_calls) == 1
+
+    def test_unchanged_text_with_new_version_is_a_hit(self, parse_calls: list[str]) -> None:
+        cache = DocumentCache()
+        first = cache.get(DOC, uri="file:///a", version=1)
+        second = cache.get(DOC, uri="file:///a", version=2)
+        assert first is second
+        assert second.version == 2
+        assert len(parse_calls) == 1
+
+    def test_changed_text_is_reparsed(self, parse_calls: list[str]) -> None:
+        cache = DocumentCache()
+        cache.get(DOC, uri="file:///a", version=1)
+        entry = cache.get(DOC + "\nMore", uri="file:///a", version=2)
+        assert entry.document.raw_content.endswith("More")
+        assert len(parse_calls) == 2
+
+    def test_lookup_without_uri_uses_content_hash(self, parse_calls: list[str]) -> None:
+        cache = DocumentCache()
+        assert cache.get(DOC) is cache.get(DOC)
+        assert len(parse_calls) == 1
+
+    def test_diagnostics_are_computed_once(self) -> None:
+        entry = DocumentCache().get(DOC, uri="file:///a")
+        assert entry.diagnostics is entry.diagnostics
+        assert any(d.rule_id == "R002" for d in entry.diagnostics)
+
+    def test_lru_eviction(self) -> None:
+        cache = DocumentCache(maxsize=2)
+        cache.get(DOC, uri="file:///a")
+        cache.get(DOC, uri="file:///b")
+        cache.get(DOC, uri="file:///a")
+        cache.get(DOC, uri="file:///c")
+        assert "file:///a" in cache
+        assert "file:///b" not in cache
+        assert len(cache) == 2
+
+    def test_shrinking_maxsize_evicts(self) -> None:
+        cache = DocumentCache(maxsize=4)
+        for name in "abcd":
+            cache.get(DOC, uri=f"file:///{name}")
+        cache.maxsize = 1
+        assert len(cache) == 1
+        assert "file:///d" in cache
+
+
+class TestHandlersShareCache:
+    def test_hover_and_completion_reuse_diagnostics_parse(
+        self, parse_calls: list[str], monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(server, "document_cache", DocumentCache())
+        lines = DOC.split("\n")
+        uri = "file:///shared.prompt.md"
+
+        server.build_diagnostics(DOC, "shared.prompt.md", uri=uri, version=3)
+        server.compute_hover(DOC, lines, 16, 10, uri=uri, version=3)
+        server.compute_completions(DOC, lines + ["{{"], len(lines), 2, uri=uri, version=3)
+
+        assert len(parse_calls) == 1
+
+    def test_hover_after_eviction_keeps_the_document_path(
+        self, tmp_path: Path, parse_calls: list[str], monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        cache = DocumentCache(maxsize=1)
+        monkeypatch.setattr(server, "document_cache", cache)
+        monkeypatch.setattr(server, "parse", cache_module.parse)
+        (tmp_path / "notes.md").write_text("notes\n", encoding="utf-8")
+        source = DOC + "\nSee [notes](notes.md)\n"
+        lines = source.split("\n")
+        path = tmp_path / "a.prompt.md"
+        cache.get(source, str(path), uri=path.as_uri(), version=1)
+        cache.get(DOC, "b.prompt.md", uri="file:///b", version=1)
+        assert path.as_uri() not in cache
+
+        hover = server.compute_hover(source, lines, 16, 10, uri=path.as_uri(), version=1)
+        assert hover is not None
+        server.compute_completions(source, lines + ["{{"], len(lines), 2, uri=path.as_uri())
+        assert parse_calls[-2:] == [str(path), str(path)]
+        # The read-only handlers leave the cache to the handlers that validate
+        assert path.as_uri() not in cache
+        entry = cache.get(source, str(path), uri=path.as_uri(), version=1)
+        assert not any(d.rule_id == "R006" for d in entry.diagnostics)
+
+    def test_select_and_ignore_options(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        cache = DocumentCache()
+        monkeypatch.setattr(server, "document_cache", cache)
+        entry = cache.get(DOC, uri="file:///a")
+        assert any(d.rule_id == "R002" for d in entry.diagnostics)
+
+        messages: list[str] = []
+        ls = SimpleNamespace(
+            window_log_message=lambda params: messages.append(params.message),
+            window_show_message=lambda params: messages.append(params.message),
+        )
+        server.configure_rules(ls, {"select": ["R00"], "ignore": "R002,R003"})
+
+        assert [r.rule_id for r in cache.rules or []] == ["R001", "R004", "R005", "R006", "R007"]
+        assert not any(d.rule_id == "R002" for d in cache.get(DOC, uri="file:///a").diagnostics)
+        assert messages[0].startswith(f"Loaded {len(get_all_rules())} rules")
+
+    def test_created_files_revalidate_documents_with_links(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        cache = DocumentCache()
+        fs = fscache.FileSystemCache()
+        monkeypatch.setattr(server, "document_cache", cache)
+        monkeypatch.setattr(server, "file_system_cache", fs)
+        monkeypatch.setattr(fscache, "active", fs)
+        path = tmp_path / "a.prompt.md"
+        linked = cache.get(DOC + "\nSee [notes](notes.md)\n", str(path), uri="file:///a")
+        cache.get(DOC, str(tmp_path / "b.prompt.md"), uri="file:///b")
+        assert any(d.rule_id == "R006" for d in linked.diagnostics)
+
+        (tmp_path / "notes.md").write_text("notes\n", encoding="utf-8")
+        event = types.FileEvent(
+            uri=(tmp_path / "notes.md").as_uri(), type=types.FileChangeType.Created
+        )
+        assert server.invalidate_listings([event])
+        assert server.reset_linked_documents() == ["file:///a"]
+        entry = cache.peek("file:///a")
+        assert entry is not None
+        assert not any(d.rule_id == "R006" for d in entry.diagnostics)
+
+    def test_changed_includes_revalidate_only_dependents(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        cache = DocumentCache()
+        monkeypatch.setattr(server, "document_cache", cache)
+        monkeypatch.setattr(server, "include_cache", includes.IncludeCache())
+        monkeypatch.setattr(server, "include_graph", includes.DependencyGraph())
+        monkeypatch.setattr(includes, "active", server.include_cache)
+        shared = tmp_path / "shared.md"
+        shared.write_text("# Constraints\nBe brief.\n", encoding="utf-8")
+        including = DOC.replace("# Steps", "<!-- include: shared.md -->\n\n# Steps")
+        for uri, text in (("file:///a", including), ("file:///b", DOC)):
+            entry = cache.get(text, str(tmp_path / f"{uri[-1]}.prompt.md"), uri=uri)
+            server.include_graph.update(uri, entry.document.included_paths)
+        before = cache.peek("file:///b")
+
+        shared.write_text("# Constraints\nUse {{missing}}.\n", encoding="utf-8")
+        [(uri, entry)] = server.reload_includes([str(shared)])
+        assert uri == "file:///a"
+        assert cache.peek("file:///a") is entry
+        assert any("{{missing}}" in d.message for d in entry.diagnostics)
+        assert cache.peek("file:///b") is before
@@ -0,0 +1,171 @@
+"""Tests for the LSP workspace index and symbol handlers."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from lsprotocol import types
+
+from prompt_lint.discovery import find_prompt_files
+from prompt_lint.lsp import server
+from prompt_lint.lsp.index import WorkspaceIndex, path_to_uri, summarize
+from prompt_lint.parser import parse
+
+DOC = """\
+---
+name: triage
+description: Triage a ticket
+version: "2.1"
+---
+
+# Role
+You are a support engineer.
+
+# Input
+- `ticket`: string (required) - The ticket text
+- `priority`: number (optional) - Current priority
+
+# Output
+- **severity**: The assessed severity
+
+# Steps
+1. Read {{ticket}} and {{priority}}
+2. Produce **severity** and **summary**
+"""
+
+
+def write_prompt(path: Path, name: str = "triage", variable: str = "ticket") -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(DOC.replace("triage", name).replace("ticket", variable), encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def workspace(tmp_path: Path) -> Path:
+    write_prompt(tmp_path / "triage.prompt.md")
+    write_prompt(tmp_path / "nested" / "escalate.prompt.md", name="escalate", variable="case")
+    write_prompt(tmp_path / ".git" / "ignored.prompt.md", name="hidden")
+    (tmp_path / "notes.md").write_text("# Role\n", encoding="utf-8")
+    return tmp_path
+
+
+class TestSummarize:
+    def test_collects_declarations(self) -> None:
+        summary = summarize(parse(DOC, "t.prompt.md"), "file:///t.prompt.md")
+        assert summary.name == "triage"
+        assert summary.version == "2.1"
+        assert [(s.name, s.kind) for s in summary.symbols] == [
+            ("triage", types.SymbolKind.File),
+            ("Role", types.SymbolKind.Module),
+            ("Input", types.SymbolKind.Module),
+            ("ticket", types.SymbolKind.Variable),
+            ("priority", types.SymbolKind.Variable),
+            ("Output", types.SymbolKind.Module),
+            ("severity", types.SymbolKind.Field),
+            ("Steps", types.SymbolKind.Module),
+        ]
+
+    def test_positions_point_at_names(self) -> None:
+        lines = DOC.split("\n")
+        summary = summarize(parse(DOC), "file:///t.prompt.md")
+        for symbol in summary.symbols:
+            line = lines[symbol.line]
+            if symbol.kind == types.SymbolKind.Module:
+                assert line == f"# {symbol.name}"
+            elif symbol.kind != types.SymbolKind.File:
+                assert line[symbol.character :].startswith(symbol.name)
+
+
+class TestWorkspaceIndex:
+    def test_scan_finds_what_the_cli_lints(self, workspace: Path) -> None:
+        write_prompt(workspace / ".github" / "prompts" / "review.prompt.md", name="review")
+        index = WorkspaceIndex()
+        assert index.scan([workspace]) == len(find_prompt_files([str(workspace)])) == 3
+        assert {s.name for s in index.search("")} >= {"triage", "escalate", "review"}
+        assert index.search("hidden") == []
+
+    def test_prefix_search_ignores_case(self, workspace: Path) -> None:
+        index = WorkspaceIndex()
+        index.scan([workspace])
+        assert [s.name for s in index.search("TRI")] == ["triage"]
+        assert sorted(s.name for s in index.search("c")) == ["case"]
+        # Every prompt declares the same sections
+        assert len(index.search("Role")) == 2
+        assert len(index.search("r", limit=1)) == 1
+
+    def test_update_replaces_only_the_changed_file(self, workspace: Path) -> None:
+        index = WorkspaceIndex()
+        index.scan([workspace])
+        path = write_prompt(workspace / "triage.prompt.md", variable="request")
+        index.update_file(path)
+        assert index.search("ticket") == []
+        assert [s.uri for s in index.search("request")] == [path_to_uri(path)]
+        assert [s.name for s in index.search("case")] == ["case"]
+
+    def test_deleted_files_and_directories_are_dropped(self, workspace: Path) -> None:
+        index = WorkspaceIndex()
+        index.scan([workspace])
+        (workspace / "triage.prompt.md").unlink()
+        index.update_file(workspace / "triage.prompt.md")
+        assert index.search("triage") == []
+        index.remove_tree(path_to_uri(workspace / "nested"))
+        assert len(index) == 0
+        assert index.search("") == []
+
+    def test_open_documents_take_precedence_over_disk(self, workspace: Path) -> None:
+        index = WorkspaceIndex()
+        path = workspace / "triage.prompt.md"
+        uri = path_to_uri(path)
+        index.update_document(uri, parse(DOC.replace("ticket", "draft")))
+
+        index.scan([workspace])
+        index.update_file(path)
+        assert [s.uri for s in index.search("draft")] == [uri]
+        assert index.search("ticket") == []
+
+        index.release(uri)
+        assert index.search("draft") == []
+        assert [s.uri for s in index.search("ticket")] == [uri]
+
+
+class TestSymbolHandlers:
+    def test_workspace_symbols(self, workspace: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        index = WorkspaceIndex()
+        index.scan([workspace])
+        monkeypatch.setattr(server, "workspace_index", index)
+        symbols = server.compute_workspace_symbols("sev")
+        assert len(symbols) == 2
+        [symbol] = [s for s in symbols if s.location.uri.endswith("/triage.prompt.md")]
+        assert symbol.name == "severity"
+        assert symbol.kind == types.SymbolKind.Field
+        assert symbol.container_name == "Output"
+        assert isinstance(symbol.location, types.Location)
+        assert symbol.location.range.start == types.Position(line=14, character=4)
+
+    def test_document_symbols_nest_declarations_in_sections(self) -> None:
+        lines = DOC.split("\n")
+        symbols = server.compute_document_symbols(parse(DOC), lines)
+        assert [s.name for s in symbols] == ["triage", "Role", "Input", "Output", "Steps"]
+        inputs = symbols[2]
+        assert [c.name for c in inputs.children or []] == ["ticket", "priority"]
+        assert inputs.range.start.line == 9
+        assert inputs.range.end.line == 13
+        assert symbols[-1].range.end == types.Position(line=len(lines) - 1, character=0)
+        # Output fields mentioned in Steps are not declarations
+        assert symbols[-1].children == []
+
+    def test_watched_file_events(self, workspace: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        index = WorkspaceIndex()
+        monkeypatch.setattr(server, "workspace_index", index)
+        created = write_prompt(workspace / "new.prompt.md", name="fresh")
+        server.apply_file_changes(
+            [types.FileEvent(uri=path_to_uri(created), type=types.FileChangeType.Created)]
+        )
+        assert [s.name for s in index.search("fresh")] == ["fresh"]
+
+        created.unlink()
+        server.apply_file_changes(
+            [types.FileEvent(uri=path_to_uri(created), type=types.FileChangeType.Deleted)]
+        )
+        assert len(index) == 0
@@ -0,0 +1,122 @@
+"""Tests for background validation in the LSP server."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+
+import pytest
+from lsprotocol import types
+
+from prompt_lint.lsp import server
+from prompt_lint.lsp.cache import CacheEntry, DocumentCache
+from prompt_lint.lsp.scheduler import ValidationScheduler
+from prompt_lint.models import Diagnostic, PromptDocument
+from prompt_lint.parser import parse
+from prompt_lint.rules import RuleBase
+from prompt_lint.rules.variable_defined import VariableDefinedRule
+
+DOC = """\
+# Input
+- `query`: string (required) - User query
+
+# Steps
+1. Read {{query}} and {{other}}
+"""
+
+
+class BlockingRule(RuleBase):
+    """Signals when it starts, then waits until released."""
+
+    rule_id = "X001"
+    description = "Blocks the validation thread"
+
+    def __init__(self) -> None:
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def check(self, doc: PromptDocument) -> list[Diagnostic]:
+        self.started.set()
+        self.release.wait(5)
+        return []
+
+
+class CountingRule(RuleBase):
+    rule_id = "X002"
+    description = "Counts the documents it checks"
+
+    def __init__(self) -> None:
+        self.checked: list[str] = []
+
+    def check(self, doc: PromptDocument) -> list[Diagnostic]:
+        self.checked.append(doc.raw_content)
+        return []
+
+
+def entry(text: str, version: int, rules: list[RuleBase] | None = None) -> CacheEntry:
+    return CacheEntry(parse(text), version, rules)
+
+
+class TestValidationScheduler:
+    def test_burst_of_edits_validates_the_last_version_once(self) -> None:
+        counting = CountingRule()
+        published: list[int | None] = []
+
+        async def edit() -> None:
+            scheduler = ValidationScheduler(
+                lambda uri, e, diagnostics: published.append(e.version), debounce=0.02
+            )
+            for version in range(5):
+                scheduler.schedule("file:///a", entry(f"{DOC}{version}", version, [counting]))
+            await asyncio.sleep(0.1)
+            assert "file:///a" not in scheduler
+            scheduler.shutdown()
+
+        asyncio.run(edit())
+        assert published == [4]
+        assert counting.checked == [f"{DOC}4"]
+
+    def test_superseded_validation_stops_between_rules(self) -> None:
+        blocking = BlockingRule()
+        counting = CountingRule()
+        published: list[int | None] = []
+
+        async def edit() -> None:
+            scheduler = ValidationScheduler(
+                lambda uri, e, diagnostics: published.append(e.version), debounce=0
+            )
+            first = entry(DOC, 1, [blocking, counting])
+            scheduler.schedule("file:///a", first)
+            await asyncio.get_running_loop().run_in_executor(None, blocking.started.wait, 5)
+            scheduler.schedule("file:///a", entry(DOC + "\n", 2, [counting]))
+            blocking.release.set()
+            await asyncio.sleep(0.1)
+            scheduler.shutdown()
+            # Nothing of the cancelled run is kept
+            assert first.compute_diagnostics(lambda: True) is None
+
+        asyncio.run(edit())
+        assert published == [2]
+        assert counting.checked == [DOC + "\n"]
+
+
+class TestPublishValidated:
+    def test_stale_results_are_dropped(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        cache = DocumentCache()
+        cache.rules = [VariableDefinedRule()]
+        monkeypatch.setattr(server, "document_cache", cache)
+        monkeypatch.setattr(server, "index_workspace", False)
+        sent: list[types.PublishDiagnosticsParams] = []
+        monkeypatch.setattr(server.server, "text_document_publish_diagnostics", sent.append)
+
+        old = cache.get(DOC, uri="file:///a", version=1)
+        new = cache.put("file:///a", parse(DOC + "\n"), 2)
+        server.publish_validated("file:///a", old, old.diagnostics)
+        assert sent == []
+
+        server.publish_validated("file:///a", new, new.diagnostics)
+        assert [(p.version, len(p.diagnostics)) for p in sent] == [(2, 1)]
+
+        cache.discard("file:///a")
+        server.publish_validated("file:///a", new, new.diagnostics)
+        assert len(sent) == 1
@@ -0,0 +1,183 @@
+"""Tests for PromptDocument accessors and their indexes."""
+
+from __future__ import annotations
+
+import pytest
+
+from prompt_lint.models import (
+    Frontmatter,
+    Position,
+    PromptDocument,
+    Section,
+    SectionKind,
+    Variable,
+    VariableReference,
+)
+from prompt_lint.parser import parse, reparse
+
+DOC = """\
+---
+name: test
+---
+
+# Role
+Use **summary** for {{query}}.
+
+# Input
+- `query`: string (required) - First
+- `query`: number (optional) - Duplicate
+- `limit`: number (optional) - Unused
+
+# Output
+- **summary**: The summary
+- **detail**: Never referenced
+
+# Steps
+1. Read {{query}} and {{missing}}
+2. Write **summary**
+
+# Steps
+Second Steps section, {{query}} again.
+"""
+
+
+class TestDocumentIndex:
+    def test_get_section_returns_first_of_kind(self) -> None:
+        doc = parse(DOC)
+        steps = doc.get_section(SectionKind.STEPS)
+        assert steps is not None
+        assert "Read {{query}}" in steps.content
+        assert doc.get_section(SectionKind.EXAMPLES) is None
+
+    def test_get_variable_returns_first_definition(self) -> None:
+        doc = parse(DOC)
+        var = doc.get_variable("query")
+        assert var is not None
+        assert var.type == "string"
+        assert doc.get_variable("missing") is None
+
+    def test_get_references_spans_sections(self) -> None:
+        doc = parse(DOC)
+        refs = doc.get_references("query")
+        assert [r.section for r in refs] == [
+            SectionKind.ROLE,
+            SectionKind.STEPS,
+            SectionKind.STEPS,
+        ]
+        assert doc.get_references("limit") == []
+
+    def test_name_tables(self) -> None:
+        doc = parse(DOC)
+        assert set(doc.variables_by_name) == {"query", "limit"}
+        assert set(doc.references_by_name) == {"query", "missing"}
+        assert doc.referenced_names == {"query", "missing"}
+
+    def test_output_name_sets(self) -> None:
+        doc = parse(DOC)
+        assert doc.output_field_names == {"summary", "detail"}
+        assert doc.output_reference_names == {"summary"}
+
+    def test_accessors_match_sections(self) -> None:
+        doc = parse(DOC)
+        assert [r.name for r in doc.all_references] == ["query", "query", "missing", "query"]
+        assert [f.name for f in doc.output_references_in_steps] == ["summary", "summary"]
+        assert doc.all_references is doc.all_references
+
+    def test_assigning_sections_invalidates(self) -> None:
+        doc = parse(DOC)
+        assert doc.get_variable("query") is not None
+        doc.sections = [s for s in doc.sections if s.kind != SectionKind.INPUT]
+        assert doc.get_variable("query") is None
+        assert doc.input_variables == []
+
+    def test_invalidate_after_in_place_change(self) -> None:
+        doc = parse(DOC)
+        assert doc.get_section(SectionKind.ROLE) is not None
+        del doc.sections[0]
+        doc.invalidate()
+        assert doc.get_section(SectionKind.ROLE) is None
+
+
+class TestSource:
+    def test_sections_slice_the_shared_source(self) -> None:
+        doc = parse(DOC)
+        role = doc.sections[0]
+        assert role.content == "Use **summary** for {{query}}.\n"
+        assert role.source is doc.source
+        assert doc.sections[-1].content == "Second Steps section, {{query}} again.\n"
+        assert parse("# Role").sections[0].content == ""
+
+    def test_drop_source_keeps_extracted_facts(self) -> None:
+        doc = parse(DOC)
+        doc.drop_source()
+        assert not doc.has_source
+        assert doc.referenced_names == {"query", "missing"}
+        assert doc.frontmatter is not None
+        assert doc.frontmatter.data == {"name": "test"}
+        with pytest.raises(ValueError, match="dropped"):
+            doc.raw_content
+        with pytest.raises(ValueError, match="dropped"):
+            doc.sections[0].content
+
+    def test_reparse_after_drop_parses_fully(self) -> None:
+        doc = parse(DOC)
+        doc.drop_source()
+        edited = DOC.replace("2. Write", "2. Print")
+        assert reparse(doc, edited, 24, 24, 0) == parse(edited)
+
+    def test_models_built_without_a_shared_source(self) -> None:
+        query = Variable("query", "string", True, "Q", Position(2, 3))
+        sections = [
+            Section(
+                kind=SectionKind.INPUT,
+                raw_heading="Input",
+                content="- `query`: string (required) - Q",
+                start_line=1,
+                variables=[query],
+            ),
+            Section(
+                SectionKind.STEPS,
+                "Steps",
+                "Read {{query}}",
+                4,
+                references=[VariableReference("query", Position(5, 6), SectionKind.STEPS)],
+            ),
+        ]
+        doc = PromptDocument(
+            path="a.prompt.md", frontmatter=None, sections=sections, raw_content="..."
+        )
+        assert doc.raw_content == "..."
+        assert sections[1].content == "Read {{query}}"
+        assert doc.get_variable("query") is query
+        assert doc.referenced_names == {"query"}
+        with pytest.raises(TypeError):
+            PromptDocument(path="a.prompt.md", frontmatter=None, sections=[])
+
+    def test_models_stay_mutable(self) -> None:
+        doc = parse(DOC)
+        section = doc.sections[0]
+        section.raw_heading = "Persona"
+        section.variables.append(doc.input_variables[0])
+        doc.input_variables[0].description = "Changed"
+        doc.output_fields[0].name = "renamed"
+        assert section.raw_heading == "Persona"
+        query = doc.get_variable("query")
+        assert query is not None and query.description == "Changed"
+
+
+class TestFrontmatter:
+    def test_data_is_loaded_on_first_access(self) -> None:
+        frontmatter = Frontmatter(raw="name: test\nversion: '1.0'", start_line=1, end_line=4)
+        assert frontmatter.data == {"name": "test", "version": "1.0"}
+        assert frontmatter.error is None
+
+    def test_built_from_data(self) -> None:
+        frontmatter = Frontmatter(data={"name": "test"}, start_line=1, end_line=3)
+        assert frontmatter.data == {"name": "test"}
+        assert frontmatter.error is None
+        assert frontmatter == Frontmatter(raw="name: test", start_line=1, end_line=3)
+
+    def test_built_from_positional_data(self) -> None:
+        frontmatter = Frontmatter({"name": "test"}, 1, 3)
+        assert frontmatter.data == {"name": "test"}
+        assert (frontmatter.start_line, frontmatter.end_line) == (1, 3)
@@ -4,8 +4,12 @@ from __future__ import annotations
 
 from pathlib import Path
 
-from prompt_lint.models import SectionKind
-from prompt_lint.parser import parse, parse_file
+import pytest
+import yaml
+
+import prompt_lint.parser as parser_module
+from prompt_lint.models import Fact, SectionKind
+from prompt_lint.parser import EventType, load_frontmatter, parse, parse_file, reparse, scan
 
 
 class TestFrontmatter:
@@ -29,6 +33,38 @@ class TestFrontmatter:
         # because # Role line is not ---
         assert doc.frontmatter is None
 
+    def test_yaml_loaded_lazily(self) -> None:
+        content = "---\nname: test\n---\n\n# Role\nContent"
+        doc = parse(content)
+        assert doc.frontmatter is not None
+        assert doc.frontmatter._data is None
+        assert doc.frontmatter.data == {"name": "test"}
+        assert doc.frontmatter.data is doc.frontmatter.data
+
+    def test_malformed_yaml_error_position(self) -> None:
+        content = "---\nname: test\ndescription: [unclosed\nversion: '1'\n---\n"
+        doc = parse(content)
+        assert doc.frontmatter is not None
+        assert doc.frontmatter.data == {}
+        error = doc.frontmatter.error
+        assert error is not None
+        assert error.position.line == 4
+
+    def test_valid_yaml_has_no_error(self) -> None:
+        doc = parse("---\nname: test\n---\n")
+        assert doc.frontmatter is not None
+        assert doc.frontmatter.error is None
+
+    def test_pure_python_loader_fallback(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.delattr(yaml, "CSafeLoader", raising=False)
+        parser_module._safe_loader.cache_clear()
+        try:
+            data, error = load_frontmatter("name: test\nversion: '1'", 1)
+        finally:
+            parser_module._safe_loader.cache_clear()
+        assert data == {"name": "test", "version": "1"}
+        assert error is None
+
 
 class TestSections:
     def test_basic_sections(self, valid_minimal: Path) -> None:
@@ -116,6 +152,166 @@ class TestOutputFields:
         assert field_names == {"result", "summary"}
 
 
+class TestScan:
+    def test_events_in_source_order(self) -> None:
+        lines = [
+            "# Input",
+            "- `x`: string (required) - x",
+            "# Steps",
+            "Use {{x}} to make **result**",
+        ]
+        events = [(etype, idx, column) for etype, idx, column, _ in scan(lines)]
+        assert events == [
+            (EventType.HEADING, 0, 1),
+            (EventType.INPUT_VARIABLE, 1, 3),
+            (EventType.HEADING, 2, 1),
+            (EventType.REFERENCE, 3, 5),
+            (EventType.OUTPUT_FIELD, 3, 19),
+        ]
+
+    def test_code_block_suppresses_headings_and_references(self) -> None:
+        lines = ["# Steps", "```", "# Role", "{{x}} **y**", "```", "{{z}}"]
+        events = [(etype, idx) for etype, idx, _, _ in scan(lines)]
+        assert events == [
+            (EventType.HEADING, 0),
+            (EventType.FENCE, 1),
+            (EventType.FENCE, 4),
+            (EventType.REFERENCE, 5),
+        ]
+
+    def test_heading_inside_code_block_stays_in_section(self) -> None:
+        content = "# Steps\n```\n# Role\n```\nUse {{x}}"
+        doc = parse(content)
+        assert [s.kind for s in doc.sections] == [SectionKind.STEPS]
+        assert "# Role" in doc.sections[0].content
+        assert doc.all_references[0].position.line == 5
+
+
+FACTS_DOC = """\
+---
+name: test
+---
+
+# Input
+- `x`: string (required) - x
+
+# Steps
+Use {{x}} to make **result**
+"""
+
+
+class TestFacts:
+    def test_frontmatter_only_skips_body(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        def fail(*args: object) -> None:
+            raise AssertionError("body was scanned")
+
+        monkeypatch.setattr(parser_module, "scan", fail)
+        doc = parse(FACTS_DOC, facts=Fact.FRONTMATTER)
+        assert doc.frontmatter is not None
+        assert doc.frontmatter.data == {"name": "test"}
+        assert doc.sections == []
+
+    def test_sections_only(self) -> None:
+        doc = parse(FACTS_DOC, facts=Fact.SECTIONS)
+        assert [s.kind for s in doc.sections] == [SectionKind.INPUT, SectionKind.STEPS]
+        assert doc.input_variables == []
+        assert doc.all_references == []
+        assert doc.output_references_in_steps == []
+
+    def test_skipped_facts_never_match(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(parser_module, "OUTPUT_FIELD_RE", None)
+        doc = parse(FACTS_DOC, facts=Fact.VARIABLES | Fact.REFERENCES)
+        assert [v.name for v in doc.input_variables] == ["x"]
+        assert [r.name for r in doc.all_references] == ["x"]
+        assert doc.facts == Fact.SECTIONS | Fact.VARIABLES | Fact.REFERENCES
+
+    def test_subset_matches_full_parse(self) -> None:
+        full = parse(FACTS_DOC)
+        doc = parse(FACTS_DOC, facts=Fact.OUTPUT_FIELDS)
+        assert doc.output_references_in_steps == full.output_references_in_steps
+        assert [s.content for s in doc.sections] == [s.content for s in full.sections]
+
+
+class TestLinks:
+    def test_inline_images_and_definitions(self) -> None:
+        doc = parse(
+            "# Steps\n"
+            'See [a](docs/a.md#x "Title"), ![i](<img dir/x.png>) and `[no](code.md)`\n'
+            "[ref]: ./b.md\n"
+            "```\n[c](in_code.md)\n```\n"
+        )
+        assert [(link.target, link.position.column) for link in doc.links] == [
+            ("docs/a.md#x", 9),
+            ("img dir/x.png", 37),
+            ("./b.md", 8),
+        ]
+
+    def test_links_are_a_fact(self) -> None:
+        assert parse("# Steps\n[a](b.md)\n", facts=Fact.REFERENCES).links == []
+        doc = parse("# Steps\n[a](b.md)\n", facts=Fact.LINKS)
+        assert doc.facts == Fact.SECTIONS | Fact.LINKS
+        assert [link.target for link in doc.links] == ["b.md"]
+
+    def test_reparse_shifts_links(self) -> None:
+        content = "# Role\nR\n\n# Steps\n[a](b.md)\n"
+        edited = _edit_line(content, 1, ["R", "more"])
+        assert reparse(parse(content), edited, 1, 1, 1).links == parse(edited).links
+
+
+INCREMENTAL_DOC = (
+    "---\nname: t\ndescription: d\nversion: '1'\n---\n\n"
+    "# Role\nR\n\n# Input\n- `x`: string (required) - x\n\n"
+    "# Steps\n1. Use {{x}}\n\n# Examples\nSee {{x}} and **r**"
+)
+
+
+def _edit_line(content: str, index: int, new_lines: list[str]) -> str:
+    lines = content.split("\n")
+    lines[index : index + 1] = new_lines
+    return "\n".join(lines)
+
+
+class TestReparse:
+    def test_edit_inside_section_matches_full_parse(self) -> None:
+        doc = parse(INCREMENTAL_DOC)
+        edited = _edit_line(INCREMENTAL_DOC, 13, ["1. Use {{x}} and {{y}}"])
+        new_doc = reparse(doc, edited, 13, 13, 0)
+        assert new_doc == parse(edited)
+        # Sections outside the edit keep their extracted facts
+        assert new_doc.sections[1].variables is doc.sections[1].variables
+        assert new_doc.sections[3].references is doc.sections[3].references
+        assert [s.content for s in new_doc.sections] == [s.content for s in parse(edited).sections]
+
+    def test_inserted_lines_shift_following_sections(self) -> None:
+        doc = parse(INCREMENTAL_DOC)
+        edited = _edit_line(INCREMENTAL_DOC, 13, ["1. Use {{x}}", "2. More", "3. Lines"])
+        new_doc = reparse(doc, edited, 13, 13, 2)
+        assert new_doc == parse(edited)
+        examples = new_doc.sections[3]
+        assert examples.start_line == doc.sections[3].start_line + 2
+
+    def test_removed_heading_merges_sections(self) -> None:
+        doc = parse(INCREMENTAL_DOC)
+        edited = _edit_line(INCREMENTAL_DOC, 15, ["Examples"])
+        new_doc = reparse(doc, edited, 15, 15, 0)
+        assert new_doc == parse(edited)
+        assert len(new_doc.sections) == 3
+
+    def test_unclosed_fence_swallows_next_heading(self) -> None:
+        doc = parse(INCREMENTAL_DOC)
+        edited = _edit_line(INCREMENTAL_DOC, 13, ["```"])
+        new_doc = reparse(doc, edited, 13, 13, 0)
+        assert new_doc == parse(edited)
+        assert len(new_doc.sections) == 3
+
+    def test_frontmatter_edit_falls_back_to_full_parse(self) -> None:
+        doc = parse(INCREMENTAL_DOC)
+        edited = _edit_line(INCREMENTAL_DOC, 1, ["name: renamed"])
+        new_doc = reparse(doc, edited, 1, 1, 0)
+        assert new_doc.frontmatter is not None
+        assert new_doc.frontmatter.data["name"] == "renamed"
+
+
 class TestParseFile:
     def test_path_preserved(self, valid_minimal: Path) -> None:
         doc = parse_file(str(valid_minimal))
@@ -0,0 +1,106 @@
+"""Tests for run profiling."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from prompt_lint import profiling
+from prompt_lint.cli import main
+from prompt_lint.models import Diagnostic, PromptDocument
+from prompt_lint.parser import parse
+from prompt_lint.profiling import Profiler, profile
+from prompt_lint.rules import RuleBase, get_all_rules
+from prompt_lint.runner import run_lint
+from prompt_lint.validator import validate
+
+
+class PluginRule(RuleBase):
+    @property
+    def rule_id(self) -> str:
+        return "X200"
+
+    @property
+    def description(self) -> str:
+        return "A third-party rule"
+
+    def check(self, doc: PromptDocument) -> list[Diagnostic]:
+        return []
+
+
+class TestProfiler:
+    def test_keeps_slowest_files(self) -> None:
+        profiler = Profiler(top_files=2)
+        for i, seconds in enumerate([0.3, 0.1, 0.5, 0.2]):
+            profiler.record_file(f"f{i}", seconds)
+        assert profiler.slowest_files() == [("f2", 0.5), ("f0", 0.3)]
+
+    def test_merge(self) -> None:
+        first, second = Profiler(), Profiler()
+        first.record("read", 1.0)
+        second.record("read", 2.0)
+        second.record_rule("R001", 0.5)
+        second.record_file("slow", 3.0)
+        first.merge(second)
+        assert first.phases["read"] == profiling.Timing(3.0, 2)
+        assert first.rules["R001"] == profiling.Timing(0.5, 1)
+        assert first.slowest_files() == [("slow", 3.0)]
+
+    def test_profile_activates_and_restores(self) -> None:
+        assert profiling.active is None
+        with profile() as outer:
+            assert profiling.active is outer
+            with profile() as inner:
+                assert profiling.active is inner
+            assert profiling.active is outer
+        assert profiling.active is None
+        assert outer.wall_time > 0
+
+
+class TestInstrumentation:
+    def test_phases_and_rules(self, valid_minimal: Path) -> None:
+        rules = [*get_all_rules(), PluginRule()]
+        with profile() as profiler:
+            validate(parse(valid_minimal.read_text()), rules)
+        assert {"frontmatter", "sections", "yaml", "rules"} <= set(profiler.phases)
+        assert set(profiler.rules) == {r.rule_id for r in rules}
+        assert profiler.rules["X200"].calls == 1
+
+    def test_worker_timings_are_merged(self, fixtures_dir: Path) -> None:
+        targets = sorted(str(p) for p in fixtures_dir.glob("*.prompt.md"))
+        with profile() as profiler:
+            list(run_lint(targets, get_all_rules(), jobs=2, chunk_size=2))
+        assert profiler.phases["read"].calls == len(targets)
+        assert profiler.phases["sections"].calls == len(targets)
+        assert profiler.rules["R001"].calls == len(targets)
+        assert len(profiler.slowest_files()) == len(targets)
+
+
+class TestProfileOption:
+    def test_text_report(self, valid_minimal: Path) -> None:
+        result = CliRunner().invoke(main, ["lint", "--no-cache", "--profile", str(valid_minimal)])
+        assert result.exit_code == 0
+        assert "R005" in result.stderr
+        assert str(valid_minimal) in result.stderr
+        assert result.stdout == ""
+
+    def test_json_report(self, valid_minimal: Path) -> None:
+        result = CliRunner().invoke(
+            main,
+            [
+                "lint",
+                "--no-cache",
+                "--profile",
+                "--profile-format",
+                "json",
+                "--profile-top",
+                "1",
+                str(valid_minimal),
+            ],
+        )
+        report = json.loads(result.stderr)
+        assert report["phases"]["discover"]["calls"] == 1
+        assert set(report["rules"]) == {r.rule_id for r in get_all_rules()}
+        assert [f["path"] for f in report["slowest_files"]] == [str(valid_minimal)]
@@ -0,0 +1,107 @@
+"""Tests for R006: File links must resolve to existing files."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+
+from prompt_lint import fscache
+from prompt_lint.models import Severity
+from prompt_lint.parser import parse
+from prompt_lint.rules.file_links import FileLinkRule, link_path
+
+
+def write_prompt(directory: Path, body: str) -> Path:
+    path = directory / "main.prompt.md"
+    path.write_text(f"# Steps\n{body}\n", encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def docs(tmp_path: Path) -> Path:
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "docs" / "Guide.md").write_text("# Guide\n", encoding="utf-8")
+    (tmp_path / "my notes.md").write_text("notes\n", encoding="utf-8")
+    return tmp_path
+
+
+class TestLinkPath:
+    def test_strips_anchor_and_query(self) -> None:
+        assert link_path("docs/Guide.md#usage") == "docs/Guide.md"
+        assert link_path("data.csv?raw=1") == "data.csv"
+        assert link_path("my%20notes.md") == "my notes.md"
+
+    def test_non_file_targets(self) -> None:
+        for target in ("https://example.com", "mailto:a@b.c", "#usage", "/abs.md", "{{url}}"):
+            assert link_path(target) is None
+
+
+class TestFileLinks:
+    def setup_method(self) -> None:
+        self.rule = FileLinkRule()
+
+    def check(self, path: Path) -> list[str]:
+        doc = parse(path.read_text(encoding="utf-8"), str(path))
+        return [d.message for d in self.rule.check(doc)]
+
+    def test_existing_targets(self, docs: Path) -> None:
+        path = write_prompt(
+            docs,
+            "See [guide](docs/Guide.md#intro), [notes](<my notes.md>), [dir](docs/),\n"
+            "[self](./main.prompt.md), [web](https://example.com) and [top](#steps).\n"
+            "[ref]: docs/Guide.md",
+        )
+        assert self.check(path) == []
+
+    def test_missing_target(self, docs: Path) -> None:
+        path = write_prompt(docs, "See ![diagram](img/flow.png) and [ref][x]\n\n[x]: ../gone.md")
+        doc = parse(path.read_text(encoding="utf-8"), str(path))
+        diagnostics = self.rule.check(doc)
+        assert [d.message for d in diagnostics] == [
+            'File link "img/flow.png" does not resolve to an existing file',
+            'File link "../gone.md" does not resolve to an existing file',
+        ]
+        assert all(d.severity == Severity.ERROR for d in diagnostics)
+        assert diagnostics[0].position.line == 2
+        assert diagnostics[0].position.column == 16
+
+    def test_case_mismatch(self, docs: Path) -> None:
+        path = write_prompt(docs, "See [guide](Docs/guide.md).")
+        expected = os.path.join("docs", "Guide.md")
+        assert self.check(path) == [
+            f'File link "Docs/guide.md" does not match the case of "{expected}"'
+        ]
+
+    def test_code_is_ignored(self, docs: Path) -> None:
+        path = write_prompt(docs, "Write `[text](missing.md)`.\n```\n[a](missing.md)\n```")
+        assert self.check(path) == []
+
+    def test_stdin_resolves_from_working_directory(
+        self, docs: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.chdir(docs)
+        doc = parse("# Steps\n[guide](docs/Guide.md) [x](docs/missing.md)\n")
+        assert [d.message for d in self.rule.check(doc)] == [
+            'File link "docs/missing.md" does not resolve to an existing file'
+        ]
+
+    def test_each_directory_is_listed_once(
+        self, docs: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        listed: list[str] = []
+        scandir = os.scandir
+
+        def counting_scandir(path: str) -> object:
+            listed.append(path)
+            return scandir(path)
+
+        body = "\n".join(f"[{i}](docs/Guide.md) [m{i}](docs/missing{i}.md)" for i in range(50))
+        path = write_prompt(docs, body)
+        monkeypatch.setattr(os, "scandir", counting_scandir)
+        with fscache.session():
+            assert len(self.check(path)) == 50
+            assert len(self.check(path)) == 50
+        assert listed.count(str(docs / "docs")) == 1
+        assert len(listed) == len(set(listed))
@@ -39,3 +39,11 @@ class TestFrontmatter:
         diagnostics = self.rule.check(doc)
         assert len(diagnostics) == 1
         assert "name" in diagnostics[0].message
+
+    def test_malformed_yaml(self) -> None:
+        content = "---\nname: t\ndescription: [d\nversion: '1'\n---\n\n# Role\nR"
+        doc = parse(content)
+        diagnostics = self.rule.check(doc)
+        assert len(diagnostics) == 1
+        assert "Invalid YAML" in diagnostics[0].message
+        assert diagnostics[0].position.line == 4
@@ -0,0 +1,35 @@
+"""Tests for R007: Include directives must resolve without cycles."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from prompt_lint.models import Position, Severity
+from prompt_lint.parser import parse
+from prompt_lint.rules.includes import IncludeRule
+
+
+class TestIncludes:
+    def setup_method(self) -> None:
+        self.rule = IncludeRule()
+
+    def check(self, path: Path, body: str) -> list[str]:
+        path.write_text(f"# Steps\n{body}\n", encoding="utf-8")
+        doc = parse(path.read_text(encoding="utf-8"), str(path))
+        return [d.message for d in self.rule.check(doc)]
+
+    def test_resolved_include(self, tmp_path: Path) -> None:
+        (tmp_path / "shared.md").write_text("# Constraints\nBe brief.\n", encoding="utf-8")
+        assert self.check(tmp_path / "a.prompt.md", "<!-- include: shared.md -->") == []
+
+    def test_missing_file(self, tmp_path: Path) -> None:
+        path = tmp_path / "a.prompt.md"
+        path.write_text("# Steps\n  <!--include: gone.md-->\n", encoding="utf-8")
+        [diagnostic] = self.rule.check(parse(path.read_text(encoding="utf-8"), str(path)))
+        assert diagnostic.message == 'Cannot include "gone.md": No such file or directory'
+        assert diagnostic.position == Position(line=2, column=16)
+        assert diagnostic.severity == Severity.ERROR
+
+    def test_self_include(self, tmp_path: Path) -> None:
+        messages = self.check(tmp_path / "a.prompt.md", "<!-- include: ./a.prompt.md -->")
+        assert messages == ["Include cycle: a.prompt.md -> a.prompt.md"]
@@ -0,0 +1,104 @@
+"""Tests for rule discovery and selection."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+import prompt_lint.rules as rules_module
+from prompt_lint.models import Diagnostic, PromptDocument
+from prompt_lint.rules import (
+    RuleBase,
+    RuleRegistry,
+    builtin_rules,
+    get_all_rules,
+    get_registry,
+    select_rules,
+)
+
+
+class PluginRule(RuleBase):
+    @property
+    def rule_id(self) -> str:
+        return "X100"
+
+    @property
+    def description(self) -> str:
+        return "A third-party rule"
+
+    def check(self, doc: PromptDocument) -> list[Diagnostic]:
+        return []
+
+
+@dataclass
+class FakeEntryPoint:
+    name: str
+    value: str
+    target: Any
+    dist: Any = None
+
+    def load(self) -> Any:
+        if isinstance(self.target, Exception):
+            raise self.target
+        return self.target
+
+
+def _discover(monkeypatch: pytest.MonkeyPatch, *eps: FakeEntryPoint) -> RuleRegistry:
+    monkeypatch.setattr(rules_module, "entry_points", lambda group: list(eps))
+    return RuleRegistry.discover()
+
+
+class TestRegistry:
+    def test_registry_is_built_once(self) -> None:
+        assert get_registry() is get_registry()
+        first, second = get_all_rules(), get_all_rules()
+        assert first is not second
+        assert all(a is b for a, b in zip(first, second))
+
+    def test_builtin_rules_come_first(self) -> None:
+        ids = [r.rule_id for r in get_all_rules()]
+        builtin = [r.rule_id for r in builtin_rules()]
+        assert ids[: len(builtin)] == builtin
+
+    def test_discovers_entry_points(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        registry = _discover(monkeypatch, FakeEntryPoint("x100", "plugin:PluginRule", PluginRule))
+        assert [r.rule_id for r in registry.rules][-1] == "X100"
+        assert registry.errors == []
+        assert registry.discovery_time > 0
+        assert registry.providers == {}
+
+    def test_records_the_providing_distribution(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        dist = SimpleNamespace(name="prompt-lint-extra", version="1.2")
+        registry = _discover(
+            monkeypatch, FakeEntryPoint("x100", "plugin:PluginRule", PluginRule, dist)
+        )
+        assert registry.providers == {"X100": "prompt-lint-extra==1.2"}
+
+    def test_bad_entry_points_are_reported(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        registry = _discover(
+            monkeypatch,
+            FakeEntryPoint("broken", "plugin:Missing", ImportError("no module")),
+            FakeEntryPoint("other", "plugin:thing", object()),
+            FakeEntryPoint("dup", "plugin:Dup", builtin_rules()[0]),
+        )
+        assert len(registry.rules) == len(builtin_rules())
+        assert len(registry.errors) == 3
+        assert "no module" in registry.errors[0]
+
+
+class TestSelectRules:
+    def test_select_by_prefix(self) -> None:
+        selected = select_rules(builtin_rules(), select=["R00"], ignore=["R004"])
+        expected = ["R001", "R002", "R003", "R005", "R006", "R007"]
+        assert sorted(r.rule_id for r in selected) == expected
+
+    def test_ignore_only(self) -> None:
+        selected = select_rules(builtin_rules(), ignore=["R005", "R001"])
+        assert sorted(r.rule_id for r in selected) == ["R002", "R003", "R004", "R006", "R007"]
+
+    def test_unknown_selector(self) -> None:
+        with pytest.raises(ValueError, match="R9"):
+            select_rules(builtin_rules(), select=["R9"])
@@ -0,0 +1,145 @@
+"""Tests for the lint execution engine."""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from prompt_lint import runner
+from prompt_lint.models import Diagnostic, PromptDocument
+from prompt_lint.rules import RuleBase, get_all_rules
+from prompt_lint.runner import Linter, lint_many, run_lint
+
+
+class ExplodingRule(RuleBase):
+    """Fails on documents whose path mentions "boom"."""
+
+    @property
+    def rule_id(self) -> str:
+        return "X001"
+
+    @property
+    def description(self) -> str:
+        return "Raises for selected files"
+
+    def check(self, doc: PromptDocument) -> list[Diagnostic]:
+        if "boom" in doc.path:
+            raise RuntimeError("rule crashed")
+        return []
+
+
+def _copies(fixtures_dir: Path, tmp_path: Path, count: int) -> list[str]:
+    names = sorted(p.name for p in fixtures_dir.glob("*.prompt.md"))
+    targets = []
+    for i in range(count):
+        name = names[i % len(names)]
+        target = tmp_path / f"{i:03d}_{name}"
+        # Vary the content so files are not de-duplicated
+        target.write_text((fixtures_dir / name).read_text() + f"\n<!-- {i} -->\n")
+        targets.append(str(target))
+    return targets
+
+
+class TestRunLint:
+    def test_parallel_matches_in_process(self, fixtures_dir: Path, tmp_path: Path) -> None:
+        targets = _copies(fixtures_dir, tmp_path, 12)
+        rules = get_all_rules()
+        serial = list(run_lint(targets, rules, jobs=1))
+        parallel = list(run_lint(targets, rules, jobs=2, chunk_size=2))
+        assert [r.path for r in parallel] == targets
+        assert parallel == serial
+
+    def test_identical_content_reports_each_path(self, valid_minimal: Path, tmp_path: Path) -> None:
+        content = valid_minimal.read_text() + "\n3. Use {{missing}}\n"
+        targets = []
+        for name in ("a", "b"):
+            target = tmp_path / f"{name}.prompt.md"
+            target.write_text(content)
+            targets.append(str(target))
+
+        first, second = run_lint(targets, get_all_rules())
+        assert [d.path for d in first.diagnostics] == [targets[0]]
+        assert [d.path for d in second.diagnostics] == [targets[1]]
+
+    def test_failure_is_isolated_to_one_file(self, fixtures_dir: Path, tmp_path: Path) -> None:
+        targets = _copies(fixtures_dir, tmp_path, 6)
+        boom = tmp_path / "boom.prompt.md"
+        boom.write_text("# Role\nR\n")
+        targets.insert(3, str(boom))
+
+        results = list(run_lint(targets, [ExplodingRule()], jobs=2, chunk_size=2))
+        errors = [r.path for r in results if r.error is not None]
+        assert errors == [str(boom)]
+        assert len(results) == len(targets)
+
+    def test_unreadable_file_is_reported(self, tmp_path: Path) -> None:
+        target = tmp_path / "binary.prompt.md"
+        target.write_bytes(b"\xff\xfe\x00")
+        (result,) = run_lint([str(target)], get_all_rules())
+        assert result.error is not None
+        assert result.error.startswith("Failed to parse")
+
+
+class TestLintMany:
+    def test_paths_and_contents(self, fixtures_dir: Path, tmp_path: Path) -> None:
+        targets = _copies(fixtures_dir, tmp_path, 5)
+        sources: list[str | tuple[str, str]] = [*targets, ("db/1.prompt.md", "# Role\nR\n")]
+        by_path = {r.path: r for r in lint_many(sources)}
+        assert list(by_path) == [*targets, "db/1.prompt.md"]
+        assert by_path["db/1.prompt.md"].diagnostics
+        assert by_path[targets[0]] == next(run_lint([targets[0]], get_all_rules()))
+
+    def test_pool_matches_in_process_and_is_reused(
+        self, fixtures_dir: Path, tmp_path: Path
+    ) -> None:
+        targets = _copies(fixtures_dir, tmp_path, 12)
+        serial = list(lint_many(targets))
+        with Linter(jobs=2, chunk_size=2) as linter:
+            parallel = list(linter.lint_many(targets, ordered=True))
+            pool = linter._pool
+            assert pool is not None
+            unordered = list(linter.lint_many(targets))
+            assert linter._pool is pool
+        assert linter._pool is None
+        assert parallel == serial
+        assert sorted(unordered, key=lambda r: r.path) == serial
+
+    def test_in_flight_work_is_bounded(self, tmp_path: Path) -> None:
+        consumed = 0
+
+        def sources() -> Iterator[tuple[str, str]]:
+            nonlocal consumed
+            for i in range(40):
+                consumed += 1
+                yield (f"db/{i}.prompt.md", "# Role\nR\n")
+
+        with Linter(jobs=2, chunk_size=4) as linter:
+            yielded = 0
+            for _ in linter.lint_many(sources(), max_in_flight=6):
+                yielded += 1
+                assert consumed - yielded <= 6
+        assert yielded == 40
+
+    def test_failures_are_results(self, tmp_path: Path) -> None:
+        sources: list[str | tuple[str, str]] = [
+            ("boom.prompt.md", "# Role\n"),
+            str(tmp_path / "missing.prompt.md"),
+        ]
+        with Linter([ExplodingRule()], jobs=2, chunk_size=1) as linter:
+            results = list(linter.lint_many(sources, ordered=True))
+        assert [r.error is not None for r in results] == [True, True]
+        assert results[1].error is not None and results[1].error.startswith("Failed to parse")
+
+    def test_shared_linter_is_reused(self) -> None:
+        list(lint_many([("a.prompt.md", "# Role\n")]))
+        linter = runner._shared_linter
+        list(lint_many([("b.prompt.md", "# Role\n")]))
+        assert runner._shared_linter is linter
+        list(lint_many([("b.prompt.md", "# Role\n")], rules=[ExplodingRule()]))
+        assert runner._shared_linter is not linter
+
+    def test_max_in_flight_must_be_positive(self) -> None:
+        with pytest.raises(ValueError, match="max_in_flight"):
+            lint_many([], max_in_flight=0)
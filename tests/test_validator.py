@@ -4,9 +4,12 @@ from __future__ import annotations
 
 from pathlib import Path
 
-from prompt_lint.models import Severity
-from prompt_lint.parser import parse_file
-from prompt_lint.validator import validate
+from prompt_lint.models import ALL_FACTS, Fact, Severity
+from prompt_lint.parser import parse, parse_file
+from prompt_lint.rules import get_all_rules
+from prompt_lint.rules.frontmatter import FrontmatterRule
+from prompt_lint.rules.variable_defined import VariableDefinedRule
+from prompt_lint.validator import required_facts, validate
 
 
 class TestValidateIntegration:
@@ -51,3 +54,20 @@ class TestValidateIntegration:
                 f"{prompt_file.name} has errors: "
                 + "; ".join(d.message for d in errors)
             )
+
+
+class TestRequiredFacts:
+    def test_built_in_rules_need_every_fact(self) -> None:
+        assert required_facts(get_all_rules()) == ALL_FACTS
+
+    def test_union_of_rule_facts(self) -> None:
+        rules = [FrontmatterRule(), VariableDefinedRule()]
+        assert required_facts(rules) == (
+            Fact.FRONTMATTER | Fact.VARIABLES | Fact.REFERENCES | Fact.INCLUDES
+        )
+
+    def test_partial_parse_gives_same_diagnostics(self, undefined_variable: Path) -> None:
+        content = undefined_variable.read_text(encoding="utf-8")
+        for rule in get_all_rules():
+            partial = validate(parse(content, facts=rule.facts), [rule])
+            assert partial == validate(parse(content), [rule])
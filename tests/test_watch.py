@@ -0,0 +1,257 @@
+"""Tests for watch mode."""
+
+from __future__ import annotations
+
+import errno
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from prompt_lint.parser import parse, reparse
+from prompt_lint.rules import get_all_rules
+from prompt_lint.watch import (
+    FileChange,
+    InotifyWatcher,
+    PollingWatcher,
+    Watcher,
+    WatchSession,
+    changed_line_range,
+    watch,
+)
+
+DOC = """\
+---
+name: test
+description: Test prompt
+version: "1.0"
+---
+
+# Role
+You are a helper.
+
+# Input
+- `query`: string (required) - User query
+
+# Output
+- **answer**: The answer
+
+# Steps
+1. Read {{query}}
+2. Generate **answer**
+"""
+
+
+@pytest.fixture
+def tree(tmp_path: Path) -> Path:
+    (tmp_path / "prompts" / "nested").mkdir(parents=True)
+    (tmp_path / "prompts" / "a.prompt.md").write_text(DOC, encoding="utf-8")
+    (tmp_path / "prompts" / "nested" / "b.prompt.md").write_text(DOC, encoding="utf-8")
+    return tmp_path / "prompts"
+
+
+def start(tree: Path) -> WatchSession:
+    session = WatchSession([str(tree)], get_all_rules())
+    session.start()
+    return session
+
+
+class TestChangedLineRange:
+    def test_equal_texts(self) -> None:
+        assert changed_line_range(DOC, DOC) is None
+
+    def test_edited_line(self) -> None:
+        assert changed_line_range("a\nb\nc", "a\nB\nc") == (1, 1, 0)
+
+    def test_inserted_and_deleted_lines(self) -> None:
+        assert changed_line_range("a\nc", "a\nb\nb\nc") == (1, 1, 2)
+        assert changed_line_range("a\nb\nb\nc", "a\nc") == (1, 2, -2)
+
+    def test_appended_lines_edit_the_last_line(self) -> None:
+        assert changed_line_range("a\nb", "a\nb\nc") == (1, 1, 1)
+
+    def test_reparse_matches_full_parse(self) -> None:
+        new = DOC.replace("1. Read {{query}}", "1. Read {{query}}\n2. Use {{other}}")
+        edited = changed_line_range(DOC, new)
+        assert edited is not None
+        assert reparse(parse(DOC), new, *edited).sections == parse(new).sections
+
+
+class TestWatchSession:
+    def test_start_lints_every_target(self, tree: Path) -> None:
+        session = start(tree)
+        assert sorted(Path(p).name for p in session.results) == ["a.prompt.md", "b.prompt.md"]
+        assert session.totals() == (0, 0)
+
+    def test_edit_reports_only_changed_diagnostics(self, tree: Path) -> None:
+        session = start(tree)
+        path = tree / "a.prompt.md"
+        path.write_text(DOC + "3. Mention {{other}}\n", encoding="utf-8")
+        [change] = session.update([str(path)])
+        assert change.path == str(path)
+        assert change.removed == []
+        assert [line.split(": ", 1)[1] for line in change.added] == [
+            'R002 error: Variable "{{other}}" is used in Steps but not defined in Input'
+        ]
+        assert session.totals() == (1, 0)
+        # The edited document is kept for the next incremental parse
+        assert str(path) in session.documents
+
+        path.write_text(DOC, encoding="utf-8")
+        [change] = session.update([str(path)])
+        assert change.added == []
+        assert len(change.removed) == 1
+        assert session.update([str(path)]) == []
+
+    def test_created_and_deleted_files(self, tree: Path) -> None:
+        session = start(tree)
+        created = tree / "nested" / "c.prompt.md"
+        created.write_text("# Role\n", encoding="utf-8")
+        [change] = session.update([str(created)])
+        assert change.added and all(line.startswith(str(created)) for line in change.added)
+        assert str(created) in session.results
+
+        created.unlink()
+        [change] = session.update([str(created)])
+        assert change.added == []
+        assert str(created) not in session.results
+        # Other files are not reported
+        (tree / "notes.md").write_text("notes\n", encoding="utf-8")
+        assert session.update([str(tree / "notes.md")]) == []
+
+    def test_deleted_directory(self, tree: Path) -> None:
+        session = start(tree)
+        nested = tree / "nested"
+        (nested / "b.prompt.md").unlink()
+        nested.rmdir()
+        assert session.update([str(nested)]) == []
+        assert list(session.results) == [str(tree / "a.prompt.md")]
+
+    def test_link_target_changes_relint_dependents(self, tree: Path) -> None:
+        path = tree / "a.prompt.md"
+        path.write_text(DOC + "\nSee [notes](notes.md)\n", encoding="utf-8")
+        session = start(tree)
+        assert session.totals() == (1, 0)
+
+        notes = tree / "notes.md"
+        notes.write_text("notes\n", encoding="utf-8")
+        [change] = session.update([str(notes)])
+        assert change.path == str(path)
+        assert "R006" in change.removed[0]
+        assert session.totals() == (0, 0)
+
+        notes.unlink()
+        [change] = session.update([str(notes)])
+        assert "R006" in change.added[0]
+
+    def test_included_file_changes_relint_only_dependents(self, tree: Path) -> None:
+        shared = tree / "shared.md"
+        shared.write_text("# Constraints\nBe brief.\n", encoding="utf-8")
+        path = tree / "a.prompt.md"
+        path.write_text(DOC.replace("# Steps", "<!-- include: shared.md -->\n\n# Steps"), "utf-8")
+        session = start(tree)
+        assert session.totals() == (0, 0)
+
+        other = session.results[str(tree / "nested" / "b.prompt.md")]
+        shared.write_text("# Constraints\nUse {{missing}}.\n", encoding="utf-8")
+        [change] = session.update([str(shared)])
+        assert change.path == str(path)
+        assert "R002" in change.added[0]
+        # The prompt not including it was not linted again
+        assert session.results[str(tree / "nested" / "b.prompt.md")] is other
+
+        shared.unlink()
+        [change] = session.update([str(shared)])
+        assert "R007" in change.added[0]
+
+
+class TestWatchers:
+    def _check(self, watcher: Watcher, tree: Path) -> None:
+        path = tree / "a.prompt.md"
+        path.write_text(DOC + "\n", encoding="utf-8")
+        assert str(path) in watcher.wait(timeout=2)
+
+        created = tree / "new" / "c.prompt.md"
+        created.parent.mkdir()
+        created.write_text(DOC, encoding="utf-8")
+        changed: set[str] = set()
+        deadline = time.monotonic() + 2
+        while str(created) not in changed and time.monotonic() < deadline:
+            changed |= watcher.wait(timeout=0.5)
+        assert str(created) in changed
+
+        (tree / "nested" / "b.prompt.md").unlink()
+        assert str(tree / "nested" / "b.prompt.md") in watcher.wait(timeout=2)
+        assert watcher.wait(timeout=0.1) == set()
+
+    def _check_pruned(self, watcher: Watcher, tree: Path) -> None:
+        (tree / ".git" / "objects" / "ab").write_text("object", encoding="utf-8")
+        (tree / "node_modules" / "pkg" / "README.md").write_text("changed\n", encoding="utf-8")
+        (tree / "venv" / "lib" / "notes.md").write_text("changed\n", encoding="utf-8")
+        assert watcher.wait(timeout=0.3) == set()
+        (tree / "a.prompt.md").write_text(DOC + "\n", encoding="utf-8")
+        assert watcher.wait(timeout=2) == {str(tree / "a.prompt.md")}
+
+    @pytest.fixture
+    def pruned_tree(self, tree: Path) -> Path:
+        (tree / ".git" / "objects").mkdir(parents=True)
+        (tree / "node_modules" / "pkg").mkdir(parents=True)
+        (tree / "node_modules" / "pkg" / "README.md").write_text("pkg\n", encoding="utf-8")
+        (tree / "venv" / "lib").mkdir(parents=True)
+        (tree / "venv" / "pyvenv.cfg").write_text("home = /usr\n", encoding="utf-8")
+        return tree
+
+    def test_polling(self, tree: Path) -> None:
+        with PollingWatcher([str(tree)], interval=0.05) as watcher:
+            self._check(watcher, tree)
+
+    def test_polling_skips_pruned_directories(self, pruned_tree: Path) -> None:
+        with PollingWatcher([str(pruned_tree)], interval=0.05) as watcher:
+            self._check_pruned(watcher, pruned_tree)
+
+    @pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux-only")
+    def test_inotify(self, tree: Path) -> None:
+        with InotifyWatcher([str(tree)]) as watcher:
+            self._check(watcher, tree)
+
+    @pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux-only")
+    def test_inotify_skips_pruned_directories(self, pruned_tree: Path) -> None:
+        with InotifyWatcher([str(pruned_tree)]) as watcher:
+            self._check_pruned(watcher, pruned_tree)
+
+    @pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux-only")
+    def test_inotify_warns_once_when_out_of_watches(
+        self, tree: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        with InotifyWatcher([str(tree)]) as watcher:
+            monkeypatch.setattr(watcher, "_add_watch", lambda *args: -1)
+            monkeypatch.setattr("prompt_lint.watch.ctypes.get_errno", lambda: errno.ENOSPC)
+            watcher._watch(str(tree / "a"))
+            watcher._watch(str(tree / "b"))
+        err = capsys.readouterr().err
+        assert err.count("Warning: Cannot watch") == 1
+        assert "max_user_watches" in err
+
+
+class TestWatchLoop:
+    def test_reports_changes_until_stopped(self, tree: Path) -> None:
+        session = start(tree)
+        path = tree / "a.prompt.md"
+        reports: list[list[FileChange]] = []
+
+        class Once(Watcher):
+            calls = 0
+
+            def wait(self, timeout: float | None = None) -> set[str]:
+                self.calls += 1
+                if self.calls == 1:
+                    path.write_text("# Role\n", encoding="utf-8")
+                    return {str(path)}
+                return set()
+
+        watcher = Once()
+        watch(
+            session, watcher, lambda changes, _: reports.append(changes), lambda: watcher.calls > 2
+        )
+        assert [[c.path for c in changes] for changes in reports] == [[str(path)]]